@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from domain.models.query import Query
+
+# (normalized question, sorted tags, top_k)
+CacheKey = Tuple[str, Tuple[str, ...], int]
+
+
+@dataclass
+class _CacheEntry:
+    answer: str
+    embedding: Optional[np.ndarray]
+    created_at: float
+
+
+def normalize_question(text: str) -> str:
+    """Case- and whitespace-insensitive form of a question, ignoring trailing punctuation."""
+    return " ".join(text.lower().split()).rstrip("?!. ")
+
+
+class AnswerCache:
+    """
+    Two-level cache of answers for repeated and near-duplicate questions.
+
+    Level 1 matches the normalized question text, tags and top_k exactly and
+    is checked before anything else. Level 2 compares query embeddings and
+    returns the answer of a previous question with the same tags and top_k
+    whose cosine similarity reaches the threshold.
+
+    Entries expire after a TTL, the least recently used ones are evicted past
+    max_entries, and everything is dropped when the generation reported by
+    generation_provider changes (i.e. ingestion modified the collection).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.95,
+        generation_provider: Optional[Callable[[], int]] = None
+    ):
+        """
+        Initialize the answer cache.
+
+        Args:
+            max_entries: Maximum number of cached answers
+            ttl_seconds: Lifetime of a cached answer (0 disables expiry)
+            similarity_threshold: Minimum cosine similarity for a semantic hit (above 1 disables level 2)
+            generation_provider: Returns the current collection generation
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.generation_provider = generation_provider
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(query: Query) -> CacheKey:
+        return (normalize_question(query.text), tuple(sorted(query.tags or [])), query.top_k)
+
+    def get_exact(self, query: Query) -> Optional[str]:
+        """Return the answer cached for exactly this question, if any."""
+        key = self.key_for(query)
+        with self._lock:
+            self._check_generation()
+            entry = self._live_entry(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry.answer
+
+    def get_similar(self, query: Query, query_embedding: List[float]) -> Optional[str]:
+        """
+        Return the answer of the most similar cached question with the same tags and top_k.
+
+        Counts a miss when nothing is close enough, since this is the last lookup level.
+        """
+        key = self.key_for(query)
+        with self._lock:
+            self._check_generation()
+            if self.similarity_threshold > 1.0:
+                self.misses += 1
+                return None
+
+            vector = self._normalize(query_embedding)
+            best_key, best_score = None, self.similarity_threshold
+            for candidate_key, entry in list(self._entries.items()):
+                if candidate_key[1:] != key[1:] or entry.embedding is None:
+                    continue
+                if self._expired(entry):
+                    del self._entries[candidate_key]
+                    continue
+                score = float(np.dot(vector, entry.embedding))
+                if score >= best_score:
+                    best_key, best_score = candidate_key, score
+
+            if best_key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.semantic_hits += 1
+            return self._entries[best_key].answer
+
+    def put(self, query: Query, query_embedding: Optional[List[float]], answer: str) -> None:
+        """Cache an answer along with the question's embedding."""
+        key = self.key_for(query)
+        embedding = self._normalize(query_embedding) if query_embedding is not None else None
+        with self._lock:
+            self._check_generation()
+            self._entries[key] = _CacheEntry(answer=answer, embedding=embedding, created_at=time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit-rate metrics for both cache levels."""
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "invalidations": self.invalidations
+            }
+
+    def _check_generation(self) -> None:
+        """Drop every entry if the collection changed since they were cached."""
+        if self.generation_provider is None:
+            return
+        generation = self.generation_provider()
+        if self._generation is not None and generation != self._generation:
+            self._entries.clear()
+            self.invalidations += 1
+        self._generation = generation
+
+    def _live_entry(self, key: CacheKey) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and self._expired(entry):
+            del self._entries[key]
+            return None
+        return entry
+
+    def _expired(self, entry: _CacheEntry) -> bool:
+        return self.ttl_seconds > 0 and time.monotonic() - entry.created_at > self.ttl_seconds
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
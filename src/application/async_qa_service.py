@@ -0,0 +1,171 @@
+import asyncio
+import time
+from typing import AsyncIterator, Optional
+
+from application.answer_cache import AnswerCache
+from application.context_builder import ContextBuilder
+from application.retrieval import Retrieval, RetrievalSteps
+from domain.interfaces.lexical_index import LexicalIndex
+from domain.interfaces.async_embedding_generator import AsyncEmbeddingGenerator
+from domain.interfaces.async_llm_client import AsyncLLMClient
+from domain.interfaces.async_vector_store import AsyncVectorStore
+from domain.interfaces.tracer import NullTracer, Span, Tracer
+from domain.models.query import Query
+
+
+class AsyncQAService:
+    """
+    Asynchronous counterpart of QAService for serving many questions concurrently.
+
+    Runs the same retrieval and answering flow, sharing its steps through
+    RetrievalSteps and reporting the same spans, awaiting the embedder,
+    vector store and LLM so one event loop can interleave requests while
+    they wait on the network. Blocking work (answer cache lookups and
+    writes, which may read the ingestion ledger, the keyword search and
+    context building) runs in worker threads.
+    """
+
+    def __init__(
+        self,
+        llm: AsyncLLMClient,
+        vector_store: AsyncVectorStore,
+        embedder: AsyncEmbeddingGenerator,
+        answer_cache: Optional[AnswerCache] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        rrf_k: int = 60,
+        hybrid_candidates: int = 20,
+        context_builder: Optional[ContextBuilder] = None,
+        tracer: Optional[Tracer] = None
+    ):
+        """
+        Initialize the async QA service with its dependencies.
+
+        Args:
+            llm: Async language model client for generating answers
+            vector_store: Async vector database for retrieving document chunks
+            embedder: Async embedding generator for converting text to vectors
+            answer_cache: Optional cache of answers to repeated and near-duplicate questions
+            lexical_index: Optional keyword index searched alongside the vector store (hybrid retrieval)
+            rrf_k: Reciprocal-rank fusion constant for hybrid retrieval
+            hybrid_candidates: Results taken from each retriever before fusing them
+            context_builder: Optional stage that merges, deduplicates and budgets the retrieved chunks
+            tracer: Optional tracer receiving a span per step, as QAService reports them
+        """
+        self.llm = llm
+        self.vector_store = vector_store
+        self.embedder = embedder
+        self.answer_cache = answer_cache
+        self.lexical_index = lexical_index
+        self.rrf_k = rrf_k
+        self.hybrid_candidates = hybrid_candidates
+        self.context_builder = context_builder
+        self.tracer = tracer or NullTracer()
+        self.steps = RetrievalSteps(self.tracer, lexical_index, rrf_k, hybrid_candidates, context_builder)
+
+    async def ask(self, query: Query) -> str:
+        """
+        Process a query to generate an answer based on retrieved context.
+
+        Args:
+            query: The Query object containing the question and search parameters
+
+        Returns:
+            str: The answer to the question
+        """
+        with self.tracer.span("qa.ask", {"question_chars": len(query.text)}) as span:
+            retrieval = await self._retrieve(query, span)
+            if retrieval.answer is not None:
+                return retrieval.answer
+
+            with self.tracer.span("qa.llm") as llm_span:
+                answer = await self.llm.answer(
+                    question=query.text,
+                    context_chunks=retrieval.context_chunks
+                )
+                if llm_span.recording:
+                    self.steps.describe_llm_call(llm_span, retrieval.context_chunks, answer)
+
+            if self.answer_cache:
+                await asyncio.to_thread(self.answer_cache.put, query, retrieval.query_embedding, answer)
+
+            return answer
+
+    async def ask_stream(self, query: Query) -> AsyncIterator[str]:
+        """
+        Process a query like ask(), yielding the answer incrementally as the LLM produces it.
+
+        Args:
+            query: The Query object containing the question and search parameters
+
+        Yields:
+            str: Consecutive fragments of the answer
+        """
+        with self.tracer.span("qa.ask", {"question_chars": len(query.text), "stream": True}) as span:
+            retrieval = await self._retrieve(query, span)
+            if retrieval.answer is not None:
+                yield retrieval.answer
+                return
+
+            pieces = []
+            with self.tracer.span("qa.llm", {"stream": True}) as llm_span:
+                started = time.perf_counter()
+                async for piece in self.llm.stream_answer(
+                    question=query.text,
+                    context_chunks=retrieval.context_chunks
+                ):
+                    if not pieces and llm_span.recording:
+                        llm_span.set("first_token_seconds", time.perf_counter() - started)
+                    pieces.append(piece)
+                    yield piece
+                if llm_span.recording:
+                    self.steps.describe_llm_call(llm_span, retrieval.context_chunks, "".join(pieces))
+
+            # Only complete answers are cached
+            if self.answer_cache:
+                await asyncio.to_thread(self.answer_cache.put, query, retrieval.query_embedding, "".join(pieces).strip())
+
+    async def _retrieve(self, query: Query, span: Span) -> Retrieval:
+        """
+        Embed the query and collect context chunks, short-circuiting on cached or empty results.
+
+        Args:
+            query: The query to retrieve context for
+            span: The enclosing qa.ask span, told how the question was answered
+        """
+        if self.answer_cache:
+            cached = await asyncio.to_thread(self.answer_cache.get_exact, query)
+            if cached is not None:
+                span.set("outcome", "cache_exact")
+                return Retrieval(answer=cached)
+
+        keyword_search = None
+        if self.lexical_index is not None:
+            # The keyword lookup runs in a thread while the embedding request is in flight
+            keyword_search = asyncio.ensure_future(asyncio.to_thread(self.steps.keyword_search, query))
+
+        try:
+            with self.tracer.span("qa.embed", {"chars": len(query.text)}):
+                query_embedding = (await self.embedder.embed([query.text]))[0]
+
+            if self.answer_cache:
+                cached = await asyncio.to_thread(self.answer_cache.get_similar, query, query_embedding)
+                if cached is not None:
+                    span.set("outcome", "cache_similar")
+                    return Retrieval(answer=cached)
+
+            with self.tracer.span("qa.search.vector", {"top_k": self.steps.search_depth(query)}) as search_span:
+                vector_results = await self.vector_store.search(
+                    query_embedding=query_embedding,
+                    top_k=self.steps.search_depth(query),
+                    filters=self.steps.filters(query)
+                )
+                search_span.set("results", len(vector_results))
+            keyword_results = await keyword_search if keyword_search is not None else None
+        finally:
+            if keyword_search is not None and not keyword_search.done():
+                keyword_search.cancel()
+
+        search_results = self.steps.fuse(query, vector_results, keyword_results)
+        # Merging, deduplicating and counting tokens is CPU work; keep it off the event loop
+        context_chunks = await asyncio.to_thread(self.steps.context, search_results)
+        return self.steps.outcome(span, query_embedding, context_chunks)
@@ -0,0 +1,50 @@
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+if TYPE_CHECKING:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+
+def split_stream(
+    pieces: Iterable[str],
+    splitter: "RecursiveCharacterTextSplitter",
+    window_chars: int
+) -> Iterator[str]:
+    """
+    Split a stream of text pieces (e.g. pages) into chunks without joining them all first.
+
+    Pieces are joined with newlines into a buffer. Whenever the buffer grows
+    past window_chars it is split, every chunk but the last is yielded and
+    the text from the start of the last chunk on is carried over, so the
+    next chunk still overlaps the previous one. Memory stays bounded by the
+    window however long the document is.
+
+    A text shorter than the window is split exactly like
+    splitter.split_text("\\n".join(pieces)), so small documents get the same
+    chunks (and chunk IDs) as without streaming.
+
+    Args:
+        pieces: Consecutive parts of the document text
+        splitter: Splitter whose chunks are exact substrings of its input (keep_separator=True)
+        window_chars: Buffer size that triggers a split; a few times the chunk size
+
+    Yields:
+        Chunk texts in document order
+    """
+    buffer = None
+    for piece in pieces:
+        buffer = piece if buffer is None else f"{buffer}\n{piece}"
+        if len(buffer) < window_chars:
+            continue
+
+        chunks = splitter.split_text(buffer)
+        if len(chunks) < 2:
+            continue
+        # Resume from the start of the last chunk so its boundary is decided with more text
+        carry_from = buffer.rfind(chunks[-1])
+        if carry_from <= 0:
+            continue
+        yield from chunks[:-1]
+        buffer = buffer[carry_from:]
+
+    if buffer:
+        yield from splitter.split_text(buffer)
@@ -0,0 +1,199 @@
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Mersenne prime above the 32-bit shingle hashes, for MinHash's universal hashing
+_MINHASH_PRIME = (1 << 61) - 1
+
+# Words per shingle when comparing chunks for near-duplicates
+_SHINGLE_WORDS = 3
+
+# Shortest text shared by two adjacent chunks that is treated as their overlap
+_MIN_OVERLAP_CHARS = 16
+
+# Rough characters-per-token ratio used when no token counter is injected
+_CHARS_PER_TOKEN = 4
+
+
+def result_content(result: Dict) -> str:
+    """Chunk text of a search result; collections not yet migrated keep it in metadata."""
+    content = result.get("content", None)
+    if content is None and "metadata" in result:
+        content = result["metadata"].get("content", "")
+    return content or ""
+
+
+@dataclass
+class _Block:
+    """A passage of one or more consecutive chunks from the same document."""
+    text: str
+    rank: int
+    document_id: Optional[str] = None
+    first_index: Optional[int] = None
+    last_index: Optional[int] = None
+
+
+class ContextBuilder:
+    """
+    Turns ranked search results into the context passed to the LLM.
+
+    1. Adjacent chunks of the same document are merged into one passage and
+       the text they share through the splitter's overlap is kept once
+    2. Passages that are near-duplicates of a better-ranked one (MinHash
+       estimate of their word-shingle Jaccard similarity) are dropped
+    3. Passages are added in rank order until the token budget is spent
+
+    Passages keep the rank of their best chunk, so the most relevant context
+    still comes first.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 0,
+        count_tokens: Optional[Callable[[str], int]] = None,
+        merge_adjacent: bool = True,
+        dedup_threshold: float = 0.85,
+        num_perm: int = 64,
+        per_chunk_overhead: int = 8
+    ):
+        """
+        Initialize the context builder.
+
+        Args:
+            max_tokens: Token budget for all passages together (0 disables the budget)
+            count_tokens: Counts the tokens of a text for the LLM (defaults to a character estimate)
+            merge_adjacent: Merge consecutive chunks of the same document
+            dedup_threshold: Estimated Jaccard similarity at which a passage is dropped (above 1 disables)
+            num_perm: MinHash signature length; more is more precise and slower
+            per_chunk_overhead: Tokens the prompt adds around each passage
+        """
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens or (lambda text: max(1, len(text) // _CHARS_PER_TOKEN))
+        self.merge_adjacent = merge_adjacent
+        self.dedup_threshold = dedup_threshold
+        self.per_chunk_overhead = per_chunk_overhead
+        rng = np.random.default_rng(0)
+        self._hash_a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._hash_b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def build(self, results: List[Dict]) -> List[str]:
+        """
+        Assemble context passages from search results.
+
+        Args:
+            results: Search results in the shape returned by VectorStore.search, best first
+
+        Returns:
+            Passage texts, most relevant first
+        """
+        blocks = []
+        for rank, result in enumerate(results):
+            text = result_content(result)
+            if not text:
+                continue
+            metadata = result.get("metadata") or {}
+            index = metadata.get("chunk_index")
+            blocks.append(_Block(
+                text=text,
+                rank=rank,
+                document_id=metadata.get("document_id"),
+                first_index=index if isinstance(index, int) else None,
+                last_index=index if isinstance(index, int) else None
+            ))
+
+        if self.merge_adjacent:
+            blocks = self._merge(blocks)
+        if self.dedup_threshold <= 1.0:
+            blocks = self._deduplicate(blocks)
+        return self._fit_budget([block.text for block in blocks])
+
+    def _merge(self, blocks: List[_Block]) -> List[_Block]:
+        """Merge runs of consecutive chunks from the same document, keeping rank order."""
+        merged: List[_Block] = []
+        by_document: Dict[str, List[_Block]] = {}
+        for block in blocks:
+            if block.document_id is None or block.first_index is None:
+                merged.append(block)
+            else:
+                by_document.setdefault(block.document_id, []).append(block)
+
+        for document_blocks in by_document.values():
+            document_blocks.sort(key=lambda b: b.first_index)
+            current = document_blocks[0]
+            for block in document_blocks[1:]:
+                if block.first_index <= current.last_index + 1:
+                    if block.last_index > current.last_index:
+                        current.text = self._join(current.text, block.text)
+                        current.last_index = block.last_index
+                    current.rank = min(current.rank, block.rank)
+                else:
+                    merged.append(current)
+                    current = block
+            merged.append(current)
+
+        merged.sort(key=lambda b: b.rank)
+        return merged
+
+    @staticmethod
+    def _join(first: str, second: str) -> str:
+        """Concatenate consecutive chunks, keeping the text they overlap on only once."""
+        for size in range(min(len(first), len(second)), _MIN_OVERLAP_CHARS - 1, -1):
+            if first.endswith(second[:size]):
+                return first + second[size:]
+        return f"{first}\n{second}"
+
+    def _deduplicate(self, blocks: List[_Block]) -> List[_Block]:
+        """Drop passages too similar to a better-ranked one that was kept."""
+        kept: List[_Block] = []
+        signatures: List[np.ndarray] = []
+        for block in blocks:
+            signature = self._signature(block.text)
+            if any(np.mean(signature == other) >= self.dedup_threshold for other in signatures):
+                continue
+            kept.append(block)
+            signatures.append(signature)
+        return kept
+
+    def _signature(self, text: str) -> np.ndarray:
+        """MinHash signature of the text's lowercase word shingles."""
+        words = text.lower().split()
+        shingles = {" ".join(words[i:i + _SHINGLE_WORDS]) for i in range(max(len(words) - _SHINGLE_WORDS + 1, 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        # a * hash stays below 2^63, so nothing overflows uint64 before the modulo
+        return ((np.outer(self._hash_a, hashes) + self._hash_b[:, None]) % _MINHASH_PRIME).min(axis=1)
+
+    def _fit_budget(self, passages: List[str]) -> List[str]:
+        """Keep passages in order while they fit the token budget, skipping ones that do not."""
+        if self.max_tokens <= 0:
+            return passages
+
+        selected = []
+        remaining = self.max_tokens
+        for passage in passages:
+            cost = self.count_tokens(passage) + self.per_chunk_overhead
+            if cost <= remaining:
+                selected.append(passage)
+                remaining -= cost
+            elif not selected:
+                # Never send an empty context just because the best passage is long
+                passage = self._truncate(passage, remaining - self.per_chunk_overhead)
+                if passage:
+                    selected.append(passage)
+                    remaining -= self.count_tokens(passage) + self.per_chunk_overhead
+        return selected
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Cut a text until it fits max_tokens, shortening by its measured chars-per-token ratio."""
+        if max_tokens <= 0:
+            return ""
+        tokens = self.count_tokens(text)
+        while text and tokens > max_tokens:
+            text = text[:max(int(len(text) * max_tokens / tokens * 0.95), 0)]
+            tokens = self.count_tokens(text)
+        return text
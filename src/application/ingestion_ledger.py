@@ -0,0 +1,364 @@
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from domain.models.document import hash_file, new_document_id
+
+# File statuses recorded in the ledger
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class FileRecord:
+    """Ledger entry for an ingested file and the document its chunks belong to."""
+    path: str
+    content_hash: str
+    mtime: float
+    size: int
+    document_id: Optional[str] = None
+    status: str = STATUS_DONE
+    chunk_count: int = 0
+    duration_seconds: float = 0.0
+    error: Optional[str] = None
+    updated_at: float = 0.0
+
+
+@dataclass
+class PendingFile:
+    """
+    A new, modified or previously failed file waiting to be parsed and embedded.
+
+    document_id is the ID its chunks are stored under: that of the record it
+    replaces, or a fresh one for a file the ledger has not seen.
+    """
+    path: Path
+    content_hash: str
+    mtime: float
+    size: int
+    replaces: Optional[FileRecord] = None
+    document_id: str = field(default_factory=new_document_id)
+    started_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class RenamedFile:
+    """A file whose content is already stored under a different path."""
+    previous: FileRecord
+    current: FileRecord
+
+
+@dataclass
+class SyncPlan:
+    """
+    Work needed to bring the vector store in line with the files on disk.
+
+    Attributes:
+        to_process: Files that are new, changed or failed last time, with the record they replace (if any)
+        renamed: Pairs of (old record, new record) for files that only moved
+        removed: Records whose file no longer exists
+        unchanged: Number of files that need no work
+    """
+    to_process: List[PendingFile]
+    renamed: List[RenamedFile]
+    removed: List[FileRecord]
+    unchanged: int
+
+
+def _document_id_of(record: Optional[FileRecord]) -> str:
+    """The document ID a file keeps, or a fresh one for a file ingested before IDs were recorded."""
+    return record.document_id if record and record.document_id else new_document_id()
+
+
+class IngestionLedger:
+    """
+    Transactional record of ingested files, stored in SQLite in WAL mode.
+
+    Each file is fingerprinted by its SHA-256; mtime and size act as a cheap
+    first check so unchanged files are never re-read. Every update is a single
+    row upsert, so recording a file costs the same no matter how many files
+    the ledger already holds, and a crash can never leave it half-written.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            mtime REAL NOT NULL,
+            size INTEGER NOT NULL,
+            document_id TEXT,
+            status TEXT NOT NULL,
+            chunk_count INTEGER NOT NULL DEFAULT 0,
+            duration_seconds REAL NOT NULL DEFAULT 0,
+            error TEXT,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS files_content_hash ON files (content_hash);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    _COLUMNS = (
+        "path", "content_hash", "mtime", "size", "document_id", "status",
+        "chunk_count", "duration_seconds", "error", "updated_at"
+    )
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Written from the pipeline's writer thread as well as the main thread
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+        self._import_legacy_files()
+
+    def plan(self, files: List[Path], retry_failed_only: bool = False, reprocess_all: bool = False) -> SyncPlan:
+        """
+        Compare the files on disk with the ledger.
+
+        Args:
+            files: Supported files currently present in the source directory
+            retry_failed_only: Only schedule files whose last attempt failed
+            reprocess_all: Schedule unchanged files too (e.g. after changing chunk settings)
+
+        Returns:
+            SyncPlan: Files to (re)process, renamed files and removed files
+        """
+        records = self.records()
+
+        if retry_failed_only:
+            to_process = []
+            for file_path in files:
+                record = records.get(str(file_path))
+                if record and record.status == STATUS_FAILED:
+                    to_process.append(self._pending(file_path, record))
+            return SyncPlan(to_process=to_process, renamed=[], removed=[], unchanged=len(files) - len(to_process))
+
+        to_process: List[PendingFile] = []
+        unchanged = 0
+        seen = set()
+        new_files: List[PendingFile] = []
+
+        for file_path in files:
+            key = str(file_path)
+            seen.add(key)
+            stat = file_path.stat()
+            record = records.get(key)
+
+            if record and (record.status == STATUS_FAILED or reprocess_all):
+                to_process.append(self._pending(file_path, record))
+                continue
+
+            # Cheap check: same size and mtime means same content
+            if record and record.size == stat.st_size and record.mtime == stat.st_mtime:
+                unchanged += 1
+                continue
+
+            content_hash = hash_file(file_path)
+            if record and record.content_hash == content_hash:
+                # Touched but not modified; refresh the fingerprint only
+                record.mtime = stat.st_mtime
+                record.size = stat.st_size
+                self.put(record)
+                unchanged += 1
+                continue
+
+            pending = PendingFile(
+                path=file_path,
+                content_hash=content_hash,
+                mtime=stat.st_mtime,
+                size=stat.st_size,
+                replaces=record,
+                document_id=_document_id_of(record)
+            )
+            if record:
+                to_process.append(pending)
+            else:
+                new_files.append(pending)
+
+        # Records whose file disappeared are either renames or removals
+        missing: Dict[str, List[FileRecord]] = {}
+        for key, record in records.items():
+            if key not in seen and record.status == STATUS_DONE:
+                missing.setdefault(record.content_hash, []).append(record)
+
+        renamed: List[RenamedFile] = []
+        for pending in new_files:
+            candidates = missing.get(pending.content_hash)
+            if candidates:
+                previous = candidates.pop()
+                renamed.append(RenamedFile(
+                    previous=previous,
+                    current=FileRecord(
+                        path=str(pending.path),
+                        content_hash=pending.content_hash,
+                        mtime=pending.mtime,
+                        size=pending.size,
+                        document_id=previous.document_id,
+                        chunk_count=previous.chunk_count,
+                        duration_seconds=previous.duration_seconds
+                    )
+                ))
+            else:
+                to_process.append(pending)
+
+        removed = [record for records in missing.values() for record in records]
+        # Failed files that vanished may have left the previous version's vectors or partly written
+        # chunks, all under the document ID their record keeps
+        removed.extend(
+            record for key, record in records.items()
+            if key not in seen and record.status == STATUS_FAILED
+        )
+        return SyncPlan(to_process=to_process, renamed=renamed, removed=removed, unchanged=unchanged)
+
+    def records(self) -> Dict[str, FileRecord]:
+        """Load every ledger entry keyed by path."""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(self._COLUMNS)} FROM files").fetchall()
+        return {row[0]: FileRecord(*row) for row in rows}
+
+    def put(self, record: FileRecord) -> None:
+        """Insert or replace the ledger entry for a file."""
+        record.updated_at = time.time()
+        placeholders = ", ".join("?" for _ in self._COLUMNS)
+        values = tuple(getattr(record, column) for column in self._COLUMNS)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO files ({', '.join(self._COLUMNS)}) VALUES ({placeholders})",
+                values
+            )
+
+    def mark_done(self, pending: PendingFile, document_id: str, chunk_count: int) -> None:
+        """Record a successfully ingested file."""
+        self.put(FileRecord(
+            path=str(pending.path),
+            content_hash=pending.content_hash,
+            mtime=pending.mtime,
+            size=pending.size,
+            document_id=document_id,
+            status=STATUS_DONE,
+            chunk_count=chunk_count,
+            duration_seconds=time.time() - pending.started_at
+        ))
+
+    def mark_failed(self, pending: PendingFile, error: str) -> None:
+        """
+        Record a failed attempt so the file is retried on the next run.
+
+        The record keeps the document ID the attempt stored chunks under, so
+        a retry replaces them and they can be deleted if the file is removed.
+        """
+        self.put(FileRecord(
+            path=str(pending.path),
+            content_hash=pending.content_hash,
+            mtime=pending.mtime,
+            size=pending.size,
+            document_id=pending.document_id,
+            status=STATUS_FAILED,
+            duration_seconds=time.time() - pending.started_at,
+            error=error
+        ))
+
+    def generation(self) -> int:
+        """Counter bumped every time ingestion changes the vector store."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def bump_generation(self) -> int:
+        """Record that the vector store changed, invalidating answers cached against it."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('generation', 1) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+            )
+            return self._conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _pending(self, file_path: Path, record: FileRecord) -> PendingFile:
+        """Schedule a known file again (failed or forced), replacing whatever it last stored."""
+        stat = file_path.stat()
+        return PendingFile(
+            path=file_path,
+            content_hash=hash_file(file_path),
+            mtime=stat.st_mtime,
+            size=stat.st_size,
+            replaces=record if record.document_id else None,
+            document_id=_document_id_of(record)
+        )
+
+    def _import_legacy_files(self) -> None:
+        """Adopt the paths listed in processed_files.json into an empty ledger."""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM files LIMIT 1").fetchone():
+                return
+
+        legacy_path = self.db_path.parent / "processed_files.json"
+        if not legacy_path.exists():
+            return
+        try:
+            with open(legacy_path, "r") as f:
+                legacy_paths = json.load(f)
+        except json.JSONDecodeError:
+            print(f"Warning: Could not parse {legacy_path}; not importing it.")
+            return
+        # Legacy entries have no document ID, so their vectors cannot be replaced later
+        for path in legacy_paths:
+            file_path = Path(path)
+            if file_path.exists():
+                stat = file_path.stat()
+                self.put(FileRecord(
+                    path=path,
+                    content_hash=hash_file(file_path),
+                    mtime=stat.st_mtime,
+                    size=stat.st_size
+                ))
+        print(f"Imported {len(self.records())} file(s) from {legacy_path}")
+
+
+class LedgerReader:
+    """
+    Read-only view of the ledger for processes that only answer questions.
+
+    Opening an IngestionLedger creates its schema and imports the legacy
+    processed_files.json; answering processes only need the generation
+    counter, so they read it through this instead. Until ingestion has
+    created the ledger, the generation is 0.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def generation(self) -> int:
+        """Counter bumped every time ingestion changes the vector store."""
+        with self._lock:
+            if self._conn is None:
+                if not self.db_path.exists():
+                    return 0
+                self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+                self._conn.execute("PRAGMA query_only = ON")
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
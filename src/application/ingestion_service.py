@@ -1,17 +1,140 @@
-import json
-import os
-import uuid
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Set
-
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from typing import TYPE_CHECKING, List, Dict, Optional, Set, Tuple
 
+from application.chunking import split_stream
+from application.ingestion_ledger import STATUS_DONE, FileRecord, IngestionLedger, PendingFile, SyncPlan
+from application.pipeline import PipelineReport, PipelineSettings, StageStats
 from domain.interfaces.document_parser import DocumentParser
 from domain.interfaces.embedding_generator import EmbeddingGenerator
-from domain.interfaces.vector_store import VectorStore
-from domain.models.document import Chunk
+from domain.interfaces.lexical_index import LexicalIndex
+from domain.interfaces.tracer import NullTracer, Span, Tracer
+from domain.interfaces.vector_store import VectorStore, VectorWriteError
+from domain.models.document import Chunk, Document, chunk_id_for, tag_key, tag_metadata
 from infrastructure.config import PROCESSED_DATA_PATH
 
+if TYPE_CHECKING:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# Marks the end of a stage's input queue
+_SENTINEL = object()
+
+# Text splitters cached per worker process, keyed by (chunk_size, chunk_overlap)
+_splitters: Dict[Tuple[int, int], "RecursiveCharacterTextSplitter"] = {}
+
+# Parsed text buffered before splitting, in chunks' worth of characters
+_SPLIT_WINDOW_CHUNKS = 16
+
+# How long the parse stage waits for a worker event before checking for crashed workers
+_WORKER_CHECK_SECONDS = 1.0
+
+
+@dataclass
+class _DocumentPart:
+    """Consecutive chunk texts of one document, handed from the parse stage downstream."""
+    document: Document
+    texts: List[str]
+    start_index: int
+    # Set on a document's last part only
+    final: bool = False
+    previous_parts: int = 0
+    chunk_ids: List[str] = field(default_factory=list)
+    # Set on the final part the parse stage sends for a file that failed after some of its parts were sent
+    error: Optional[Exception] = None
+    error_stats: Optional[StageStats] = None
+
+
+@dataclass
+class _EmbeddedPart:
+    """A document part with the chunks built from it, ready for the writer."""
+    pending: PendingFile
+    part: _DocumentPart
+    chunks: List[Chunk] = field(default_factory=list)
+    new_chunks: List[Chunk] = field(default_factory=list)
+    embeddings: List[List[float]] = field(default_factory=list)
+    failed: bool = False
+    # Why an earlier stage failed the part, and that stage's statistics; the writer records it
+    error: Optional[Exception] = None
+    error_stats: Optional[StageStats] = None
+
+
+@dataclass
+class _FileProgress:
+    """What the writer has seen of one file's parts."""
+    pending: PendingFile
+    document_id: str
+    settled_parts: int = 0
+    failed: bool = False
+    # Whether any part added new chunks to the store, which a failed file must not leave behind
+    written: bool = False
+    final: Optional[_EmbeddedPart] = None
+
+
+def _parse_and_split(
+    parser: DocumentParser,
+    file_path: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    events,
+    part_chunks: int = 0,
+    content_hash: Optional[str] = None
+) -> None:
+    """
+    Parse a file page by page and split it into chunk texts as it goes.
+
+    Runs inside the parse worker pool, so it must stay a module-level function
+    and only receive picklable arguments. Results are reported on the events
+    queue as (file_path, kind, payload), in order:
+    - ("part", part) every part_chunks chunks, so large documents are
+      embedded while the rest is still being parsed
+    - ("done", (final_part, seconds)) with the remaining chunks, or
+      ("error", exception) if the file could not be parsed
+    """
+    started = time.perf_counter()
+    try:
+        splitter = _splitters.get((chunk_size, chunk_overlap))
+        if splitter is None:
+            # Imported here so only the processes that split text pay for langchain
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+            splitter = RecursiveCharacterTextSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap
+            )
+            _splitters[(chunk_size, chunk_overlap)] = splitter
+
+        document = parser.describe(file_path)
+        texts: List[str] = []
+        chunk_ids: List[str] = []
+        parts = 0
+        # The ledger already hashed the file, so a parse cache need not read it again
+        pages = parser.parse_pages(file_path, content_hash)
+        for text in split_stream(pages, splitter, chunk_size * _SPLIT_WINDOW_CHUNKS):
+            chunk_ids.append(chunk_id_for(len(chunk_ids), text))
+            texts.append(text)
+            if len(texts) >= part_chunks > 0:
+                # Blocks when the parse stage falls behind, bounding the parts held in memory
+                events.put((file_path, "part", _DocumentPart(document, texts, len(chunk_ids) - len(texts))))
+                texts = []
+                parts += 1
+    except Exception as e:
+        events.put((file_path, "error", e))
+        return
+
+    final = _DocumentPart(
+        document,
+        texts,
+        len(chunk_ids) - len(texts),
+        final=True,
+        previous_parts=parts,
+        chunk_ids=chunk_ids
+    )
+    events.put((file_path, "done", (final, time.perf_counter() - started)))
+
 
 class IngestionService:
     def __init__(
@@ -20,90 +143,589 @@ class IngestionService:
         embedder: EmbeddingGenerator,
         store: VectorStore,
         chunk_size: int = 1000,
-        chunk_overlap: int = 200
+        chunk_overlap: int = 200,
+        settings: Optional[PipelineSettings] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        tracer: Optional[Tracer] = None
     ):
         self.parser = parser
         self.embedder = embedder
         self.store = store
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
-        )
-        self.processed_files: Set[str] = set()
-        self._load_processed_files()
-    
-    def run(self, directory_path: str) -> None:
+        self.lexical_index = lexical_index
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.settings = settings or PipelineSettings()
+        self.ledger = IngestionLedger(PROCESSED_DATA_PATH / "ingestion.db")
+        self.tracer = tracer or NullTracer()
+        # Span of the current run; stages run in other threads, so their spans name it as parent
+        self._run_span: Optional[Span] = None
+
+    def run(self, directory_path: str, retry_failed_only: bool = False, reprocess_all: bool = False) -> PipelineReport:
         """
-        Process all supported files in the directory and its subdirectories.
-        
+        Synchronize the vector store with the supported files in the directory tree.
+
+        Files are compared with the ingestion ledger first: unchanged files
+        are skipped, renamed files only get their metadata updated and removed
+        files have their vectors deleted. New, modified and previously failed
+        files flow through
+        three stages connected by bounded queues:
+        1. Parse: a process pool parses and splits files into chunk texts,
+           handing large documents on in parts while they are still being parsed
+        2. Embed: a pool of threads generates embeddings for each document
+        3. Write: a single writer batches chunks into the vector store
+           (and the lexical index, if one is configured)
+
+        The run, and every parse, embed call, write and finished document in
+        it, is reported to the tracer as a span.
+
         Args:
             directory_path: Path to the directory containing documents to process
+            retry_failed_only: Only retry files whose previous attempt failed
+            reprocess_all: Re-chunk and re-embed unchanged files too
+
+        Returns:
+            PipelineReport: Per-stage throughput statistics for this run
         """
         directory = Path(directory_path)
-        
+
         # Ensure directory exists
         if not directory.exists() or not directory.is_dir():
             raise ValueError(f"Directory {directory_path} does not exist or is not a directory")
-        
+
+        with self.tracer.span("ingest.run") as run_span:
+            self._run_span = run_span
+            try:
+                report = self._synchronize(directory, retry_failed_only, reprocess_all)
+            finally:
+                self._run_span = None
+            if run_span.recording:
+                run_span.set("skipped", report.skipped)
+                run_span.set("documents", report.stages["write"].documents)
+                run_span.set("chunks", report.stages["write"].chunks)
+                run_span.set("errors", sum(stats.errors for stats in report.stages.values()))
+        return report
+
+    def _synchronize(self, directory: Path, retry_failed_only: bool, reprocess_all: bool) -> PipelineReport:
+        """Apply the ledger's plan for the directory and run the changed files through the pipeline."""
+        report = PipelineReport()
+        run_started = time.perf_counter()
+
         # Walk through all files in the directory and subdirectories
-        for file_path in self._get_supported_files(directory):
-            # Skip if already processed
-            if str(file_path) in self.processed_files:
-                print(f"Skipping already processed file: {file_path}")
-                continue
-            
+        plan = self.ledger.plan(self._get_supported_files(directory), retry_failed_only, reprocess_all)
+        report.skipped = plan.unchanged
+        self._apply_renames_and_removals(plan, report)
+        pending_files = plan.to_process
+
+        settings = self.settings
+        parse_stats = report.add_stage("parse", settings.parse_workers)
+        embed_stats = report.add_stage("embed", settings.embed_workers)
+        write_stats = report.add_stage("write", 1)
+
+        embed_queue: "queue.Queue" = queue.Queue(maxsize=settings.queue_size)
+        write_queue: "queue.Queue" = queue.Queue(maxsize=settings.queue_size)
+
+        embed_threads = [
+            threading.Thread(
+                target=self._embed_worker,
+                args=(embed_queue, write_queue, embed_stats),
+                name=f"ingest-embed-{i}",
+                daemon=True
+            )
+            for i in range(max(settings.embed_workers, 1))
+        ]
+        writer_thread = threading.Thread(
+            target=self._write_worker,
+            args=(write_queue, write_stats),
+            name="ingest-writer",
+            daemon=True
+        )
+        for thread in embed_threads:
+            thread.start()
+        writer_thread.start()
+
+        try:
+            self._parse_stage(pending_files, embed_queue, parse_stats)
+        finally:
+            # Drain the downstream stages in order
+            for _ in embed_threads:
+                embed_queue.put(_SENTINEL)
+            for thread in embed_threads:
+                thread.join()
+            write_queue.put(_SENTINEL)
+            writer_thread.join()
+
+            # Let answer caches know the collection changed
+            if report.renamed or report.removed or report.stages["write"].documents:
+                self.ledger.bump_generation()
+
+        report.total_seconds = time.perf_counter() - run_started
+        return report
+
+    def _apply_renames_and_removals(self, plan: SyncPlan, report: PipelineReport) -> None:
+        """Update metadata of moved files and delete vectors of removed files."""
+        for renamed in plan.renamed:
+            previous, current = renamed.previous, renamed.current
             try:
-                print(f"Processing: {file_path}")
-                
-                # Parse document
-                document = self.parser.parse(str(file_path))
-                
-                # Chunk document
-                texts = self.text_splitter.split_text(document.content)
-                
-                # Create chunks with metadata
-                chunks = []
-                chunk_metadatas = []
-                
-                for i, text in enumerate(texts):
-                    chunk_id = str(uuid.uuid4())
-                    
-                    # Create metadata for the chunk
-                    metadata = {
-                        "document_id": document.id,
-                        "chunk_id": chunk_id,
-                        "tags": ",".join(document.tags),  # Currently a single tag from parent dir, but supports multiple tags in future
+                if previous.document_id:
+                    document = self.parser.describe(current.path)
+                    old_tags = self.parser.describe(previous.path).tags
+                    updates = {
+                        # Stores merge updates, so remove the keys of tags the file no longer carries
+                        **{tag_key(tag): None for tag in old_tags if tag not in document.tags},
+                        **tag_metadata(document.tags),
+                        "tags": ",".join(document.tags),
                         "filename": document.name,
-                        "path": document.path,
-                        "chunk_index": i,
-                        "content": text  # Include the text content in metadata
+                        "path": document.path
                     }
-                    
-                    # Create Chunk object for domain model (not used directly here but useful for other services)
-                    chunk = Chunk(
-                        document_id=document.id,
-                        chunk_id=chunk_id,
-                        content=text,
-                        metadata=metadata
-                    )
-                    
-                    chunks.append(chunk)
-                    chunk_metadatas.append(metadata)
-                
-                # Generate embeddings for all chunks
-                texts_to_embed = [chunk.content for chunk in chunks]
-                embeddings = self.embedder.embed(texts_to_embed)
-                
-                # Store embeddings with metadata
-                self.store.add_documents(embeddings, chunk_metadatas)
-                
-                # Mark file as processed
-                self._mark_as_processed(str(file_path))
-                print(f"Successfully processed: {file_path}")
-                
+                    self.store.update_document_metadata(previous.document_id, updates)
+                    if self.lexical_index:
+                        self.lexical_index.update_document_metadata(previous.document_id, updates)
+            except Exception as e:
+                print(f"Warning: Failed to update renamed file {current.path}: {str(e)}")
+                continue
+            self.ledger.remove(previous.path)
+            self.ledger.put(current)
+            report.renamed += 1
+            print(f"Renamed: {previous.path} -> {current.path}")
+
+        for record in plan.removed:
+            try:
+                self._delete_vectors(record)
             except Exception as e:
-                print(f"Warning: Failed to process {file_path}: {str(e)}")
-    
+                print(f"Warning: Failed to delete vectors for {record.path}: {str(e)}")
+                continue
+            self.ledger.remove(record.path)
+            report.removed += 1
+            print(f"Removed: {record.path}")
+
+    def _delete_vectors(self, record: FileRecord) -> None:
+        """Delete the vectors (and lexical index entries) stored for a ledger record."""
+        if record.document_id:
+            self.store.delete_document(record.document_id)
+            if self.lexical_index:
+                self.lexical_index.delete_document(record.document_id)
+        elif record.status == STATUS_DONE:
+            print(f"Warning: {record.path} was ingested before the ledger existed; its old vectors cannot be located")
+
+    def _parse_stage(self, files: List[PendingFile], embed_queue: "queue.Queue", stats: StageStats) -> None:
+        """
+        Parse files in the worker pool and feed the results to the embed stage.
+
+        Workers report parts of large documents, finished documents and errors
+        on one queue, so a document's parts always arrive before its end.
+        """
+        settings = self.settings
+        executor: Executor
+        manager = None
+        if settings.parse_workers > 0:
+            executor = ProcessPoolExecutor(max_workers=settings.parse_workers)
+            # Worker processes can only share a queue through a manager
+            manager = multiprocessing.Manager() if files else None
+        else:
+            executor = ThreadPoolExecutor(max_workers=1)
+        events = manager.Queue(settings.queue_size) if manager else queue.Queue(settings.queue_size)
+
+        # Keep a bounded number of parse jobs in flight so results cannot pile up
+        max_in_flight = max(settings.parse_workers, 1) + settings.queue_size
+        in_flight: Dict[str, Tuple[Future, PendingFile]] = {}
+        # Parts already sent downstream for files still being parsed
+        sent_parts: Dict[str, Tuple[Document, int]] = {}
+
+        def forward(pending: PendingFile, part: _DocumentPart) -> None:
+            # Store chunks under the ID the ledger keeps for the file (renamed files keep theirs)
+            part.document.id = pending.document_id
+            if not part.final:
+                _, parts = sent_parts.get(str(pending.path), (part.document, 0))
+                sent_parts[str(pending.path)] = (part.document, parts + 1)
+            # Blocks when the embed stage falls behind
+            embed_queue.put((pending, part))
+
+        def fail(pending: PendingFile, error: Exception) -> None:
+            sent = sent_parts.pop(str(pending.path), None)
+            if sent is None:
+                self._record_failure(pending, stats, error)
+                return
+            # Sent after the file's other parts, so the writer records the failure and deletes what they stored
+            document, parts = sent
+            embed_queue.put((pending, _DocumentPart(
+                document,
+                [],
+                0,
+                final=True,
+                previous_parts=parts,
+                error=error,
+                error_stats=stats
+            )))
+
+        def handle_event() -> None:
+            try:
+                file_path, kind, payload = events.get(timeout=_WORKER_CHECK_SECONDS)
+            except queue.Empty:
+                # Workers that died without reporting (e.g. a crashed process) never send an event
+                for file_path, (future, pending) in list(in_flight.items()):
+                    if future.done() and future.exception() is not None:
+                        del in_flight[file_path]
+                        fail(pending, future.exception())
+                return
+
+            pending = in_flight[file_path][1]
+            if kind == "part":
+                forward(pending, payload)
+                return
+            del in_flight[file_path]
+            if kind == "error":
+                fail(pending, payload)
+                return
+            sent_parts.pop(file_path, None)
+            part, seconds = payload
+            stats.record(1, len(part.chunk_ids), seconds)
+            # Timed inside the worker process, so reported after the fact
+            self.tracer.record(
+                "ingest.parse",
+                seconds,
+                {"path": str(pending.path), "bytes": pending.size, "chunks": len(part.chunk_ids)},
+                parent=self._run_span
+            )
+            forward(pending, part)
+
+        try:
+            with executor:
+                for pending in files:
+                    print(f"Processing: {pending.path}")
+                    future = executor.submit(
+                        _parse_and_split,
+                        self.parser,
+                        str(pending.path),
+                        self.chunk_size,
+                        self.chunk_overlap,
+                        events,
+                        settings.part_chunks,
+                        pending.content_hash
+                    )
+                    in_flight[str(pending.path)] = (future, pending)
+                    while len(in_flight) >= max_in_flight:
+                        handle_event()
+                while in_flight:
+                    handle_event()
+        finally:
+            if manager is not None:
+                manager.shutdown()
+
+    def _embed_worker(self, embed_queue: "queue.Queue", write_queue: "queue.Queue", stats: StageStats) -> None:
+        """
+        Generate embeddings for parsed documents until the sentinel arrives.
+
+        Documents already waiting in the queue are gathered into a single embed
+        call (up to embed_batch_size chunks), so many small files share requests
+        instead of paying one round trip each.
+        """
+        finished = False
+        while not finished:
+            group = [embed_queue.get()]
+            if group[0] is _SENTINEL:
+                return
+
+            group_chunks = len(group[0][1].texts)
+            while group_chunks < self.settings.embed_batch_size:
+                try:
+                    item = embed_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _SENTINEL:
+                    finished = True
+                    break
+                group.append(item)
+                group_chunks += len(item[1].texts)
+
+            self._embed_group(group, write_queue, stats)
+
+    def _embed_group(
+        self,
+        group: List[Tuple[PendingFile, _DocumentPart]],
+        write_queue: "queue.Queue",
+        stats: StageStats
+    ) -> None:
+        """
+        Embed the chunks of several document parts in one call and hand each part to the writer.
+
+        Chunk IDs are derived from the document, position and text, so chunks
+        the store already holds are skipped before any embedding request.
+        """
+        for pending, part in group:
+            if part.error is not None:
+                write_queue.put(_EmbeddedPart(pending, part, failed=True, error=part.error, error_stats=part.error_stats))
+        group = [(pending, part) for pending, part in group if part.error is None]
+        if not group:
+            return
+        try:
+            with self.tracer.span("ingest.embed", {"parts": len(group)}, parent=self._run_span) as span:
+                started = time.perf_counter()
+                built = []
+                for pending, part in group:
+                    chunks = self._build_chunks(part.document, part.texts, part.start_index)
+                    stored = self.store.existing_chunk_ids(part.document.id, [chunk.chunk_id for chunk in chunks])
+                    new_chunks = [chunk for chunk in chunks if chunk.chunk_id not in stored]
+                    stats.record_reused(len(chunks) - len(new_chunks))
+                    built.append(_EmbeddedPart(pending, part, chunks, new_chunks))
+
+                # Generate embeddings for the new chunks of all parts in the group
+                texts_to_embed = [chunk.content for item in built for chunk in item.new_chunks]
+                embeddings = self.embedder.embed(texts_to_embed) if texts_to_embed else []
+                stats.record(sum(part.final for _, part in group), len(texts_to_embed), time.perf_counter() - started)
+                if span.recording:
+                    span.set("chunks", len(texts_to_embed))
+                    span.set("reused_chunks", sum(len(item.chunks) - len(item.new_chunks) for item in built))
+                    span.set("bytes", sum(len(text.encode("utf-8")) for text in texts_to_embed))
+        except Exception as e:
+            for pending, part in group:
+                # The writer settles the part and records the failure once per file
+                write_queue.put(_EmbeddedPart(pending, part, failed=True, error=e, error_stats=stats))
+            return
+
+        offset = 0
+        for item in built:
+            item.embeddings = embeddings[offset:offset + len(item.new_chunks)]
+            offset += len(item.new_chunks)
+            write_queue.put(item)
+
+    def _write_worker(self, write_queue: "queue.Queue", stats: StageStats) -> None:
+        """Batch embedded chunks into the vector store until the sentinel arrives."""
+        batch: List[_EmbeddedPart] = []
+        batch_chunks = 0
+        progress: Dict[str, _FileProgress] = {}
+        # Final parts of settled documents whose chunks the store still buffers, by document ID
+        unflushed: Dict[str, _EmbeddedPart] = {}
+
+        while True:
+            item = write_queue.get()
+            if item is not _SENTINEL:
+                batch.append(item)
+                batch_chunks += len(item.embeddings)
+                if batch_chunks < self.settings.write_batch_size:
+                    continue
+            if batch:
+                self._write_batch(batch, progress, unflushed, stats)
+                batch = []
+                batch_chunks = 0
+            if item is _SENTINEL:
+                try:
+                    self.store.flush()
+                except VectorWriteError as e:
+                    self._fail_documents(e.document_ids, progress, unflushed, stats, e)
+                except Exception as e:
+                    self._fail_documents(set(unflushed), progress, unflushed, stats, e)
+                self._finish_written(unflushed, stats)
+                return
+
+    def _write_batch(
+        self,
+        batch: List[_EmbeddedPart],
+        progress: Dict[str, _FileProgress],
+        unflushed: Dict[str, _EmbeddedPart],
+        stats: StageStats
+    ) -> None:
+        """
+        Hand a batch of document parts to the vector store in one call and finish documents that are stored.
+
+        Parts of one document may reach the writer in any order, since several
+        embed workers run at once. A document is only cleaned up and recorded
+        in the ledger once its final part and every part before it are settled
+        and the store no longer buffers any of its chunks.
+        """
+        for item in batch:
+            # Created up front, so a failed write can find every file it concerns
+            file_progress = self._progress_of(progress, item)
+            if item.error is not None:
+                self._fail_part(item, progress, item.error_stats or stats, item.error)
+            elif file_progress.failed:
+                # Its chunks would only be deleted again once the file's parts are settled
+                item.failed = True
+        written = [item for item in batch if not item.failed]
+        embeddings: List[List[float]] = []
+        metadatas: List[Dict] = []
+        contents: List[str] = []
+        for item in written:
+            embeddings.extend(item.embeddings)
+            metadatas.extend(chunk.metadata for chunk in item.new_chunks)
+            contents.extend(chunk.content for chunk in item.new_chunks)
+
+        started = time.perf_counter()
+        try:
+            if embeddings:
+                with self.tracer.span("ingest.write", {"chunks": len(embeddings)}, parent=self._run_span) as span:
+                    # Store embeddings with metadata; the chunk text is stored once, outside the metadata
+                    self.store.add_documents(embeddings, metadatas, contents)
+                    if span.recording:
+                        span.set("bytes", sum(len(content.encode("utf-8")) for content in contents))
+        except VectorWriteError as e:
+            # A buffered write failed; it may have carried chunks of earlier batches too
+            self._fail_documents(e.document_ids, progress, unflushed, stats, e)
+            for item in written:
+                item.failed = self._progress_of(progress, item).failed
+            written = [item for item in written if not item.failed]
+        except Exception as e:
+            for item in written:
+                self._fail_part(item, progress, stats, e)
+            written = []
+        for item in written:
+            if item.new_chunks:
+                self._progress_of(progress, item).written = True
+        if written:
+            # Documents are counted once they are finished, since the store may still buffer them
+            stats.record(0, sum(len(item.embeddings) for item in written), time.perf_counter() - started)
+
+        for item in batch:
+            if not item.failed and self.lexical_index:
+                try:
+                    indexed = self.lexical_index.existing_chunk_ids(
+                        item.part.document.id, [chunk.chunk_id for chunk in item.chunks]
+                    )
+                    # Also fills in chunks whose vectors were stored before the lexical index existed
+                    self.lexical_index.add_chunks([chunk for chunk in item.chunks if chunk.chunk_id not in indexed])
+                except Exception as e:
+                    # Retried on the next run; its vectors are reused then
+                    self._fail_part(item, progress, stats, e)
+
+            file_progress = self._progress_of(progress, item)
+            if item.part.final:
+                file_progress.final = item
+            else:
+                file_progress.settled_parts += 1
+            final = file_progress.final
+            if final is not None and file_progress.settled_parts == final.part.previous_parts:
+                del progress[str(item.pending.path)]
+                if not file_progress.failed:
+                    unflushed[final.part.document.id] = final
+                elif file_progress.written:
+                    self._delete_partial(file_progress.pending, file_progress.document_id)
+        self._finish_written(unflushed, stats)
+
+    def _finish_written(self, unflushed: Dict[str, _EmbeddedPart], stats: StageStats) -> None:
+        """Finish the settled documents none of whose chunks are still buffered by the store."""
+        buffered = self.store.buffered_document_ids() if unflushed else set()
+        for document_id in [document_id for document_id in unflushed if document_id not in buffered]:
+            final = unflushed.pop(document_id)
+            self._finish_document(final.pending, final.part)
+            stats.record(1, 0, 0.0)
+
+    def _fail_documents(
+        self,
+        document_ids: Set[str],
+        progress: Dict[str, _FileProgress],
+        unflushed: Dict[str, _EmbeddedPart],
+        stats: StageStats,
+        error: Exception
+    ) -> None:
+        """Record the documents whose chunks a failed store write lost, whether still in progress or settled."""
+        for file_progress in progress.values():
+            if file_progress.document_id in document_ids and not file_progress.failed:
+                file_progress.failed = True
+                self._record_failure(file_progress.pending, stats, error)
+        for document_id in document_ids & unflushed.keys():
+            pending = unflushed.pop(document_id).pending
+            self._record_failure(pending, stats, error)
+            # Chunks written before the failed one are stored already
+            self._delete_partial(pending, document_id)
+
+    @staticmethod
+    def _progress_of(progress: Dict[str, _FileProgress], item: _EmbeddedPart) -> _FileProgress:
+        """The writer's progress entry for the file of a part, created on its first part."""
+        key = str(item.pending.path)
+        if key not in progress:
+            progress[key] = _FileProgress(item.pending, item.part.document.id)
+        return progress[key]
+
+    def _fail_part(
+        self,
+        item: _EmbeddedPart,
+        progress: Dict[str, _FileProgress],
+        stats: StageStats,
+        error: Exception
+    ) -> None:
+        """Mark a part failed; its file is counted and recorded as failed only for the first failing part."""
+        item.failed = True
+        file_progress = self._progress_of(progress, item)
+        if not file_progress.failed:
+            file_progress.failed = True
+            self._record_failure(item.pending, stats, error)
+
+    def _delete_partial(self, pending: PendingFile, document_id: str) -> None:
+        """
+        Delete the chunks stored for a document that failed after some of its parts were written.
+
+        A modified file keeps its document ID, so this also drops the chunks
+        of its previous version rather than leaving a mix of both; the file
+        is ingested again in full on the next run.
+        """
+        try:
+            self.store.delete_document(document_id)
+            if self.lexical_index:
+                self.lexical_index.delete_document(document_id)
+        except Exception as e:
+            print(f"Warning: Failed to delete partially stored vectors for {pending.path}: {str(e)}")
+
+    def _finish_document(self, pending: PendingFile, part: _DocumentPart) -> None:
+        """Drop what the previous version of a fully stored document left behind and record it as done."""
+        document = part.document
+        # Drop chunks of the previous version only once the new ones are stored
+        try:
+            self.store.delete_document(document.id, keep_chunk_ids=part.chunk_ids)
+            if self.lexical_index:
+                self.lexical_index.delete_document(document.id, keep_chunk_ids=part.chunk_ids)
+            if pending.replaces and pending.replaces.document_id != document.id:
+                self._delete_vectors(pending.replaces)
+        except Exception as e:
+            print(f"Warning: Failed to delete old vectors for {pending.path}: {str(e)}")
+
+        self.ledger.mark_done(pending, document.id, len(part.chunk_ids))
+        # From the ledger planning the file until it is fully stored, queueing included
+        self.tracer.record(
+            "ingest.document",
+            time.time() - pending.started_at,
+            {"path": str(pending.path), "bytes": pending.size, "chunks": len(part.chunk_ids)},
+            parent=self._run_span
+        )
+        print(f"Successfully processed: {pending.path}")
+
+    def _record_failure(self, pending: PendingFile, stats: StageStats, error: Exception) -> None:
+        """Count a failed file and record it in the ledger for a later retry."""
+        stats.record_error()
+        print(f"Warning: Failed to process {pending.path}: {str(error)}")
+        try:
+            self.ledger.mark_failed(pending, str(error))
+        except Exception as e:
+            print(f"Warning: Could not record failure for {pending.path}: {str(e)}")
+
+    def _build_chunks(self, document: Document, texts: List[str], start_index: int = 0) -> List[Chunk]:
+        """Create chunks with metadata for consecutive split texts of a document, starting at start_index."""
+        chunks = []
+
+        for i, text in enumerate(texts, start=start_index):
+            chunk_id = chunk_id_for(i, text)
+
+            # Create metadata for the chunk
+            metadata = {
+                "document_id": document.id,
+                "chunk_id": chunk_id,
+                "tags": ",".join(document.tags),  # Currently a single tag from parent dir, but supports multiple tags in future
+                "filename": document.name,
+                "path": document.path,
+                "chunk_index": i,
+                **tag_metadata(document.tags)  # One boolean key per tag for filtered search
+            }
+
+            # Create Chunk object for domain model; the writer stores its content and metadata
+            chunk = Chunk(
+                document_id=document.id,
+                chunk_id=chunk_id,
+                content=text,
+                metadata=metadata
+            )
+
+            chunks.append(chunk)
+
+        return chunks
+
     def _get_supported_files(self, directory: Path) -> List[Path]:
         """Find all supported files in directory and subdirectories."""
         files = []
@@ -111,35 +733,8 @@ class IngestionService:
             if path.is_file() and self._is_supported_file(path):
                 files.append(path)
         return files
-    
+
     def _is_supported_file(self, file_path: Path) -> bool:
         """Check if file is a supported document type."""
         supported_extensions = [".pdf", ".docx", ".txt"]
         return file_path.suffix.lower() in supported_extensions
-    
-    def _load_processed_files(self) -> None:
-        """Load the list of processed files from JSON file."""
-        processed_files_path = PROCESSED_DATA_PATH / "processed_files.json"
-        
-        # Create directory if it doesn't exist
-        processed_files_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        if processed_files_path.exists():
-            try:
-                with open(processed_files_path, "r") as f:
-                    self.processed_files = set(json.load(f))
-            except json.JSONDecodeError:
-                print(f"Warning: Could not parse {processed_files_path}. Starting with empty list.")
-                self.processed_files = set()
-        else:
-            self.processed_files = set()
-    
-    def _mark_as_processed(self, file_path: str) -> None:
-        """Mark a file as processed by adding it to the list and saving to disk."""
-        # Add to in-memory set
-        self.processed_files.add(file_path)
-        
-        # Write to disk
-        processed_files_path = PROCESSED_DATA_PATH / "processed_files.json"
-        with open(processed_files_path, "w") as f:
-            json.dump(list(self.processed_files), f, indent=2) 
\ No newline at end of file
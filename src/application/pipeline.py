@@ -0,0 +1,98 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+@dataclass
+class PipelineSettings:
+    """
+    Tuning knobs for the staged ingestion pipeline.
+
+    Attributes:
+        parse_workers: Number of processes used to parse and split files (0 parses in-process)
+        embed_workers: Number of threads issuing embedding requests concurrently
+        queue_size: Maximum number of documents buffered between two stages
+        embed_batch_size: Chunks from several documents gathered into one embed call
+        write_batch_size: Number of chunks accumulated before a write to the vector store
+        part_chunks: Chunks of a large document sent downstream while the rest is still
+            being parsed (0 waits for the whole document)
+    """
+    parse_workers: int = 4
+    embed_workers: int = 4
+    queue_size: int = 32
+    embed_batch_size: int = 1024
+    write_batch_size: int = 256
+    part_chunks: int = 512
+
+
+@dataclass
+class StageStats:
+    """Throughput counters for a single pipeline stage."""
+    name: str
+    workers: int
+    documents: int = 0
+    chunks: int = 0
+    errors: int = 0
+    reused_chunks: int = 0
+    busy_seconds: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, documents: int, chunks: int, seconds: float) -> None:
+        """Record a unit of work completed by one of the stage workers."""
+        with self._lock:
+            now = time.perf_counter()
+            if self.started_at is None:
+                self.started_at = now - seconds
+            self.finished_at = now
+            self.documents += documents
+            self.chunks += chunks
+            self.busy_seconds += seconds
+
+    def record_error(self, documents: int = 1) -> None:
+        """Record documents that failed in this stage."""
+        with self._lock:
+            self.errors += documents
+
+    def record_reused(self, chunks: int) -> None:
+        """Record chunks that were already stored and needed no work."""
+        with self._lock:
+            self.reused_chunks += chunks
+
+    @property
+    def wall_seconds(self) -> float:
+        """Elapsed time between the first and last unit of work."""
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.documents / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the stage's wall time its workers spent busy."""
+        capacity = self.wall_seconds * max(self.workers, 1)
+        return self.busy_seconds / capacity if capacity > 0 else 0.0
+
+
+@dataclass
+class PipelineReport:
+    """Summary of an ingestion run, one entry per stage."""
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    skipped: int = 0
+    renamed: int = 0
+    removed: int = 0
+    total_seconds: float = 0.0
+
+    def add_stage(self, name: str, workers: int) -> StageStats:
+        stats = StageStats(name=name, workers=workers)
+        self.stages[name] = stats
+        return stats
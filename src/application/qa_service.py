@@ -1,10 +1,21 @@
-from typing import List
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from application.answer_cache import AnswerCache
+from application.context_builder import ContextBuilder
+from application.retrieval import NO_CONTEXT_ANSWER, Retrieval, RetrievalSteps
+from domain.interfaces.lexical_index import LexicalIndex
 from domain.interfaces.llm_client import LLMClient
+from domain.interfaces.tracer import NullTracer, Span, Tracer
 from domain.interfaces.vector_store import VectorStore
 from domain.interfaces.embedding_generator import EmbeddingGenerator
 from domain.models.query import Query
 
+# ask_batch stops retrieving once this many groups of queries wait for the LLM
+_BATCH_GROUPS_AHEAD = 2
+
 
 class QAService:
     """
@@ -16,7 +27,13 @@ class QAService:
         self,
         llm: LLMClient,
         vector_store: VectorStore,
-        embedder: EmbeddingGenerator
+        embedder: EmbeddingGenerator,
+        answer_cache: Optional[AnswerCache] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        rrf_k: int = 60,
+        hybrid_candidates: int = 20,
+        context_builder: Optional[ContextBuilder] = None,
+        tracer: Optional[Tracer] = None
     ):
         """
         Initialize the QA service with its dependencies.
@@ -25,10 +42,23 @@ class QAService:
             llm: Language model client for generating answers
             vector_store: Vector database for storing and retrieving document chunks
             embedder: Embedding generator for converting text to vectors
+            answer_cache: Optional cache of answers to repeated and near-duplicate questions
+            lexical_index: Optional keyword index searched alongside the vector store (hybrid retrieval)
+            rrf_k: Reciprocal-rank fusion constant for hybrid retrieval
+            hybrid_candidates: Results taken from each retriever before fusing them
+            context_builder: Optional stage that merges, deduplicates and budgets the retrieved chunks
+            tracer: Optional tracer receiving a span per step (qa.embed, qa.search.vector, qa.llm, ...)
         """
         self.llm = llm
         self.vector_store = vector_store
         self.embedder = embedder
+        self.answer_cache = answer_cache
+        self.lexical_index = lexical_index
+        self.rrf_k = rrf_k
+        self.hybrid_candidates = hybrid_candidates
+        self.context_builder = context_builder
+        self.tracer = tracer or NullTracer()
+        self.steps = RetrievalSteps(self.tracer, lexical_index, rrf_k, hybrid_candidates, context_builder)
     
     def ask(self, query: Query) -> str:
         """
@@ -36,45 +66,272 @@ class QAService:
         
         The flow:
         1. Generate embedding for query text
-        2. Search vector store for relevant chunks
-        3. Extract content from chunks
+        2. Search vector store for relevant chunks (filtered by tags, if any),
+           fused with keyword matches when a lexical index is configured
+        3. Extract content from chunks (merged, deduplicated and fitted to a
+           token budget when a context builder is configured)
         4. Generate answer using LLM
         
+        With an answer cache, an identical question is answered before step 1
+        and a near-duplicate one right after it.
+        
         Args:
             query: The Query object containing the question and search parameters
             
         Returns:
             str: The answer to the question
         """
-        # Step 1: Generate embedding for the query text
-        query_embedding = self.embedder.embed([query.text])[0]
-        
-        # Step 2: Search for relevant chunks
-        search_results = self.vector_store.search(
-            query_embedding=query_embedding,
-            top_k=query.top_k
-        )
-        
-        # Step 3: Extract content from the retrieved chunks
-        context_chunks = []
-        for result in search_results:
-            # The content could be in 'content' field of metadata or directly in result
-            content = result.get("content", None)
-            if content is None and "metadata" in result:
-                content = result["metadata"].get("content", "")
+        with self.tracer.span("qa.ask", {"question_chars": len(query.text)}) as span:
+            # Steps 1-3: Retrieve context (or a cached answer)
+            retrieval = self._retrieve(query, span)
+            if retrieval.answer is not None:
+                return retrieval.answer
             
-            if content:
-                context_chunks.append(content)
+            # Step 4: Generate answer using LLM
+            with self.tracer.span("qa.llm") as llm_span:
+                answer = self.llm.answer(
+                    question=query.text,
+                    context_chunks=retrieval.context_chunks
+                )
+                if llm_span.recording:
+                    self.steps.describe_llm_call(llm_span, retrieval.context_chunks, answer)
+            
+            if self.answer_cache:
+                self.answer_cache.put(query, retrieval.query_embedding, answer)
+            
+            # Step 5: Return the answer
+            return answer
+    
+    def ask_stream(self, query: Query) -> Iterator[str]:
+        """
+        Process a query like ask(), yielding the answer incrementally as the LLM produces it.
         
-        # If no chunks were found, return a message
-        if not context_chunks:
-            return "I couldn't find any relevant information to answer your question."
+        Cached answers and the no-context message are yielded as a single piece.
         
-        # Step 4: Generate answer using LLM
-        answer = self.llm.answer(
-            question=query.text,
-            context_chunks=context_chunks
-        )
+        Args:
+            query: The Query object containing the question and search parameters
+            
+        Yields:
+            str: Consecutive fragments of the answer
+        """
+        with self.tracer.span("qa.ask", {"question_chars": len(query.text), "stream": True}) as span:
+            retrieval = self._retrieve(query, span)
+            if retrieval.answer is not None:
+                yield retrieval.answer
+                return
+            
+            pieces = []
+            with self.tracer.span("qa.llm", {"stream": True}) as llm_span:
+                started = time.perf_counter()
+                for piece in self.llm.stream_answer(
+                    question=query.text,
+                    context_chunks=retrieval.context_chunks
+                ):
+                    if not pieces and llm_span.recording:
+                        llm_span.set("first_token_seconds", time.perf_counter() - started)
+                    pieces.append(piece)
+                    yield piece
+                if llm_span.recording:
+                    self.steps.describe_llm_call(llm_span, retrieval.context_chunks, "".join(pieces))
+            
+            # Only complete answers are cached
+            if self.answer_cache:
+                self.answer_cache.put(query, retrieval.query_embedding, "".join(pieces).strip())
+    
+    def ask_batch(
+        self,
+        queries: List[Query],
+        max_concurrency: int = 8,
+        embed_batch_size: int = 256
+    ) -> Iterator["BatchAnswer"]:
+        """
+        Answer many queries, yielding their answers in input order as they complete.
+        
+        Queries are processed in groups of embed_batch_size:
+        1. The group's questions are embedded in one embed call
+        2. The vector store is searched with one multi-query call per distinct
+           set of tags (queries in a call share their filter)
+        3. Keyword matches are fused in (hybrid) and the context is built per query
+        4. The LLM answers up to max_concurrency queries at once, while the
+           next group is embedded and searched; retrieval pauses while a few
+           groups are already waiting, so their contexts do not pile up
+        
+        The answer cache is bypassed so every question gets a fresh answer
+        (regression runs, FAQ generation). A failing step only fails the
+        queries it was handling; their BatchAnswer carries the error. Time
+        spent on a batched step is split evenly across the queries sharing it.
         
-        # Step 5: Return the answer
-        return answer 
\ No newline at end of file
+        Args:
+            queries: The queries to answer
+            max_concurrency: Maximum number of LLM calls in flight
+            embed_batch_size: Questions embedded and searched together (at least 1)
+            
+        Yields:
+            BatchAnswer: One per query, in input order
+        """
+        pool = ThreadPoolExecutor(max_workers=max(max_concurrency, 1), thread_name_prefix="qa-batch-llm")
+        ordered: List[Tuple[BatchAnswer, Optional[Future]]] = []
+        size = max(embed_batch_size, 1)
+        max_waiting = max(size, max_concurrency) * _BATCH_GROUPS_AHEAD
+        try:
+            for start in range(0, len(queries), size):
+                # Wait for the oldest answers while the LLM is behind
+                while len(ordered) >= max_waiting:
+                    answer, future = ordered.pop(0)
+                    if future is not None:
+                        future.result()
+                    yield answer
+                
+                answers = [BatchAnswer(query=query) for query in queries[start:start + size]]
+                contexts = self._retrieve_batch(answers)
+                for i, answer in enumerate(answers):
+                    future = pool.submit(self._answer_batched, answer, contexts[i]) if i in contexts else None
+                    ordered.append((answer, future))
+                
+                # Hand over what is already finished before starting on the next group
+                while ordered and (ordered[0][1] is None or ordered[0][1].done()):
+                    yield ordered.pop(0)[0]
+            
+            for answer, future in ordered:
+                if future is not None:
+                    future.result()
+                yield answer
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _retrieve_batch(self, answers: List["BatchAnswer"]) -> Dict[int, List[str]]:
+        """
+        Embed and search a group of batch queries, filling in their sources and timings.
+        
+        Returns:
+            The context for each query (by position) that still needs an LLM answer
+        """
+        started = time.perf_counter()
+        try:
+            with self.tracer.span("qa.batch.embed", {"queries": len(answers)}):
+                embeddings = self.embedder.embed([answer.query.text for answer in answers])
+        except Exception as e:
+            for answer in answers:
+                answer.error = f"Embedding failed: {e}"
+            return {}
+        _share_time(answers, "embed", time.perf_counter() - started)
+        
+        # Queries with the same tags (and so the same filter and depth) are searched together
+        searches: Dict[Tuple, List[int]] = {}
+        for i, answer in enumerate(answers):
+            tags = tuple(sorted(set(answer.query.tags))) if answer.query.tags else ()
+            searches.setdefault((tags, self.steps.search_depth(answer.query)), []).append(i)
+        
+        contexts: Dict[int, List[str]] = {}
+        for (tags, depth), indexes in searches.items():
+            group = [answers[i] for i in indexes]
+            started = time.perf_counter()
+            try:
+                with self.tracer.span("qa.batch.search.vector", {"queries": len(indexes), "top_k": depth}):
+                    results = self.vector_store.search_batch(
+                        [embeddings[i] for i in indexes],
+                        top_k=depth,
+                        filters=self.steps.filters(group[0].query)
+                    )
+            except Exception as e:
+                for answer in group:
+                    answer.error = f"Search failed: {e}"
+                continue
+            _share_time(group, "vector_search", time.perf_counter() - started)
+            
+            for i, answer, vector_results in zip(indexes, group, results):
+                try:
+                    started = time.perf_counter()
+                    search_results = self.steps.fuse(
+                        answer.query, vector_results, self.steps.keyword_search(answer.query)
+                    )
+                    if self.lexical_index is not None:
+                        answer.timings["keyword_search"] = time.perf_counter() - started
+                    
+                    started = time.perf_counter()
+                    context_chunks = self.steps.context(search_results)
+                    answer.timings["context"] = time.perf_counter() - started
+                except Exception as e:
+                    answer.error = f"Search failed: {e}"
+                    continue
+                
+                answer.sources = [
+                    {"id": result["id"], "path": (result.get("metadata") or {}).get("path"), "score": result["score"]}
+                    for result in search_results
+                ]
+                if context_chunks:
+                    contexts[i] = context_chunks
+                else:
+                    answer.answer = NO_CONTEXT_ANSWER
+        return contexts
+    
+    def _answer_batched(self, answer: "BatchAnswer", context_chunks: List[str]) -> None:
+        """Generate the LLM answer of one batch query; runs on the batch's thread pool."""
+        started = time.perf_counter()
+        try:
+            with self.tracer.span("qa.llm", {"batch": True}) as span:
+                answer.answer = self.llm.answer(question=answer.query.text, context_chunks=context_chunks)
+                if span.recording:
+                    self.steps.describe_llm_call(span, context_chunks, answer.answer)
+        except Exception as e:
+            answer.error = f"LLM call failed: {e}"
+        answer.timings["llm"] = time.perf_counter() - started
+    
+    def _retrieve(self, query: Query, span: Span) -> Retrieval:
+        """
+        Embed the query and collect context chunks, short-circuiting on cached or empty results.
+        
+        Args:
+            query: The query to retrieve context for
+            span: The enclosing qa.ask span, told how the question was answered
+        """
+        # Exact repeats skip even the embedding call
+        if self.answer_cache:
+            cached = self.answer_cache.get_exact(query)
+            if cached is not None:
+                span.set("outcome", "cache_exact")
+                return Retrieval(answer=cached)
+        
+        # Step 1: Generate embedding for the query text
+        with self.tracer.span("qa.embed", {"chars": len(query.text)}):
+            query_embedding = self.embedder.embed([query.text])[0]
+        
+        # Paraphrases of a cached question reuse its answer
+        if self.answer_cache:
+            cached = self.answer_cache.get_similar(query, query_embedding)
+            if cached is not None:
+                span.set("outcome", "cache_similar")
+                return Retrieval(answer=cached)
+        
+        # Step 2: Search for relevant chunks, restricted to the query's tags inside the index
+        filters = self.steps.filters(query)
+        with self.tracer.span("qa.search.vector", {"top_k": self.steps.search_depth(query)}) as search_span:
+            vector_results = self.vector_store.search(
+                query_embedding=query_embedding,
+                top_k=self.steps.search_depth(query),
+                filters=filters
+            )
+            search_span.set("results", len(vector_results))
+        search_results = self.steps.fuse(query, vector_results, self.steps.keyword_search(query))
+        
+        # Step 3: Extract content from the retrieved chunks (no chunks are answered with a message)
+        context_chunks = self.steps.context(search_results)
+        return self.steps.outcome(span, query_embedding, context_chunks)
+
+
+@dataclass
+class BatchAnswer:
+    """Outcome of one query of QAService.ask_batch."""
+    query: Query
+    answer: Optional[str] = None
+    error: Optional[str] = None
+    # Search results the context came from: id, path and score
+    sources: List[Dict] = field(default_factory=list)
+    # Seconds per step: embed, vector_search, keyword_search (hybrid), context, llm
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def _share_time(answers: List[BatchAnswer], step: str, seconds: float) -> None:
+    """Attribute a batched step's time evenly to the queries it handled."""
+    for answer in answers:
+        answer.timings[step] = seconds / len(answers)
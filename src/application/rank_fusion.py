@@ -0,0 +1,30 @@
+from typing import Dict, List
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict]], k: int = 60, top_k: int = 5) -> List[Dict]:
+    """
+    Merge ranked search results from several retrievers with reciprocal-rank fusion.
+
+    Each result contributes 1 / (k + rank) for every list it appears in, so
+    only positions matter and BM25 and cosine scores never need to be put on
+    the same scale. Results are matched by their "id"; the first occurrence
+    is kept, with its score replaced by the fused one.
+
+    Args:
+        result_lists: Result lists in the shape returned by VectorStore.search, best first
+        k: Damping constant; larger values flatten the gap between top and lower ranks
+        top_k: Number of fused results to return
+
+    Returns:
+        The top_k results by fused score, best first
+    """
+    scores: Dict[str, float] = {}
+    results: Dict[str, Dict] = {}
+    for result_list in result_lists:
+        for rank, result in enumerate(result_list, start=1):
+            key = result["id"]
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            results.setdefault(key, result)
+
+    best = sorted(scores, key=scores.get, reverse=True)[:top_k]
+    return [{**results[key], "score": scores[key]} for key in best]
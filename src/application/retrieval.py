@@ -0,0 +1,106 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from application.context_builder import ContextBuilder, result_content
+from application.rank_fusion import reciprocal_rank_fusion
+from domain.interfaces.lexical_index import LexicalIndex
+from domain.interfaces.tracer import Span, Tracer
+from domain.models.query import Query
+
+NO_CONTEXT_ANSWER = "I couldn't find any relevant information to answer your question."
+
+
+@dataclass
+class Retrieval:
+    """Outcome of the retrieval steps of QAService and AsyncQAService: either a final answer or context for the LLM."""
+    answer: Optional[str] = None
+    query_embedding: Optional[List[float]] = None
+    context_chunks: List[str] = field(default_factory=list)
+
+
+class RetrievalSteps:
+    """
+    Retrieval steps shared by QAService and AsyncQAService.
+
+    The services embed the question and search the vector store themselves,
+    blocking or awaited; everything after that, from the keyword search to
+    the finished context, is done here, so both answer alike. The keyword
+    search and context building are synchronous; the async service runs
+    them in a worker thread.
+    """
+
+    def __init__(
+        self,
+        tracer: Tracer,
+        lexical_index: Optional[LexicalIndex] = None,
+        rrf_k: int = 60,
+        hybrid_candidates: int = 20,
+        context_builder: Optional[ContextBuilder] = None
+    ):
+        self.tracer = tracer
+        self.lexical_index = lexical_index
+        self.rrf_k = rrf_k
+        self.hybrid_candidates = hybrid_candidates
+        self.context_builder = context_builder
+
+    @staticmethod
+    def filters(query: Query) -> Optional[Dict]:
+        return {"tags": query.tags} if query.tags else None
+
+    def search_depth(self, query: Query) -> int:
+        """Vector results to fetch: top_k, or the larger candidate pool that hybrid fusion ranks from."""
+        if self.lexical_index is None:
+            return query.top_k
+        return max(query.top_k, self.hybrid_candidates)
+
+    def keyword_search(self, query: Query) -> Optional[List[Dict]]:
+        """Keyword matches for the question, or None without a lexical index."""
+        if self.lexical_index is None:
+            return None
+        # Hybrid: keyword matches catch exact terms (codes, names) that embeddings blur
+        with self.tracer.span("qa.search.keyword", {"top_k": self.search_depth(query)}) as span:
+            keyword_results = self.lexical_index.search(
+                query.text,
+                top_k=self.search_depth(query),
+                filters=self.filters(query)
+            )
+            span.set("results", len(keyword_results))
+        return keyword_results
+
+    def fuse(self, query: Query, vector_results: List[Dict], keyword_results: Optional[List[Dict]]) -> List[Dict]:
+        """Final search results: the vector results, fused with keyword matches in hybrid mode."""
+        if keyword_results is None:
+            return vector_results
+        return reciprocal_rank_fusion(
+            [vector_results, keyword_results],
+            k=self.rrf_k,
+            top_k=query.top_k
+        )
+
+    def context(self, search_results: List[Dict]) -> List[str]:
+        with self.tracer.span("qa.context", {"results": len(search_results)}) as span:
+            if self.context_builder:
+                context_chunks = self.context_builder.build(search_results)
+            else:
+                context_chunks = [content for content in map(result_content, search_results) if content]
+            span.set("chunks", len(context_chunks))
+        return context_chunks
+
+    @staticmethod
+    def outcome(span: Span, query_embedding: List[float], context_chunks: List[str]) -> Retrieval:
+        """The retrieval of a question that was not answered from the cache, told to its qa.ask span."""
+        if not context_chunks:
+            span.set("outcome", "no_context")
+            return Retrieval(answer=NO_CONTEXT_ANSWER)
+        span.set("outcome", "answered")
+        return Retrieval(query_embedding=query_embedding, context_chunks=context_chunks)
+
+    def describe_llm_call(self, span: Span, context_chunks: List[str], answer: str) -> None:
+        """Attach payload sizes and token counts to an LLM span; only called when the span records."""
+        span.set("context_chunks", len(context_chunks))
+        span.set("context_bytes", sum(len(chunk.encode("utf-8")) for chunk in context_chunks))
+        span.set("answer_bytes", len(answer.encode("utf-8")))
+        if self.context_builder:
+            # Same tokenizer the context budget is measured with
+            span.set("context_tokens", sum(self.context_builder.count_tokens(chunk) for chunk in context_chunks))
+            span.set("answer_tokens", self.context_builder.count_tokens(answer))
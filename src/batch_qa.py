@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Batch mode for the document-based smart assistant.
+
+Answers a JSONL file of questions in one run, for regression suites and
+bulk FAQ generation. Each input line is an object like
+
+    {"id": "pto-1", "question": "How many vacation days do I get?", "tags": ["hr"], "top_k": 5}
+
+where only "question" is required. Questions are embedded and searched in
+groups and answered by several concurrent LLM calls. One output line is
+written per input line, in the same order:
+
+    {"id": "pto-1", "question": "...", "tags": ["hr"], "answer": "...", "error": null,
+     "sources": [{"id": "...", "path": "...", "score": 0.83}], "timings": {"embed": 0.002, ...}}
+
+Progress and a per-stage summary go to stderr, so the answers can be piped.
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, TextIO, Tuple
+
+from domain.models.query import Query
+from infrastructure.config import BATCH_EMBED_SIZE, BATCH_LLM_CONCURRENCY, TOP_K_RESULTS
+
+
+def read_queries(lines: TextIO) -> List[Tuple[str, Query]]:
+    """
+    Parse JSONL questions into (id, Query) pairs.
+
+    Raises:
+        ValueError: If a line is not valid JSON, has no question or an invalid top_k
+    """
+    queries = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON ({e})")
+        question = item.get("question") if isinstance(item, dict) else None
+        if not isinstance(question, str) or not question.strip():
+            raise ValueError(f"Line {number}: missing \"question\"")
+
+        tags = item.get("tags")
+        if isinstance(tags, str):
+            tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+        queries.append((
+            str(item.get("id", number)),
+            Query(text=question.strip(), tags=tags or None, top_k=_top_k(item.get("top_k", TOP_K_RESULTS), number))
+        ))
+    return queries
+
+
+def _top_k(value, number: int) -> int:
+    """A line's top_k as a positive int; numeric strings are accepted."""
+    top_k = None
+    if isinstance(value, int) and not isinstance(value, bool):
+        top_k = value
+    elif isinstance(value, str) and value.strip().isdigit():
+        top_k = int(value)
+    if top_k is None or top_k < 1:
+        raise ValueError(f"Line {number}: \"top_k\" must be a positive integer, got {json.dumps(value)}")
+    return top_k
+
+
+def print_summary(timings: List[Dict[str, float]], errors: int, elapsed: float) -> None:
+    """Print totals and per-question averages of each stage to stderr."""
+    count = len(timings)
+    print(f"\nAnswered {count - errors}/{count} question(s) in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.2f}/s)", file=sys.stderr)
+    stages: Dict[str, float] = {}
+    for item in timings:
+        for stage, seconds in item.items():
+            stages[stage] = stages.get(stage, 0.0) + seconds
+    if stages:
+        print(f"  {'stage':<16}{'total':>10}{'avg/question':>14}", file=sys.stderr)
+        for stage, total in stages.items():
+            print(f"  {stage:<16}{total:>9.2f}s{total / count * 1000:>12.1f}ms", file=sys.stderr)
+        print("  (llm calls overlap, so their total exceeds their share of the wall time)", file=sys.stderr)
+
+
+def positive_int(value: str) -> int:
+    """argparse type for options that need at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions.")
+    parser.add_argument("input", help="JSONL file of questions ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file for the answers (default: stdout)")
+    parser.add_argument("--concurrency", type=positive_int, default=BATCH_LLM_CONCURRENCY, help="LLM calls in flight")
+    parser.add_argument("--embed-batch-size", type=positive_int, default=BATCH_EMBED_SIZE, help="Questions embedded and searched together")
+    args = parser.parse_args()
+
+    try:
+        if args.input == "-":
+            queries = read_queries(sys.stdin)
+        else:
+            with open(args.input, encoding="utf-8") as f:
+                queries = read_queries(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not queries:
+        print("No questions to answer.", file=sys.stderr)
+        return
+    try:
+        output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    except OSError as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # Imported here so argument, input and output errors are reported without loading the stack
+    from main import setup_dependencies
+    from infrastructure.tracing.recording_tracer import RecordingTracer
+
+    try:
+        qa_service = setup_dependencies(log=lambda message: print(message, file=sys.stderr))
+    except Exception as e:
+        if output is not sys.stdout:
+            output.close()
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"\nAnswering {len(queries)} question(s)...", file=sys.stderr)
+    timings: List[Dict[str, float]] = []
+    errors = 0
+    started = time.perf_counter()
+    try:
+        results = qa_service.ask_batch(
+            [query for _, query in queries],
+            max_concurrency=args.concurrency,
+            embed_batch_size=args.embed_batch_size
+        )
+        for (query_id, query), result in zip(queries, results):
+            output.write(json.dumps({
+                "id": query_id,
+                "question": query.text,
+                "tags": query.tags,
+                "answer": result.answer,
+                "error": result.error,
+                "sources": result.sources,
+                "timings": {stage: round(seconds, 6) for stage, seconds in result.timings.items()}
+            }, ensure_ascii=False) + "\n")
+            output.flush()
+            timings.append(result.timings)
+            if result.error:
+                errors += 1
+                print(f"  ✗ {query_id}: {result.error}", file=sys.stderr)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted after {len(timings)} question(s)", file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        qa_service.vector_store.close()
+        qa_service.tracer.close()
+
+    print_summary(timings, errors, time.perf_counter() - started)
+    if isinstance(qa_service.tracer, RecordingTracer) and qa_service.tracer.summary():
+        print("\nLatency (traced spans):", file=sys.stderr)
+        for line in qa_service.tracer.summary():
+            print(line, file=sys.stderr)
+    if errors:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
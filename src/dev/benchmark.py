@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Offline ingestion, retrieval and memory benchmarks.
+
+Nothing calls OpenAI: a synthetic corpus (see synthetic_corpus.py) is
+embedded with FakeEmbeddingGenerator and answered by FakeChat, both with
+configurable latency. Each vector backend runs in a fresh process with its
+own empty store, so backends cannot influence each other. Measured:
+- ingestion: documents and chunks per second, and busy time per stage
+- retrieval: latency percentiles and queries per second of vector search
+  (one query at a time and batched) and of QAService.ask with N threads
+- memory: peak RSS after ingesting and after querying, and store size on disk
+
+Results are printed as a table; --output writes them as JSON, and
+--baseline compares them with an earlier JSON file and exits with status 3
+when a metric got worse by more than --max-regression.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add the src directory to the Python path to import the application modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic_corpus import DEFAULT_FILE_MIX, generate_corpus, generate_queries, load_manifest, parse_file_mix, readable_kinds, write_manifest
+
+BACKENDS = ("local", "chroma")
+
+# Format version of the JSON results
+RESULTS_VERSION = 1
+
+# Metrics compared against a baseline, and whether higher is better
+TRACKED_METRICS = {
+    "ingestion.chunks_per_second": True,
+    "retrieval.search.p95_ms": False,
+    "retrieval.search_batch.queries_per_second": True,
+    "retrieval.ask.p95_ms": False,
+    "retrieval.ask.queries_per_second": True,
+    "memory.peak_rss_mb": False,
+}
+
+
+def latency_summary(seconds: List[float], elapsed: float) -> Dict[str, float]:
+    """Percentiles in milliseconds and throughput of a list of call durations."""
+    values = np.asarray(seconds) * 1000
+    return {
+        "count": len(seconds),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "queries_per_second": round(len(seconds) / elapsed, 2) if elapsed > 0 else 0.0
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process in MB."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def directory_mb(path: Path) -> float:
+    return round(sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / 1024 / 1024, 2)
+
+
+def run_backend(args: argparse.Namespace) -> Dict:
+    """
+    Ingest the corpus into a fresh store and query it; runs in the backend's own process.
+
+    The working directory is the backend's folder, holding the corpus under
+    .data/raw and the ledger under .data/processed like a real deployment;
+    VECTOR_BACKEND and the store locations come from the environment.
+    """
+    from application.context_builder import ContextBuilder
+    from application.ingestion_service import IngestionService
+    from application.pipeline import PipelineSettings
+    from application.qa_service import QAService
+    from domain.models.query import Query
+    from infrastructure.config import CHUNK_OVERLAP, CHUNK_SIZE, CHROMA_DB_DIR, LOCAL_INDEX_DIR, VECTOR_BACKEND
+    from infrastructure.embedding.fake_embedder import FakeEmbeddingGenerator
+    from infrastructure.llm.fake_chat import FakeChat
+    from infrastructure.parser.unstructured_parser import UnstructuredParser
+    from infrastructure.tracing.recording_tracer import RecordingTracer
+    from infrastructure.vector.factory import create_lexical_index, create_vector_store
+
+    manifest = load_manifest(Path(".data/raw"))
+    tracer = RecordingTracer()
+    store = create_vector_store(collection_name="documents", tracer=tracer)
+    lexical_index = create_lexical_index(collection_name="documents") if args.hybrid else None
+    embedder = FakeEmbeddingGenerator(args.dimensions, args.embed_latency_ms, args.embed_per_text_ms)
+
+    # Ingestion
+    service = IngestionService(
+        parser=UnstructuredParser(strategy="fast"),
+        embedder=embedder,
+        store=store,
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        settings=PipelineSettings(parse_workers=args.parse_workers, embed_workers=args.embed_workers),
+        lexical_index=lexical_index,
+        tracer=tracer
+    )
+    report = service.run(".data/raw")
+    ingestion = {
+        "documents": report.stages["write"].documents,
+        "chunks": report.stages["write"].chunks,
+        "errors": sum(stats.errors for stats in report.stages.values()),
+        "seconds": round(report.total_seconds, 3),
+        "documents_per_second": round(report.stages["write"].documents / report.total_seconds, 2),
+        "chunks_per_second": round(report.stages["write"].chunks / report.total_seconds, 2),
+        "stage_busy_seconds": {name: round(stats.busy_seconds, 3) for name, stats in report.stages.items()}
+    }
+    memory = {"peak_rss_ingestion_mb": peak_rss_mb()}
+
+    # Retrieval: vector search alone, one query at a time and batched per tag filter
+    queries = [Query(text=item.text, tags=item.tags, top_k=args.top_k) for item in manifest["queries"]]
+    query_embeddings = FakeEmbeddingGenerator(args.dimensions).embed([query.text for query in queries])
+    filters = [{"tags": query.tags} if query.tags else None for query in queries]
+    for embedding, query_filter in zip(query_embeddings[:10], filters):
+        store.search(embedding, top_k=args.top_k, filters=query_filter)
+
+    durations = []
+    started = time.perf_counter()
+    for embedding, query_filter in zip(query_embeddings, filters):
+        call_started = time.perf_counter()
+        store.search(embedding, top_k=args.top_k, filters=query_filter)
+        durations.append(time.perf_counter() - call_started)
+    search = latency_summary(durations, time.perf_counter() - started)
+
+    groups: Dict[Tuple, List[int]] = {}
+    for i, query in enumerate(queries):
+        groups.setdefault(tuple(query.tags or ()), []).append(i)
+    started = time.perf_counter()
+    for indexes in groups.values():
+        store.search_batch([query_embeddings[i] for i in indexes], top_k=args.top_k, filters=filters[indexes[0]])
+    elapsed = time.perf_counter() - started
+    search_batch = {"count": len(queries), "queries_per_second": round(len(queries) / elapsed, 2) if elapsed > 0 else 0.0}
+
+    # Retrieval: whole questions, as many at once as --concurrency
+    qa_service = QAService(
+        llm=FakeChat(args.llm_first_token_ms, args.llm_per_token_ms),
+        vector_store=store,
+        embedder=embedder,
+        lexical_index=lexical_index,
+        context_builder=ContextBuilder(max_tokens=args.context_tokens),
+        tracer=tracer
+    )
+
+    def timed_ask(query: Query) -> float:
+        call_started = time.perf_counter()
+        qa_service.ask(query)
+        return time.perf_counter() - call_started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(args.concurrency, 1)) as pool:
+        durations = list(pool.map(timed_ask, queries))
+    ask = latency_summary(durations, time.perf_counter() - started)
+    ask["concurrency"] = args.concurrency
+
+    memory["peak_rss_mb"] = peak_rss_mb()
+    store.close()
+    store_dir = Path(LOCAL_INDEX_DIR if VECTOR_BACKEND == "local" else CHROMA_DB_DIR)
+    memory["store_disk_mb"] = directory_mb(store_dir) if store_dir.exists() else 0.0
+
+    spans = {
+        name: {key: round(value * 1000, 3) for key, value in entry.items() if key in ("p50", "p95", "p99")}
+        for name, entry in tracer.stats.snapshot().items()
+    }
+    return {
+        "ingestion": ingestion,
+        "retrieval": {"search": search, "search_batch": search_batch, "ask": ask},
+        "memory": memory,
+        "span_latency_ms": spans
+    }
+
+
+def available_backends(requested: List[str]) -> List[str]:
+    """Requested backends whose libraries are installed."""
+    import importlib.util
+    backends = []
+    for backend in requested:
+        if backend == "chroma" and importlib.util.find_spec("chromadb") is None:
+            print("Note: skipping chroma (chromadb is not installed)", file=sys.stderr)
+            continue
+        backends.append(backend)
+    return backends
+
+
+def launch_backend(backend: str, workdir: Path, args: argparse.Namespace) -> Dict:
+    """Run one backend's benchmark in a fresh process and return its results."""
+    backend_dir = workdir / backend
+    shutil.copytree(workdir / "corpus", backend_dir / ".data" / "raw")
+    result_path = backend_dir / "result.json"
+    env = {
+        **os.environ,
+        "VECTOR_BACKEND": backend,
+        "CHROMA_DB_DIR": str(backend_dir / "chroma"),
+        "LOCAL_INDEX_DIR": str(backend_dir / "local"),
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(Path(__file__).parent.parent), os.environ.get("PYTHONPATH")]))
+    }
+    completed = subprocess.run(
+        # The backend process parses the same options
+        [sys.executable, __file__, *sys.argv[1:], "--worker", str(result_path)],
+        cwd=backend_dir,
+        env=env,
+        stdout=None if args.verbose else subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.PIPE,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{backend} benchmark failed:\n{(completed.stderr or '')[-2000:]}")
+    return json.loads(result_path.read_text(encoding="utf-8"))
+
+
+def metric(results: Dict, path: str) -> Optional[float]:
+    value = results
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(results: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """
+    Compare tracked metrics with a baseline run.
+
+    Returns:
+        One line per metric that got worse by more than max_regression (a fraction)
+    """
+    regressions = []
+    for backend, current in results["backends"].items():
+        previous = baseline.get("backends", {}).get(backend)
+        if not previous or "error" in current or "error" in previous:
+            continue
+        for path, higher_is_better in TRACKED_METRICS.items():
+            new, old = metric(current, path), metric(previous, path)
+            if not new or not old:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if worse > max_regression:
+                regressions.append(f"{backend} {path}: {old:g} -> {new:g} ({change:+.0%})")
+    return regressions
+
+
+def print_report(results: Dict) -> None:
+    corpus = results["corpus"]
+    print(f"\nCorpus: {corpus['documents']} document(s), {corpus['megabytes']} MB, {corpus['queries']} question(s)")
+    for backend, result in results["backends"].items():
+        print(f"\n{backend}")
+        if "error" in result:
+            print(f"  failed: {result['error'].splitlines()[0]}")
+            continue
+        ingestion, retrieval, memory = result["ingestion"], result["retrieval"], result["memory"]
+        print(
+            f"  ingestion: {ingestion['documents']} docs, {ingestion['chunks']} chunks in {ingestion['seconds']:.2f}s "
+            f"({ingestion['documents_per_second']:.1f} docs/s, {ingestion['chunks_per_second']:.0f} chunks/s, "
+            f"{ingestion['errors']} error(s))"
+        )
+        for name in ("search", "ask"):
+            item = retrieval[name]
+            print(
+                f"  {name + ':':<10} p50 {item['p50_ms']:.2f}ms  p95 {item['p95_ms']:.2f}ms  p99 {item['p99_ms']:.2f}ms  "
+                f"{item['queries_per_second']:.1f} q/s"
+            )
+        print(f"  {'batch:':<10} {retrieval['search_batch']['queries_per_second']:.1f} q/s")
+        print(
+            f"  memory:    peak RSS {memory['peak_rss_mb']:.0f} MB "
+            f"({memory['peak_rss_ingestion_mb']:.0f} MB during ingestion), store {memory['store_disk_mb']:.1f} MB on disk"
+        )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Offline ingestion, retrieval and memory benchmarks.")
+    arg_parser.add_argument("--backends", default=",".join(BACKENDS), help=f"Vector backends to run (default: {','.join(BACKENDS)})")
+    arg_parser.add_argument("--documents", type=int, default=200, help="Documents in the synthetic corpus (default: 200)")
+    arg_parser.add_argument("--words", type=int, default=1500, help="Median words per document (default: 1500)")
+    arg_parser.add_argument("--file-mix", default=DEFAULT_FILE_MIX, help=f"Share of each file kind (default: {DEFAULT_FILE_MIX})")
+    arg_parser.add_argument("--queries", type=int, default=500, help="Questions asked (default: 500)")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Corpus and question seed (default: 0)")
+    arg_parser.add_argument("--dimensions", type=int, default=384, help="Fake embedding size (default: 384)")
+    arg_parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="Simulated latency per embed call")
+    arg_parser.add_argument("--embed-per-text-ms", type=float, default=0.0, help="Simulated extra latency per embedded text")
+    arg_parser.add_argument("--llm-first-token-ms", type=float, default=0.0, help="Simulated LLM time to first token")
+    arg_parser.add_argument("--llm-per-token-ms", type=float, default=0.0, help="Simulated LLM time per further token")
+    arg_parser.add_argument("--top-k", type=int, default=5, help="Results per question (default: 5)")
+    arg_parser.add_argument("--context-tokens", type=int, default=6000, help="Context budget of each answer (default: 6000)")
+    arg_parser.add_argument("--no-hybrid", dest="hybrid", action="store_false", help="Skip the BM25 keyword index")
+    arg_parser.add_argument("--concurrency", type=int, default=8, help="Questions asked at once (default: 8)")
+    arg_parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 1, help="Ingestion parse processes")
+    arg_parser.add_argument("--embed-workers", type=int, default=4, help="Ingestion embed threads (default: 4)")
+    arg_parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    arg_parser.add_argument("--baseline", help="Earlier results JSON to compare with")
+    arg_parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed worsening vs. the baseline (default: 0.25)")
+    arg_parser.add_argument("--workdir", help="Keep the corpus and stores in this directory (default: a temporary one)")
+    arg_parser.add_argument("--verbose", action="store_true", help="Show the output of the backend processes")
+    arg_parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.worker:
+        result = run_backend(args)
+        Path(args.worker).write_text(json.dumps(result), encoding="utf-8")
+        return
+
+    try:
+        file_mix = readable_kinds(parse_file_mix(args.file_mix))
+    except ValueError as e:
+        arg_parser.error(str(e))
+    backends = available_backends([name.strip() for name in args.backends.split(",") if name.strip()])
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+
+    if args.workdir and Path(args.workdir).exists() and any(Path(args.workdir).iterdir()):
+        arg_parser.error(f"--workdir {args.workdir} is not empty")
+    workdir = Path(args.workdir).resolve() if args.workdir else Path(tempfile.mkdtemp(prefix="rag-benchmark-"))
+    try:
+        corpus_dir = workdir / "corpus"
+        print(f"Generating {args.documents} document(s) in {corpus_dir}...", file=sys.stderr)
+        documents = generate_corpus(corpus_dir, args.documents, args.words, file_mix, seed=args.seed)
+        queries = generate_queries(documents, args.queries, seed=args.seed)
+        settings = {"documents": args.documents, "words": args.words, "file_mix": file_mix, "seed": args.seed}
+        write_manifest(corpus_dir, documents, queries, settings)
+
+        results = {
+            "version": RESULTS_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count()
+            },
+            "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "max_regression", "workdir", "verbose", "worker")},
+            "corpus": {
+                "documents": len(documents),
+                "megabytes": directory_mb(corpus_dir),
+                "queries": len(queries),
+                "kinds": {kind: sum(document.kind == kind for document in documents) for kind in file_mix}
+            },
+            "backends": {}
+        }
+        for backend in backends:
+            print(f"Benchmarking {backend}...", file=sys.stderr)
+            try:
+                results["backends"][backend] = launch_backend(backend, workdir, args)
+            except Exception as e:
+                results["backends"][backend] = {"error": str(e)}
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+    failed = any("error" in result for result in results["backends"].values())
+    if baseline is not None:
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\nRegressions beyond {args.max_regression:.0%} vs. {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(3)
+        print(f"\nNo regressions beyond {args.max_regression:.0%} vs. {args.baseline}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Fake Embedding Server - A local stand-in for the OpenAI embeddings endpoint.
+
+Serves POST /v1/embeddings with deterministic vectors so batching, concurrency,
+rate limiting and retries in OpenAIEmbeddingGenerator can be exercised without
+spending API credits. Point OPENAI_BASE_URL at http://127.0.0.1:<port>/v1.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import random
+import struct
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_embedding(text: str, dimensions: int):
+    """Deterministic unit vector derived from the text's hash."""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class FakeEmbeddingState:
+    """Server-wide settings and counters shared by all request handlers."""
+
+    def __init__(self, args):
+        self.dimensions = args.dimensions
+        self.latency = args.latency_ms / 1000.0
+        self.error_rate = args.error_rate
+        self.rpm = args.rpm
+        self.max_inputs = args.max_inputs
+        self.lock = threading.Lock()
+        self.request_times = deque()
+        self.stats = {"requests": 0, "inputs": 0, "rate_limited": 0, "errors": 0}
+
+    def over_rate_limit(self) -> bool:
+        """Sliding one-minute window over accepted requests."""
+        if self.rpm <= 0:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            while self.request_times and now - self.request_times[0] > 60:
+                self.request_times.popleft()
+            if len(self.request_times) >= self.rpm:
+                self.stats["rate_limited"] += 1
+                return True
+            self.request_times.append(now)
+            return False
+
+
+class FakeEmbeddingHandler(BaseHTTPRequestHandler):
+    state: FakeEmbeddingState = None
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/embeddings"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+
+        state = self.state
+        if state.over_rate_limit():
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}}, {"retry-after": "1"})
+            return
+        if len(inputs) > state.max_inputs:
+            self._send_json(400, {"error": {"message": f"Too many inputs: {len(inputs)} > {state.max_inputs}"}})
+            return
+        if state.error_rate and random.random() < state.error_rate:
+            with state.lock:
+                state.stats["errors"] += 1
+            self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+            return
+
+        if state.latency:
+            time.sleep(state.latency)
+
+        dimensions = body.get("dimensions") or state.dimensions
+        base64_output = body.get("encoding_format") == "base64"
+        data = []
+        for i, text in enumerate(inputs):
+            vector = fake_embedding(str(text), dimensions)
+            if base64_output:
+                vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+
+        prompt_tokens = sum(max(1, len(str(text)) // 4) for text in inputs)
+        with state.lock:
+            state.stats["requests"] += 1
+            state.stats["inputs"] += len(inputs)
+
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens}
+        })
+
+    def do_GET(self):
+        # Lightweight stats endpoint for checking what the client sent
+        with self.state.lock:
+            self._send_json(200, dict(self.state.stats))
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload, headers=None):
+        encoded = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake OpenAI embeddings locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dimensions", type=int, default=1536, help="Vector size when the request does not set one")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Delay added to every successful request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute before answering HTTP 429 (0 = unlimited)")
+    parser.add_argument("--max-inputs", type=int, default=2048, help="Maximum inputs accepted per request")
+    args = parser.parse_args()
+
+    FakeEmbeddingHandler.state = FakeEmbeddingState(args)
+    server = ThreadingHTTPServer((args.host, args.port), FakeEmbeddingHandler)
+    print(f"Fake embedding server listening on http://{args.host}:{args.port}/v1")
+    print(f"Set OPENAI_BASE_URL=http://{args.host}:{args.port}/v1 to use it")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping fake embedding server")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Vector Store Migrations - One-time upgrades for collections created by older versions.
+
+Currently applies:
+- tag keys: adds one boolean metadata key per tag so tag filters run inside the index
+- content: removes the copy of each chunk's text kept in its metadata (the text stays as the document)
+"""
+
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path to import the application modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from infrastructure.config import CHROMA_DB_DIR
+from infrastructure.vector.chroma_store import ChromaVectorStore
+
+
+def main():
+    """Run every migration against the 'documents' collection."""
+    print("=== Vector Store Migrations ===")
+    print(f"DB Path: {CHROMA_DB_DIR}")
+    
+    store = ChromaVectorStore(collection_name="documents")
+    print(f"Collection has {store.collection.count()} chunk(s)")
+    
+    updated = store.migrate_tag_keys()
+    print(f"✓ Tag keys: updated {updated} chunk(s)")
+    
+    migrated = store.migrate_content_out_of_metadata()
+    print(f"✓ Content: removed duplicated text from {migrated} chunk(s)")
+    store.close()
+    if migrated:
+        # SQLite keeps freed pages until the file is vacuumed
+        print(f"  Run 'chroma utils vacuum --path {CHROMA_DB_DIR}' to reclaim the disk space")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Parse Cache Purge - Delete cached parser output and reclaim its disk space.
+
+The cache only grows up to PARSE_CACHE_MAX_MB on its own; purge it after
+upgrading parser libraries (old entries are never hit again) or to free space.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path to import the application modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from infrastructure.config import PARSE_CACHE_MAX_MB, PARSE_CACHE_PATH
+from infrastructure.parser.cached_parser import ParseCache
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Delete cached parser output.")
+    arg_parser.add_argument(
+        "--older-than-days",
+        type=float,
+        default=None,
+        help="Only delete entries not used for this many days (default: delete everything)"
+    )
+    args = arg_parser.parse_args()
+    
+    print("=== Parse Cache Purge ===")
+    print(f"DB Path: {PARSE_CACHE_PATH}")
+    if not PARSE_CACHE_PATH.exists():
+        print("Nothing to purge")
+        return
+    
+    cache = ParseCache(PARSE_CACHE_PATH, max_bytes=PARSE_CACHE_MAX_MB * 1024 * 1024)
+    before = cache.stats()
+    print(f"Cache holds {before['entries']} file(s), {before['size_bytes'] / 1024 / 1024:.1f} MB")
+    
+    older_than = args.older_than_days * 86400 if args.older_than_days is not None else None
+    entries, size = cache.purge(older_than=older_than)
+    print(f"✓ Purged {entries} file(s), {size / 1024 / 1024:.1f} MB")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
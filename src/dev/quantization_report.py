@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Quantization Report - Recall versus memory for vector storage settings.
+
+Takes a sample of the stored embeddings (or synthetic ones), uses some of
+them as queries against the rest, and compares the top-k of every setting
+with exact float32 search:
+
+- float32 / float16 / int8 storage (LOCAL_INDEX_DTYPE)
+- int8 with a full-precision rescoring pass (LOCAL_INDEX_RESCORE)
+- shortened embeddings (EMBEDDING_DIMENSIONS), approximated by truncating and
+  renormalizing the stored vectors, as text-embedding-3 models do server-side
+
+Run it before changing settings on a real corpus; switching dimensions or
+dtype requires re-ingesting.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Add the src directory to the Python path to import the application modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from infrastructure.config import VECTOR_BACKEND, LOCAL_INDEX_DIR
+from infrastructure.vector.local_store import quantize_int8
+
+
+def load_stored_vectors(limit: int) -> np.ndarray:
+    """Read up to limit embeddings from the configured vector store."""
+    if VECTOR_BACKEND == "local":
+        from infrastructure.vector.local_store import LocalVectorStore
+        return LocalVectorStore(LOCAL_INDEX_DIR / "documents").sample_vectors(limit)
+
+    from infrastructure.vector.chroma_store import ChromaVectorStore
+    store = ChromaVectorStore(collection_name="documents")
+    page = store.collection.get(include=["embeddings"], limit=limit)
+    embeddings = page["embeddings"]
+    return np.asarray(embeddings if embeddings is not None else [], dtype=np.float32)
+
+
+def synthetic_vectors(count: int, dimensions: int, seed: int = 0) -> np.ndarray:
+    """Clustered random vectors, roughly shaped like text embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(count // 50, 1), dimensions))
+    return (centers[rng.integers(0, len(centers), count)] + 0.7 * rng.normal(size=(count, dimensions))).astype(np.float32)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Row indices of the k best scores for each query."""
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1)
+    return np.take_along_axis(best, order, axis=1)
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def evaluate(
+    base: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+    dimensions: Optional[int],
+    dtype: str,
+    rescore: int
+) -> Dict:
+    """Recall@k and bytes per vector of one storage setting."""
+    full_dims = base.shape[1]
+    if dimensions and dimensions < full_dims:
+        base, queries = normalize(base[:, :dimensions]), normalize(queries[:, :dimensions])
+    dims = base.shape[1]
+
+    if dtype == "int8":
+        codes, scales = quantize_int8(base)
+        scores = (queries @ codes.astype(np.float32).T) * scales[None, :]
+        bytes_per_vector = dims + 4
+    elif dtype == "float16":
+        scores = queries @ base.astype(np.float16).astype(np.float32).T
+        bytes_per_vector = dims * 2
+    else:
+        scores = queries @ base.T
+        bytes_per_vector = dims * 4
+
+    if rescore:
+        shortlist = top_k(scores, min(k * rescore, len(base)))
+        exact = np.einsum("qd,qcd->qc", queries, base[shortlist])
+        found = np.take_along_axis(shortlist, top_k(exact, k), axis=1)
+    else:
+        found = top_k(scores, k)
+
+    return {
+        "dimensions": dims,
+        "dtype": dtype,
+        "rescore": rescore,
+        f"recall@{k}": round(recall(found, truth), 4),
+        "bytes_per_vector": bytes_per_vector,
+        # Rescoring reads float32 copies from disk; only the searched codes need to stay in memory
+        "disk_bytes_per_vector": bytes_per_vector + (dims * 4 if rescore and dtype != "float32" else 0)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare recall and memory of vector storage settings.")
+    parser.add_argument("--limit", type=int, default=50000, help="Stored vectors to sample")
+    parser.add_argument("--queries", type=int, default=200, help="Sampled vectors used as queries")
+    parser.add_argument("--k", type=int, default=10, help="Recall@k cutoff")
+    parser.add_argument("--dims", type=int, nargs="*", default=[1024, 512, 256], help="Shortened sizes to try")
+    parser.add_argument("--rescore", type=int, default=4, help="Rescoring multiplier to try with int8")
+    parser.add_argument("--project-rows", type=int, default=1_000_000, help="Collection size for the memory projection")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="DIMS", help="Use synthetic vectors of this size instead of the store")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.limit, args.synthetic)
+    else:
+        vectors = load_stored_vectors(args.limit)
+    if len(vectors) <= args.queries + args.k:
+        print(f"Need more than {args.queries + args.k} vectors, found {len(vectors)}. Ingest documents or use --synthetic.")
+        sys.exit(1)
+
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(vectors))
+    queries = normalize(vectors[order[:args.queries]])
+    base = normalize(vectors[order[args.queries:]])
+    truth = top_k(queries @ base.T, args.k)
+
+    full_dims = base.shape[1]
+    settings = [(None, "float32", 0), (None, "float16", 0), (None, "int8", 0), (None, "int8", args.rescore)]
+    for dims in sorted({d for d in args.dims if 0 < d < full_dims}, reverse=True):
+        settings += [(dims, "float32", 0), (dims, "int8", args.rescore)]
+
+    results: List[Dict] = []
+    for dims, dtype, rescore in settings:
+        result = evaluate(base, queries, truth, args.k, dims, dtype, rescore)
+        result["projected_memory_mb"] = round(result["bytes_per_vector"] * args.project_rows / 1024 / 1024, 1)
+        results.append(result)
+
+    if args.json:
+        print(json.dumps({"vectors": len(base), "queries": len(queries), "k": args.k, "results": results}, indent=2))
+        return
+
+    print(f"=== Quantization Report ({len(base)} vectors, {len(queries)} queries, {full_dims} dims) ===")
+    if args.synthetic:
+        print("Note: synthetic vectors are not trained for truncation; shortened rows are only meaningful on real embeddings")
+    print(f"{'dims':>6}{'dtype':>9}{'rescore':>9}{f'recall@{args.k}':>11}{'B/vector':>10}{'disk B/vec':>12}{f'MB @ {args.project_rows:,}':>16}")
+    for r in results:
+        print(
+            f"{r['dimensions']:>6}{r['dtype']:>9}{(str(r['rescore']) + 'x') if r['rescore'] else '-':>9}"
+            f"{r[f'recall@{args.k}']:>11.3f}{r['bytes_per_vector']:>10}{r['disk_bytes_per_vector']:>12}"
+            f"{r['projected_memory_mb']:>16,.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Rebuild Index - Copy a Chroma collection into a fresh HNSW index and switch to it.
+
+Use it to apply changed CHROMA_HNSW_* settings to an existing collection, or
+to compact an index that many upserts and deletes have left full of deleted
+vectors. Embeddings are copied, so nothing is re-embedded. Search latency is
+measured on the same sample of stored vectors before and after the rebuild,
+along with how many of the top results stayed the same.
+
+Stop the app and the server first: writes made during the copy are lost, and
+running processes keep using the old collection until they restart.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add the src directory to the Python path to import the application modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmark import directory_mb, latency_summary
+from infrastructure.config import CHROMA_DB_DIR, TOP_K_RESULTS
+from infrastructure.vector.chroma_store import ChromaVectorStore
+
+
+def sample_queries(store: ChromaVectorStore, count: int, seed: int) -> List[List[float]]:
+    """Stored embeddings used as queries, so the sample needs no embedding API."""
+    ids = store.collection.get(include=[])["ids"]
+    sample = random.Random(seed).sample(ids, min(count, len(ids)))
+    return [list(embedding) for embedding in store.collection.get(ids=sample, include=["embeddings"])["embeddings"]]
+
+
+def measure(store: ChromaVectorStore, queries: List[List[float]], top_k: int) -> Tuple[Dict[str, float], List[List[str]]]:
+    """Latency of one search per query, after a warm-up pass, and the IDs each one returned."""
+    for query in queries:
+        store.search(query, top_k=top_k)
+
+    seconds, results = [], []
+    started = time.perf_counter()
+    for query in queries:
+        call_started = time.perf_counter()
+        hits = store.search(query, top_k=top_k)
+        seconds.append(time.perf_counter() - call_started)
+        results.append([hit["id"] for hit in hits])
+    return latency_summary(seconds, time.perf_counter() - started), results
+
+
+def agreement(before: List[List[str]], after: List[List[str]]) -> float:
+    """Share of the results before the rebuild that are still returned after it."""
+    kept = sum(len(set(old) & set(new)) for old, new in zip(before, after))
+    total = sum(len(old) for old in before)
+    return kept / total if total else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild a Chroma collection with the configured HNSW settings")
+    parser.add_argument("--collection", default="documents", help="Collection to rebuild (default: documents)")
+    parser.add_argument("--space", choices=["cosine", "l2", "ip"], help="Override CHROMA_HNSW_SPACE")
+    parser.add_argument("--m", type=int, help="Override CHROMA_HNSW_M")
+    parser.add_argument("--construction-ef", type=int, help="Override CHROMA_HNSW_CONSTRUCTION_EF")
+    parser.add_argument("--search-ef", type=int, help="Override CHROMA_HNSW_SEARCH_EF")
+    parser.add_argument("--hnsw-batch-size", type=int, help="Override CHROMA_HNSW_BATCH_SIZE")
+    parser.add_argument("--sync-threshold", type=int, help="Override CHROMA_HNSW_SYNC_THRESHOLD")
+    parser.add_argument("--queries", type=int, default=200, help="Stored vectors searched before and after (default: 200)")
+    parser.add_argument("--top-k", type=int, default=TOP_K_RESULTS, help=f"Results per search (default: {TOP_K_RESULTS})")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Chunks copied per round trip (default: 1000)")
+    parser.add_argument("--keep-previous", action="store_true", help="Keep the old collection instead of deleting it")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the query sample (default: 0)")
+    args = parser.parse_args()
+
+    overrides = {
+        "hnsw:space": args.space,
+        "hnsw:M": args.m,
+        "hnsw:construction_ef": args.construction_ef,
+        "hnsw:search_ef": args.search_ef,
+        "hnsw:batch_size": args.hnsw_batch_size,
+        "hnsw:sync_threshold": args.sync_threshold,
+    }
+
+    print("=== Rebuild Chroma Collection ===")
+    print(f"DB Path: {CHROMA_DB_DIR}")
+
+    store = ChromaVectorStore(
+        collection_name=args.collection,
+        index_params={key: value for key, value in overrides.items() if value is not None}
+    )
+    count = store.collection.count()
+    print(f"Collection '{args.collection}' has {count} chunk(s)")
+    if not count:
+        print("Nothing to rebuild.")
+        return
+
+    changes = store.pending_index_changes()
+    if changes:
+        print("Index settings:")
+        for key, (current, requested) in changes.items():
+            print(f"  {key:<22}{current} -> {requested}")
+    else:
+        print("Index settings unchanged; compacting only")
+
+    queries = sample_queries(store, args.queries, args.seed)
+    print(f"\nMeasuring {len(queries)} search(es) of top {args.top_k}...")
+    disk_before = directory_mb(Path(CHROMA_DB_DIR))
+    latency_before, results_before = measure(store, queries, args.top_k)
+
+    print(f"Copying {count} chunk(s) into a fresh index...")
+    started = time.perf_counter()
+    try:
+        rebuilt = store.rebuild(batch_size=args.batch_size, keep_previous=args.keep_previous)
+    except Exception as e:
+        print(f"❌ Rebuild failed, '{args.collection}' is unchanged: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+    print(f"✓ Copied {rebuilt['chunks']} chunk(s) in {elapsed:.1f}s ({rebuilt['chunks'] / elapsed:.0f}/s) and switched to the new index")
+    if rebuilt["previous"]:
+        print(f"  The old collection was kept as '{rebuilt['previous']}'")
+
+    latency_after, results_after = measure(store, queries, args.top_k)
+    store.close()
+    disk_after = directory_mb(Path(CHROMA_DB_DIR))
+
+    print(f"\n{'':<26}{'before':>10}{'after':>10}")
+    for key in ("p50_ms", "p95_ms", "p99_ms", "mean_ms", "queries_per_second"):
+        print(f"{'search ' + key:<26}{latency_before[key]:>10.2f}{latency_after[key]:>10.2f}")
+    print(f"{'disk MB':<26}{disk_before:>10.2f}{disk_after:>10.2f}")
+    print(f"\n{agreement(results_before, results_after):.1%} of the top-{args.top_k} results are unchanged")
+    if not args.keep_previous:
+        # SQLite keeps the freed pages of the old collection until the file is vacuumed
+        print(f"Run 'chroma utils vacuum --path {CHROMA_DB_DIR}' to reclaim the disk space")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Retrieval Eval - Recall, MRR, latency and index size across retrieval settings.
+
+Takes labeled questions, one JSON object per line:
+
+    {"question": "How many vacation days do I get?", "relevant": ["hr/vacation_policy.pdf"], "tags": ["hr"]}
+
+where "relevant" lists the documents (paths under the documents folder, or
+bare file names) that answer the question and "tags" is optional. Every
+combination of the swept settings is ingested into a fresh store in its own
+process and then queried with every question:
+- backend, chunk size and chunk overlap
+- Chroma HNSW settings: space, M, construction_ef and search_ef
+- top_k: every value is scored from one search at the largest one
+
+Reported per setting and k: recall@k (share of a question's relevant
+documents among its top k chunks), MRR@k, hit rate, search latency
+(vector search plus keyword fusion when hybrid; embedding excluded),
+chunks and index size on disk. With --min-recall, the cheapest setting
+meeting it is recommended: the least context per question (k x chunk size),
+then the lowest p95 latency.
+
+Parsed text and embeddings come from the parse and embedding caches when
+they are enabled, so settings that share a chunking only pay for indexing.
+--synthetic and --fake-embeddings evaluate offline against a generated corpus.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add the src directory to the Python path to import the application modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmark import directory_mb, latency_summary
+from infrastructure.config import (
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    EMBEDDING_CACHE_PATH,
+    HYBRID_SEARCH_ENABLED,
+    PARSE_CACHE_PATH,
+    RAW_DATA_PATH,
+    TOP_K_RESULTS,
+    VECTOR_BACKEND,
+)
+
+# HNSW options that can be swept, and the Chroma metadata key of each
+HNSW_OPTIONS = {
+    "hnsw_space": "hnsw:space",
+    "hnsw_m": "hnsw:M",
+    "hnsw_construction_ef": "hnsw:construction_ef",
+    "hnsw_search_ef": "hnsw:search_ef",
+}
+
+
+def read_questions(path: Path) -> List[Dict]:
+    """
+    Read labeled questions from a JSONL file.
+
+    Raises:
+        ValueError: If a line is not valid JSON or lacks a question or relevant documents
+    """
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {number}: invalid JSON ({e})")
+            relevant = item.get("relevant") if isinstance(item, dict) else None
+            if isinstance(relevant, str):
+                relevant = [relevant]
+            if not item.get("question") or not relevant:
+                raise ValueError(f"Line {number}: needs \"question\" and \"relevant\"")
+            questions.append({"question": item["question"], "relevant": relevant, "tags": item.get("tags") or None})
+    return questions
+
+
+def document_key(path: str) -> str:
+    """A stored chunk's document, relative to the documents folder."""
+    parts = Path(path).parts
+    # Chunks store paths like .data/raw/hr/policy.pdf
+    return Path(*parts[2:]).as_posix() if len(parts) > 2 else Path(path).as_posix()
+
+
+def _matches(key: str, entry: str) -> bool:
+    return key == entry or key.rsplit("/", 1)[-1] == entry
+
+
+def score(rankings: List[List[str]], relevant: List[List[str]], k: int) -> Dict[str, float]:
+    """
+    Recall@k, MRR@k and hit rate of ranked document keys.
+
+    Args:
+        rankings: Document of each result, best first, per question
+        relevant: Relevant documents (paths or file names) per question
+        k: Number of results considered
+    """
+    recall = reciprocal_rank = hits = 0.0
+    for ranking, entries in zip(rankings, relevant):
+        top = ranking[:k]
+        found = {entry for entry in entries if any(_matches(key, entry) for key in top)}
+        recall += len(found) / len(entries)
+        hits += bool(found)
+        first = next((rank for rank, key in enumerate(top, start=1) if any(_matches(key, entry) for entry in entries)), None)
+        reciprocal_rank += 1.0 / first if first else 0.0
+    count = max(len(rankings), 1)
+    return {
+        "recall": round(recall / count, 4),
+        "mrr": round(reciprocal_rank / count, 4),
+        "hit_rate": round(hits / count, 4)
+    }
+
+
+def run_job(job: Dict) -> Dict:
+    """Ingest the documents with one setting and score the questions; runs in the setting's own process."""
+    from application.ingestion_service import IngestionService
+    from application.pipeline import PipelineSettings
+    from application.rank_fusion import reciprocal_rank_fusion
+    from infrastructure import config
+    from infrastructure.parser.cached_parser import CachedDocumentParser, ParseCache
+    from infrastructure.parser.unstructured_parser import UnstructuredParser
+    from infrastructure.vector.factory import create_lexical_index, create_vector_store
+
+    parser = UnstructuredParser(strategy=config.PARSER_STRATEGY, folder_strategies=config.PARSER_FOLDER_STRATEGIES)
+    if config.PARSE_CACHE_ENABLED:
+        parser = CachedDocumentParser(parser, ParseCache(config.PARSE_CACHE_PATH, config.PARSE_CACHE_MAX_MB * 1024 * 1024))
+
+    if job["fake_embeddings"]:
+        from infrastructure.embedding.fake_embedder import FakeEmbeddingGenerator
+        embedder = FakeEmbeddingGenerator(job["dimensions"])
+    else:
+        from infrastructure.embedding.openai_embedder import OpenAIEmbeddingGenerator
+        from infrastructure.embedding.cached_embedder import CachedEmbeddingGenerator
+        embedder = OpenAIEmbeddingGenerator(model=config.EMBEDDING_MODEL)
+        if config.EMBEDDING_CACHE_ENABLED:
+            embedder = CachedEmbeddingGenerator(
+                embedder,
+                model=config.EMBEDDING_MODEL_KEY,
+                db_path=config.EMBEDDING_CACHE_PATH,
+                max_bytes=config.EMBEDDING_CACHE_MAX_MB * 1024 * 1024
+            )
+
+    if config.VECTOR_BACKEND == "chroma":
+        from infrastructure.vector.chroma_store import ChromaVectorStore
+        store = ChromaVectorStore(collection_name="documents", index_params=job["index_params"])
+    else:
+        store = create_vector_store(collection_name="documents")
+    lexical_index = create_lexical_index(collection_name="documents") if job["hybrid"] else None
+
+    service = IngestionService(
+        parser=parser,
+        embedder=embedder,
+        store=store,
+        chunk_size=job["chunk_size"],
+        chunk_overlap=job["chunk_overlap"],
+        settings=PipelineSettings(
+            parse_workers=config.INGEST_PARSE_WORKERS,
+            embed_workers=config.INGEST_EMBED_WORKERS,
+            queue_size=config.INGEST_QUEUE_SIZE,
+            embed_batch_size=config.INGEST_EMBED_BATCH_SIZE,
+            write_batch_size=config.INGEST_WRITE_BATCH_SIZE,
+            part_chunks=config.INGEST_PART_CHUNKS
+        ),
+        lexical_index=lexical_index
+    )
+    report = service.run(str(config.RAW_DATA_PATH))
+
+    questions = job["questions"]
+    query_embeddings = embedder.embed([question["question"] for question in questions])
+    max_k = max(job["top_k"])
+    depth = max(max_k, config.HYBRID_CANDIDATES) if lexical_index else max_k
+
+    rankings, durations = [], []
+    started = time.perf_counter()
+    for question, embedding in zip(questions, query_embeddings):
+        filters = {"tags": question["tags"]} if question["tags"] else None
+        call_started = time.perf_counter()
+        results = store.search(query_embedding=embedding, top_k=depth, filters=filters)
+        if lexical_index:
+            # Same fusion as QAService in hybrid mode
+            results = reciprocal_rank_fusion(
+                [results, lexical_index.search(question["question"], top_k=depth, filters=filters)],
+                k=config.HYBRID_RRF_K,
+                top_k=max_k
+            )
+        durations.append(time.perf_counter() - call_started)
+        rankings.append([document_key((result.get("metadata") or {}).get("path", "")) for result in results[:max_k]])
+    latency = latency_summary(durations, time.perf_counter() - started)
+    store.close()
+
+    store_dir = Path(config.LOCAL_INDEX_DIR if config.VECTOR_BACKEND == "local" else config.CHROMA_DB_DIR)
+    relevant = [question["relevant"] for question in questions]
+    return {
+        "chunks": report.stages["write"].chunks,
+        "ingest_errors": sum(stats.errors for stats in report.stages.values()),
+        "ingest_seconds": round(report.total_seconds, 3),
+        "index_mb": directory_mb(store_dir) if store_dir.exists() else 0.0,
+        "latency": latency,
+        "scores": {str(k): score(rankings, relevant, k) for k in job["top_k"]}
+    }
+
+
+def settings_grid(args: argparse.Namespace) -> List[Dict]:
+    """Every combination of the swept settings; HNSW options only vary for Chroma."""
+    hnsw_values = {option: _values(getattr(args, option)) for option in HNSW_OPTIONS}
+    grid = []
+    for backend, chunk_size, chunk_overlap in itertools.product(
+        _values(args.backends), _values(args.chunk_sizes, int), _values(args.chunk_overlaps, int)
+    ):
+        if chunk_overlap >= chunk_size:
+            continue
+        options = hnsw_values if backend == "chroma" else {}
+        combinations = itertools.product(*[values or [None] for values in options.values()]) if options else [()]
+        for combination in combinations:
+            index_params = {
+                HNSW_OPTIONS[option]: _number(value)
+                for option, value in zip(options, combination) if value is not None
+            }
+            grid.append({
+                "backend": backend,
+                "chunk_size": chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "index_params": index_params
+            })
+    return grid
+
+
+def _values(spec: Optional[str], cast=str) -> List:
+    return [cast(value.strip()) for value in (spec or "").split(",") if value.strip()]
+
+
+def _number(value: str):
+    return int(value) if value.isdigit() else value
+
+
+def launch_job(setting: Dict, job: Dict, workdir: Path, documents: Path, cache_dir: Path, verbose: bool) -> Dict:
+    """
+    Run one setting in a fresh process with its own store and ledger.
+
+    The parse and embedding caches in cache_dir are shared by every setting,
+    so parsing and embedding are only paid once per chunking.
+    """
+    job_dir = Path(tempfile.mkdtemp(prefix="setting-", dir=workdir))
+    raw_dir = job_dir / ".data" / "raw"
+    raw_dir.parent.mkdir(parents=True)
+    try:
+        raw_dir.symlink_to(documents.resolve(), target_is_directory=True)
+    except OSError:
+        shutil.copytree(documents, raw_dir)
+
+    job_path = job_dir / "job.json"
+    result_path = job_dir / "result.json"
+    job_path.write_text(json.dumps({**job, **setting, "result": str(result_path)}), encoding="utf-8")
+    env = {
+        **os.environ,
+        "VECTOR_BACKEND": setting["backend"],
+        "CHROMA_DB_DIR": str(job_dir / "chroma"),
+        "LOCAL_INDEX_DIR": str(job_dir / "local"),
+        "PARSE_CACHE_PATH": str(cache_dir / PARSE_CACHE_PATH.name),
+        "EMBEDDING_CACHE_PATH": str(cache_dir / EMBEDDING_CACHE_PATH.name),
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(Path(__file__).parent.parent), os.environ.get("PYTHONPATH")]))
+    }
+    completed = subprocess.run(
+        [sys.executable, __file__, "--worker", str(job_path)],
+        cwd=job_dir,
+        env=env,
+        stdout=None if verbose else subprocess.DEVNULL,
+        stderr=None if verbose else subprocess.PIPE,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError((completed.stderr or "").strip()[-2000:] or f"exit status {completed.returncode}")
+    return json.loads(result_path.read_text(encoding="utf-8"))
+
+
+def describe(setting: Dict) -> str:
+    params = ",".join(f"{key.split(':', 1)[1]}={value}" for key, value in setting["index_params"].items())
+    return f"{setting['backend']} {setting['chunk_size']}/{setting['chunk_overlap']}" + (f" {params}" if params else "")
+
+
+def recommend(rows: List[Dict], min_recall: float) -> Optional[Dict]:
+    """Cheapest row meeting the recall bar: least context per question, then lowest p95 latency."""
+    passing = [row for row in rows if row["recall"] >= min_recall]
+    if not passing:
+        return None
+    return min(passing, key=lambda row: (row["k"] * row["chunk_size"], row["p95_ms"], row["index_mb"]))
+
+
+def print_table(rows: List[Dict]) -> None:
+    print(f"\n  {'setting':<44}{'k':>4}{'recall':>8}{'mrr':>7}{'hit':>7}{'p50':>9}{'p95':>9}{'chunks':>8}{'index':>9}")
+    for row in rows:
+        print(
+            f"  {row['setting']:<44}{row['k']:>4}{row['recall']:>8.3f}{row['mrr']:>7.3f}{row['hit_rate']:>7.3f}"
+            f"{row['p50_ms']:>7.2f}ms{row['p95_ms']:>7.2f}ms{row['chunks']:>8}{row['index_mb']:>7.1f}MB"
+        )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Sweep retrieval settings against labeled questions.")
+    arg_parser.add_argument("questions", nargs="?", help="JSONL file of labeled questions")
+    arg_parser.add_argument("--documents", default=str(RAW_DATA_PATH), help=f"Documents folder (default: {RAW_DATA_PATH})")
+    arg_parser.add_argument("--backends", default=VECTOR_BACKEND, help=f"Vector backends (default: {VECTOR_BACKEND})")
+    arg_parser.add_argument("--chunk-sizes", default=str(CHUNK_SIZE), help=f"Chunk sizes in characters (default: {CHUNK_SIZE})")
+    arg_parser.add_argument("--chunk-overlaps", default=str(CHUNK_OVERLAP), help=f"Chunk overlaps (default: {CHUNK_OVERLAP})")
+    arg_parser.add_argument("--top-k", default=",".join(str(k) for k in sorted({1, 3, TOP_K_RESULTS, 10})), help="Values of k to score")
+    arg_parser.add_argument("--hnsw-space", dest="hnsw_space", help="Chroma distance: cosine, ip and/or l2")
+    arg_parser.add_argument("--hnsw-m", dest="hnsw_m", help="Chroma HNSW M (links per node)")
+    arg_parser.add_argument("--hnsw-construction-ef", dest="hnsw_construction_ef", help="Chroma HNSW construction_ef")
+    arg_parser.add_argument("--hnsw-search-ef", dest="hnsw_search_ef", help="Chroma HNSW search_ef")
+    hybrid = arg_parser.add_mutually_exclusive_group()
+    hybrid.add_argument("--hybrid", dest="hybrid", action="store_true", default=HYBRID_SEARCH_ENABLED, help="Fuse BM25 keyword matches in")
+    hybrid.add_argument("--no-hybrid", dest="hybrid", action="store_false", help="Vector search only")
+    arg_parser.add_argument("--min-recall", type=float, help="Recommend the cheapest setting with at least this recall")
+    arg_parser.add_argument("--synthetic", type=int, metavar="DOCUMENTS", help="Evaluate on a generated corpus of this many documents")
+    arg_parser.add_argument("--fake-embeddings", action="store_true", help="Use the offline fake embedder instead of OpenAI")
+    arg_parser.add_argument("--dimensions", type=int, default=384, help="Fake embedding size (default: 384)")
+    arg_parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    arg_parser.add_argument("--verbose", action="store_true", help="Show the output of the setting processes")
+    arg_parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.worker:
+        job = json.loads(Path(args.worker).read_text(encoding="utf-8"))
+        Path(job["result"]).write_text(json.dumps(run_job(job)), encoding="utf-8")
+        return
+
+    if not args.questions and not args.synthetic:
+        arg_parser.error("give a questions file or --synthetic")
+    grid = settings_grid(args)
+    top_k = sorted(set(_values(args.top_k, int)))
+    if not grid or not top_k:
+        arg_parser.error("nothing to evaluate (is every chunk overlap below its chunk size?)")
+
+    workdir = Path(tempfile.mkdtemp(prefix="rag-eval-"))
+    try:
+        documents = Path(args.documents)
+        # The configured caches, or throwaway ones for a generated corpus
+        cache_dir = PARSE_CACHE_PATH.resolve().parent
+        if args.synthetic:
+            from synthetic_corpus import DEFAULT_FILE_MIX, generate_corpus, generate_queries, parse_file_mix, readable_kinds
+            documents = workdir / "corpus"
+            cache_dir = workdir
+            corpus = generate_corpus(documents, args.synthetic, file_mix=readable_kinds(parse_file_mix(DEFAULT_FILE_MIX)))
+            questions = [
+                {"question": query.text, "relevant": query.relevant, "tags": query.tags}
+                for query in generate_queries(corpus, count=200)
+            ]
+        else:
+            try:
+                questions = read_questions(Path(args.questions))
+            except (OSError, ValueError) as e:
+                arg_parser.error(str(e))
+        if not documents.is_dir():
+            arg_parser.error(f"documents folder {documents} does not exist")
+
+        job = {"questions": questions, "top_k": top_k, "hybrid": args.hybrid, "fake_embeddings": args.fake_embeddings, "dimensions": args.dimensions}
+        print(f"Evaluating {len(grid)} setting(s) with {len(questions)} question(s)...", file=sys.stderr)
+        results, rows = [], []
+        for number, setting in enumerate(grid, start=1):
+            print(f"  [{number}/{len(grid)}] {describe(setting)}", file=sys.stderr)
+            try:
+                result = launch_job(setting, job, workdir, documents, cache_dir, args.verbose)
+            except Exception as e:
+                print(f"    failed: {str(e).splitlines()[-1] if str(e) else e}", file=sys.stderr)
+                results.append({**setting, "error": str(e)})
+                continue
+            results.append({**setting, **result})
+            for k, scores in result["scores"].items():
+                rows.append({
+                    "setting": describe(setting),
+                    "k": int(k),
+                    "chunk_size": setting["chunk_size"],
+                    **scores,
+                    "p50_ms": result["latency"]["p50_ms"],
+                    "p95_ms": result["latency"]["p95_ms"],
+                    "chunks": result["chunks"],
+                    "index_mb": result["index_mb"]
+                })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(rows)
+    recommended = None
+    if args.min_recall is not None:
+        recommended = recommend(rows, args.min_recall)
+        if recommended:
+            print(
+                f"\nCheapest setting with recall >= {args.min_recall}: {recommended['setting']} at k={recommended['k']} "
+                f"(recall {recommended['recall']:.3f}, p95 {recommended['p95_ms']:.2f}ms)"
+            )
+        else:
+            print(f"\nNo setting reaches recall {args.min_recall}")
+    if args.output:
+        Path(args.output).write_text(json.dumps({"settings": results, "recommended": recommended}, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+    if any("error" in result for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
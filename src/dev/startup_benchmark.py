@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - How long the entry points take before they can do any work.
+
+Each entry point is imported in a fresh interpreter with -X importtime, so
+every run pays the full import cost. Reported per entry point:
+- import: time to import the module, i.e. until the CLI can show its prompt
+- setup: time for main.setup_dependencies() (backends loading in the background)
+- the direct imports that cost the most, from Python's import timing
+
+--json prints one JSON object instead of the table, for tracking over time.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SRC_DIR = Path(__file__).parent.parent
+
+# Entry points and whether they have a setup_dependencies() to time
+ENTRY_POINTS = {"main": True, "ingest_documents": False}
+
+_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+setup = None
+if {setup}:
+    {module}.setup_dependencies(log=lambda message: None)
+    setup = time.perf_counter() - imported
+print(json.dumps({{"import": imported - started, "setup": setup}}))
+"""
+
+
+def parse_importtime(stderr: str, module: str) -> List[Tuple[str, float]]:
+    """Direct imports of a module with their cumulative import time in seconds, slowest first."""
+    entries: List[Tuple[int, str, float]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        # One space follows the separator, then two per nesting level
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((depth, name.strip(), int(cumulative) / 1e6))
+
+    # Python prints children before their parent, so the module's direct
+    # imports are the depth-1 entries right above its own depth-0 line
+    direct: List[Tuple[str, float]] = []
+    for depth, name, seconds in entries:
+        if depth == 0 and name != module:
+            direct = []
+        elif depth == 0:
+            break
+        elif depth == 1:
+            direct.append((name, seconds))
+    return sorted(direct, key=lambda item: item[1], reverse=True)
+
+
+def measure(module: str, setup: bool) -> Dict:
+    """Import a module (and optionally set up its dependencies) in a fresh interpreter."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")]))}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD.format(module=module, setup=setup)],
+        cwd=SRC_DIR.parent,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{module} failed to start:\n{completed.stderr[-2000:]}")
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {**timings, "imports": parse_importtime(completed.stderr, module)}
+
+
+def summarize(module: str, runs: int, setup: bool, top: int) -> Dict:
+    """Median timings of several runs and the slowest imports of the last one."""
+    results = [measure(module, setup) for _ in range(runs)]
+    summary = {
+        "module": module,
+        "runs": runs,
+        "import_seconds": statistics.median(result["import"] for result in results),
+        "setup_seconds": statistics.median(result["setup"] for result in results) if setup else None,
+        "slowest_imports": [
+            {"module": name, "seconds": round(seconds, 4)} for name, seconds in results[-1]["imports"][:top]
+        ]
+    }
+    summary["ready_seconds"] = summary["import_seconds"] + (summary["setup_seconds"] or 0.0)
+    return summary
+
+
+def print_report(summaries: List[Dict]) -> None:
+    for summary in summaries:
+        print(f"\n{summary['module']} (median of {summary['runs']} run(s))")
+        print(f"  import: {summary['import_seconds']:.3f}s")
+        if summary["setup_seconds"] is not None:
+            print(f"  setup:  {summary['setup_seconds']:.3f}s (overlaps typing the first question)")
+        print("  slowest direct imports:")
+        for item in summary["slowest_imports"]:
+            print(f"    {item['seconds']:>7.3f}s  {item['module']}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Measure entry point startup time.")
+    arg_parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per entry point (default: 3)")
+    arg_parser.add_argument("--top", type=int, default=8, help="Slowest imports listed per entry point (default: 8)")
+    arg_parser.add_argument("--no-setup", action="store_true", help="Only time imports (no API key or vector store needed)")
+    arg_parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = arg_parser.parse_args()
+
+    summaries = [
+        summarize(module, args.runs, has_setup and not args.no_setup, args.top)
+        for module, has_setup in ENTRY_POINTS.items()
+    ]
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0], "entry_points": summaries}, indent=2))
+    else:
+        print("=== Startup Benchmark ===")
+        print_report(summaries)
+
+
+if __name__ == "__main__":
+    main()
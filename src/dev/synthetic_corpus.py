@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Synthetic Corpus - Reproducible documents and questions for offline benchmarks.
+
+Generates a folder tree like data/raw (one folder per tag) of .txt, .pdf
+and .docx files in a configurable mix, plus questions whose source document
+is known. Text is made of pseudo-words: words shared by every document,
+words of the document's topic, and a few key terms (like names or codes)
+that belong to one document. Other documents of the same topic mention
+each key term in passing, so every question has distractors sharing its
+vocabulary, and a question names a single key term among topic words.
+The same seed always gives the same corpus.
+
+PDF and DOCX files are written without any library. Kinds that the parser
+could not read here (pypdf or python-docx missing) are left out of the mix.
+
+Usage:
+    python src/dev/synthetic_corpus.py OUTPUT_DIR [--documents 200] [--file-mix txt=70,pdf=15,docx=15]
+
+writes the files and a manifest.json with the documents and questions.
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import random
+import sys
+import zipfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+DEFAULT_FILE_MIX = "txt=70,pdf=15,docx=15"
+DEFAULT_TAGS = ("hr", "it", "finance", "legal")
+
+# Library each kind's fast reader needs
+_READERS = {"txt": None, "pdf": "pypdf", "docx": "docx"}
+
+_SYLLABLES = [c + v for c in "bdfgklmnprstvz" for v in "aeiou"]
+
+# Other documents of the same topic that mention each key term in passing
+_DISTRACTORS_PER_TERM = 2
+
+# Most frequent words of a topic, which questions draw from
+_QUESTION_TOPIC_WORDS = 20
+
+# Words per PDF page and characters per PDF line
+_PDF_PAGE_WORDS = 450
+_PDF_LINE_CHARS = 90
+
+
+@dataclass
+class SyntheticDocument:
+    path: str  # Relative to the corpus directory
+    kind: str
+    tag: str
+    topic: int
+    words: int
+    key_terms: List[str]
+    # Key terms of other documents of the topic that this one mentions in passing
+    borrowed_terms: List[str] = field(default_factory=list)
+    # Frequent words of the document's topic, shared with the other documents of the topic
+    topic_terms: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SyntheticQuery:
+    text: str
+    tags: Optional[List[str]]
+    # Documents (relative paths) the question was drawn from
+    relevant: List[str]
+
+
+def parse_file_mix(spec: str) -> Dict[str, float]:
+    """
+    Parse "txt=70,pdf=15,docx=15" into normalized weights.
+
+    Raises:
+        ValueError: For unknown kinds or non-positive totals
+    """
+    weights: Dict[str, float] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        kind, _, weight = item.partition("=")
+        kind = kind.strip().lower().lstrip(".")
+        if kind not in _READERS:
+            raise ValueError(f"Unknown file kind {kind!r}; use {', '.join(_READERS)}")
+        weights[kind] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError(f"File mix {spec!r} has no positive weight")
+    return {kind: weight / total for kind, weight in weights.items() if weight > 0}
+
+
+def readable_kinds(file_mix: Dict[str, float]) -> Dict[str, float]:
+    """The file mix without kinds whose reader library is not installed."""
+    kept = {
+        kind: weight for kind, weight in file_mix.items()
+        if _READERS[kind] is None or importlib.util.find_spec(_READERS[kind]) is not None
+    }
+    for kind in file_mix.keys() - kept.keys():
+        print(f"Note: no .{kind} files generated ({_READERS[kind]} is not installed)", file=sys.stderr)
+    return kept or {"txt": 1.0}
+
+
+class _Vocabulary:
+    """Pseudo-words: a common pool with Zipf-like frequencies and one pool per topic."""
+
+    def __init__(self, rng: random.Random, topics: int, common_words: int = 3000, topic_words: int = 200):
+        seen = set()
+
+        def fresh_word() -> str:
+            while True:
+                word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+                if word not in seen:
+                    seen.add(word)
+                    return word
+
+        self.fresh_word = fresh_word
+        self.common = [fresh_word() for _ in range(common_words)]
+        self.common_weights = _cumulative([1.0 / (rank + 1) for rank in range(common_words)])
+        self.topics = [[fresh_word() for _ in range(topic_words)] for _ in range(topics)]
+        self.topic_weights = _cumulative([1.0 / math.sqrt(rank + 1) for rank in range(topic_words)])
+
+
+def _cumulative(weights: Sequence[float]) -> List[float]:
+    total, result = 0.0, []
+    for weight in weights:
+        total += weight
+        result.append(total)
+    return result
+
+
+def _document_text(
+    rng: random.Random,
+    vocabulary: _Vocabulary,
+    topic: int,
+    key_terms: List[str],
+    borrowed_terms: List[str],
+    words: int
+) -> str:
+    """
+    Paragraphs of sentences mixing common, topic, key and borrowed words (about 58/30/8/4%).
+
+    A borrowed term is mentioned about a quarter as often as a key term is in its own document.
+    """
+    paragraphs, sentences, written = [], [], 0
+    weights = (58, 30, 8, 4) if borrowed_terms else (58, 30, 8, 0)
+    while written < words:
+        length = rng.randint(8, 20)
+        draws = rng.choices(("common", "topic", "key", "borrowed"), weights=weights, k=length)
+        sentence = [
+            rng.choices(vocabulary.common, cum_weights=vocabulary.common_weights)[0] if draw == "common"
+            else rng.choices(vocabulary.topics[topic], cum_weights=vocabulary.topic_weights)[0] if draw == "topic"
+            else rng.choice(key_terms) if draw == "key"
+            else rng.choice(borrowed_terms)
+            for draw in draws
+        ]
+        sentences.append(sentence[0].capitalize() + " " + " ".join(sentence[1:]) + ".")
+        written += length
+        if len(sentences) >= rng.randint(3, 7):
+            paragraphs.append(" ".join(sentences))
+            sentences = []
+    if sentences:
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+
+def generate_corpus(
+    directory: Path,
+    documents: int = 200,
+    words_per_document: int = 1500,
+    file_mix: Optional[Dict[str, float]] = None,
+    tags: Sequence[str] = DEFAULT_TAGS,
+    seed: int = 0
+) -> List[SyntheticDocument]:
+    """
+    Write a synthetic corpus into a directory, one subfolder per tag.
+
+    Document lengths vary around words_per_document (log-normal), so a few
+    documents are several times longer than the rest. Each key term is also
+    mentioned in passing by up to two other documents of the same topic.
+
+    Args:
+        directory: Where to write the files (created if missing)
+        documents: Number of documents
+        words_per_document: Median document length in words
+        file_mix: Share of each kind ("txt", "pdf", "docx"); text files only by default
+        tags: Tag folders the documents are spread over
+        seed: Random seed; the same arguments always produce the same corpus
+
+    Returns:
+        The generated documents
+    """
+    rng = random.Random(seed)
+    file_mix = file_mix or {"txt": 1.0}
+    kinds, weights = list(file_mix), list(file_mix.values())
+    topics = max(documents // 10, 1)
+    vocabulary = _Vocabulary(rng, topics)
+
+    result = []
+    for number in range(documents):
+        tag = tags[number % len(tags)]
+        topic = rng.randrange(topics)
+        kind = rng.choices(kinds, weights=weights)[0]
+        key_terms = [vocabulary.fresh_word() for _ in range(5)]
+        words = max(50, int(rng.lognormvariate(math.log(words_per_document), 0.6)))
+        path = Path(tag) / f"doc_{number:05d}.{kind}"
+        result.append(SyntheticDocument(
+            path.as_posix(), kind, tag, topic, words, key_terms,
+            topic_terms=vocabulary.topics[topic][:_QUESTION_TOPIC_WORDS]
+        ))
+
+    # Distractors: documents of the same topic mention each key term in passing
+    by_topic: Dict[int, List[SyntheticDocument]] = {}
+    for document in result:
+        by_topic.setdefault(document.topic, []).append(document)
+    for document in result:
+        others = [other for other in by_topic[document.topic] if other is not document]
+        for term in document.key_terms:
+            for other in rng.sample(others, min(_DISTRACTORS_PER_TERM, len(others))):
+                other.borrowed_terms.append(term)
+
+    for document in result:
+        text = _document_text(rng, vocabulary, document.topic, document.key_terms, document.borrowed_terms, document.words)
+        (directory / document.tag).mkdir(parents=True, exist_ok=True)
+        _WRITERS[document.kind](directory / document.path, text)
+    return result
+
+
+def generate_queries(
+    documents: List[SyntheticDocument],
+    count: int = 200,
+    tagged_share: float = 0.3,
+    seed: int = 0
+) -> List[SyntheticQuery]:
+    """
+    Draw questions from the documents: one of a document's key terms, two words of its topic and filler words.
+
+    The key term also appears in distractor documents of the same topic,
+    which share the topic words too, so the source document has to win on
+    how much it is about the term rather than on the term alone.
+
+    Args:
+        documents: The corpus the questions are about
+        count: Number of questions
+        tagged_share: Share of questions restricted to their document's tag
+        seed: Random seed
+
+    Returns:
+        Questions, each with the document it came from as the relevant one
+    """
+    rng = random.Random(seed + 1)
+    fillers = ["what", "is", "the", "policy", "for", "how", "does", "work", "who", "handles"]
+    queries = []
+    for _ in range(count):
+        document = rng.choice(documents)
+        words = [rng.choice(document.key_terms)] + rng.sample(document.topic_terms, 2) + rng.sample(fillers, 3)
+        rng.shuffle(words)
+        queries.append(SyntheticQuery(
+            text=" ".join(words).capitalize() + "?",
+            tags=[document.tag] if rng.random() < tagged_share else None,
+            relevant=[document.path]
+        ))
+    return queries
+
+
+def write_manifest(directory: Path, documents: List[SyntheticDocument], queries: List[SyntheticQuery], settings: Dict) -> Path:
+    path = directory / "manifest.json"
+    path.write_text(json.dumps({
+        "settings": settings,
+        "documents": [asdict(document) for document in documents],
+        "queries": [asdict(query) for query in queries]
+    }, indent=1), encoding="utf-8")
+    return path
+
+
+def load_manifest(directory: Path) -> Dict:
+    """Settings, documents and queries of a generated corpus."""
+    manifest = json.loads((directory / "manifest.json").read_text(encoding="utf-8"))
+    manifest["documents"] = [SyntheticDocument(**item) for item in manifest["documents"]]
+    manifest["queries"] = [SyntheticQuery(**item) for item in manifest["queries"]]
+    return manifest
+
+
+def _write_txt(path: Path, text: str) -> None:
+    path.write_text(text, encoding="utf-8")
+
+
+def _write_pdf(path: Path, text: str) -> None:
+    """A plain PDF with one Helvetica text page per ~450 words."""
+    words = text.split()
+    pages = [words[start:start + _PDF_PAGE_WORDS] for start in range(0, len(words), _PDF_PAGE_WORDS)] or [[]]
+
+    objects: List[bytes] = []
+    page_ids = []
+    for page_words in pages:
+        lines, line = [], ""
+        for word in page_words:
+            if line and len(line) + len(word) + 1 > _PDF_LINE_CHARS:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        lines.append(line)
+        shown = " T* ".join(
+            "(" + item.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") Tj" for item in lines
+        )
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {shown} ET".encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects) + 3
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects) + 3)
+
+    header = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % i for i in page_ids), len(page_ids)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    body = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(header + objects, start=1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(body)
+    body += b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1)
+    body += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    body += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref)
+    path.write_bytes(bytes(body))
+
+
+def _write_docx(path: Path, text: str) -> None:
+    """A minimal DOCX package with one paragraph per text paragraph."""
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(paragraph)}</w:t></w:r></w:p>'
+        for paragraph in text.split("\n\n")
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ))
+        package.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/>'
+            '</Relationships>'
+        ))
+        package.writestr("word/document.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{paragraphs}</w:body></w:document>'
+        ))
+
+
+_WRITERS = {"txt": _write_txt, "pdf": _write_pdf, "docx": _write_docx}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Generate a synthetic corpus with questions.")
+    arg_parser.add_argument("output", help="Directory for the documents and manifest.json")
+    arg_parser.add_argument("--documents", type=int, default=200, help="Number of documents (default: 200)")
+    arg_parser.add_argument("--words", type=int, default=1500, help="Median words per document (default: 1500)")
+    arg_parser.add_argument("--file-mix", default=DEFAULT_FILE_MIX, help=f"Share of each file kind (default: {DEFAULT_FILE_MIX})")
+    arg_parser.add_argument("--queries", type=int, default=200, help="Number of questions (default: 200)")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = arg_parser.parse_args()
+
+    try:
+        file_mix = readable_kinds(parse_file_mix(args.file_mix))
+    except ValueError as e:
+        arg_parser.error(str(e))
+
+    output = Path(args.output)
+    documents = generate_corpus(output, args.documents, args.words, file_mix, seed=args.seed)
+    queries = generate_queries(documents, args.queries, seed=args.seed)
+    settings = {"documents": args.documents, "words": args.words, "file_mix": file_mix, "seed": args.seed}
+    manifest = write_manifest(output, documents, queries, settings)
+    print(f"Wrote {len(documents)} document(s) and {len(queries)} question(s); manifest at {manifest}")
+
+
+if __name__ == "__main__":
+    main()
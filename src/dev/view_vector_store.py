@@ -18,6 +18,8 @@ from chromadb.config import Settings
 
 # Import configuration
 from src.infrastructure.config import CHROMA_DB_DIR
+from src.domain.models.document import TAG_KEY_PREFIX
+from src.infrastructure.vector.chroma_catalog import active_collection_name
 
 # Try to import rich for pretty printing, fall back to standard printing if not available
 try:
@@ -49,8 +51,8 @@ def format_metadata(metadata):
     # Format each key-value pair
     formatted = []
     for key, value in metadata.items():
-        # Skip content to avoid redundancy
-        if key == "content":
+        # Skip content and per-tag filter keys to avoid redundancy
+        if key == "content" or key.startswith(TAG_KEY_PREFIX):
             continue
         formatted.append(f"{key}: {value}")
     
@@ -229,7 +231,8 @@ def main():
         
         # Access the 'documents' collection
         try:
-            collection = client.get_collection("documents")
+            # A rebuilt collection is stored under another name; the catalog says which
+            collection = client.get_collection(active_collection_name(Path(CHROMA_DB_DIR), "documents"))
             count = collection.count()
             
             if HAS_RICH:
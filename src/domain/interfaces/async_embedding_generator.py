@@ -0,0 +1,8 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+class AsyncEmbeddingGenerator(ABC):
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Generate vector embeddings for a list of texts without blocking the event loop."""
+        pass
@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List
+
+class AsyncLLMClient(ABC):
+    @abstractmethod
+    async def answer(self, question: str, context_chunks: List[str]) -> str:
+        """
+        Generate an answer to a question based on provided context chunks.
+        
+        Args:
+            question: The user's question to answer
+            context_chunks: List of text chunks containing context for answering the question
+            
+        Returns:
+            str: The answer generated by the language model
+        """
+        pass
+
+    async def stream_answer(self, question: str, context_chunks: List[str]) -> AsyncIterator[str]:
+        """
+        Generate an answer incrementally, yielding text fragments as they are produced.
+        
+        Clients without native streaming inherit this fallback, which yields the
+        complete answer as a single fragment.
+        """
+        yield await self.answer(question, context_chunks)
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Any, List, Dict, Optional
+
+class AsyncVectorStore(ABC):
+    @abstractmethod
+    async def search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
+        """Return the top_k chunks closest to the query embedding (see VectorStore.search)."""
+        pass
+
+    def close(self) -> None:
+        """Release the store once no more searches will be made."""
+        pass
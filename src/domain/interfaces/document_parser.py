@@ -1,8 +1,38 @@
 from abc import ABC, abstractmethod
 from domain.models.document import Document
-from typing import List
+from typing import Iterator, List, Optional
 
 class DocumentParser(ABC):
+    # Bump when a change makes the parser extract different text from the same file
+    version = "1"
+
     @abstractmethod
     def parse(self, file_path: str) -> Document:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def describe(self, file_path: str) -> Document:
+        """Build the document metadata (name, path, tags) without parsing its content."""
+        pass
+
+    def parse_pages(self, file_path: str, content_hash: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield the document's text piece by piece (e.g. page by page), in order.
+
+        Joining the pieces with newlines gives the content parse() returns.
+        Parsers that can read a file incrementally override this so large
+        documents never have to be held in memory at once. content_hash is
+        the SHA-256 of the file's content when the caller already knows it,
+        so parsers that key anything on the content need not read it twice.
+        """
+        yield self.parse(file_path).content
+
+    def cache_key(self, file_path: str) -> str:
+        """
+        Identify how parse_pages would read the file, apart from its content.
+
+        Two calls with the same key on byte-identical files must yield the
+        same text, so parsed output can be cached by file hash and this key.
+        Parsers with options that change the output include them here.
+        """
+        return f"{type(self).__name__}/{self.version}"
@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from domain.models.document import Chunk
+
+class LexicalIndex(ABC):
+    """Keyword index over chunk text, complementing the vector store for exact terms and codes."""
+
+    @abstractmethod
+    def add_chunks(self, chunks: List[Chunk]) -> None:
+        """Index chunks, replacing any already stored under the same document and chunk ID."""
+        pass
+
+    @abstractmethod
+    def search(self, query_text: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """
+        Return the top_k chunks matching the query terms, best first.
+
+        Results have the same shape as VectorStore.search ("id", "metadata",
+        "content", "score") and filters follow the same rules.
+        """
+        pass
+
+    @abstractmethod
+    def existing_chunk_ids(self, document_id: str, chunk_ids: List[str]) -> Set[str]:
+        """Return the subset of the document's chunk IDs that are already indexed."""
+        pass
+
+    @abstractmethod
+    def delete_document(self, document_id: str, keep_chunk_ids: Optional[Iterable[str]] = None) -> None:
+        """Remove the document's chunks, except keep_chunk_ids."""
+        pass
+
+    @abstractmethod
+    def update_document_metadata(self, document_id: str, updates: Dict) -> None:
+        """Merge metadata updates into every chunk of the given document; None removes a key."""
+        pass
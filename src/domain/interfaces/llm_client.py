@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 
 class LLMClient(ABC):
     @abstractmethod
@@ -14,4 +14,20 @@ class LLMClient(ABC):
         Returns:
             str: The answer generated by the language model
         """
-        pass 
\ No newline at end of file
+        pass
+
+    def stream_answer(self, question: str, context_chunks: List[str]) -> Iterator[str]:
+        """
+        Generate an answer incrementally, yielding text fragments as they are produced.
+        
+        Clients without native streaming (e.g. test stubs) inherit this fallback,
+        which yields the complete answer as a single fragment.
+        
+        Args:
+            question: The user's question to answer
+            context_chunks: List of text chunks containing context for answering the question
+            
+        Yields:
+            str: Consecutive fragments of the answer
+        """
+        yield self.answer(question, context_chunks)
@@ -0,0 +1,80 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class Span(ABC):
+    """
+    A timed step, used as a context manager.
+
+    The span starts when entered and ends when exited; attributes such as
+    token counts and payload sizes can be added at any point in between.
+    """
+
+    # False for spans that are not recorded, so callers can skip computing attributes
+    recording = True
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        pass
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        pass
+
+
+class Tracer(ABC):
+    @abstractmethod
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None, parent: Optional[Span] = None) -> Span:
+        """
+        Create a span for a step.
+
+        Args:
+            name: Step name, e.g. "qa.embed"
+            attributes: Initial attributes
+            parent: Enclosing span; defaults to the span currently open in this context
+        """
+        pass
+
+    @abstractmethod
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[Span] = None
+    ) -> None:
+        """Record a step that was timed elsewhere (e.g. in a worker process)."""
+        pass
+
+    def close(self) -> None:
+        """Flush whatever the tracer buffered."""
+        pass
+
+
+class _NullSpan(Span):
+    recording = False
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTracer(Tracer):
+    """Tracer that records nothing; the default, so disabled tracing costs a method call per step."""
+
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None, parent: Optional[Span] = None) -> Span:
+        return _NULL_SPAN
+
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[Span] = None
+    ) -> None:
+        pass
@@ -1,11 +1,111 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Any, Iterable, List, Dict, Optional, Set
+
+
+class VectorWriteError(Exception):
+    """A buffered write failed; the chunks it carried, of document_ids, were not stored."""
+
+    def __init__(self, message: str, document_ids: Set[str]):
+        super().__init__(message)
+        self.document_ids = document_ids
+
 
 class VectorStore(ABC):
     @abstractmethod
-    def add_documents(self, embeddings: List[List[float]], metadatas: List[Dict]):
+    def add_documents(
+        self,
+        embeddings: List[List[float]],
+        metadatas: List[Dict],
+        contents: Optional[List[str]] = None
+    ):
+        """
+        Store chunk embeddings along with their metadata and text.
+
+        Backends may buffer chunks across calls until flush(); a buffered
+        write that fails later raises VectorWriteError naming the documents
+        it concerned, whichever call triggered it.
+
+        Args:
+            embeddings: One embedding per chunk
+            metadatas: One metadata dict per chunk (document_id, chunk_id, tags, ...)
+            contents: Text of each chunk, stored once and returned as "content" by search.
+                Older callers that pass it as a "content" metadata key are still accepted.
+        """
+        pass
+
+    def flush(self) -> None:
+        """
+        Write chunks that add_documents buffered.
+
+        Backends that batch writes across calls override this; the default
+        does nothing, since add_documents has already written everything.
+
+        Raises:
+            VectorWriteError: If a write failed; it names the documents whose chunks were lost
+        """
         pass
 
+    def buffered_document_ids(self) -> Set[str]:
+        """IDs of documents with chunks that add_documents buffered but has not written yet."""
+        return set()
+
+    def close(self) -> None:
+        """Write buffered chunks and release the store."""
+        self.flush()
+
     @abstractmethod
-    def search(self, query_embedding: List[float], top_k: int = 5) -> List[Dict]:
-        pass
\ No newline at end of file
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
+        """
+        Return the top_k chunks closest to the query embedding.
+
+        Args:
+            query_embedding: Embedding of the query text
+            top_k: Number of results to return
+            filters: Metadata conditions applied inside the index, combined with AND.
+                The "tags" key takes a list and matches chunks carrying any of them;
+                any other key matches a single value, or any value of a list.
+        """
+        pass
+
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict]]:
+        """
+        Run several searches that share top_k and filters.
+
+        Backends that can answer many queries in one pass override this;
+        the default searches one query at a time.
+
+        Returns:
+            One result list per query embedding, in the same order
+        """
+        return [self.search(query_embedding, top_k=top_k, filters=filters) for query_embedding in query_embeddings]
+
+    @abstractmethod
+    def existing_chunk_ids(self, document_id: str, chunk_ids: List[str]) -> Set[str]:
+        """Return the subset of the document's chunk IDs that are already stored."""
+        pass
+
+    @abstractmethod
+    def delete_document(self, document_id: str, keep_chunk_ids: Optional[Iterable[str]] = None) -> None:
+        """
+        Remove the chunks that belong to the given document.
+
+        Args:
+            document_id: Document whose chunks are removed
+            keep_chunk_ids: Chunk IDs to leave in place (e.g. those of the current version)
+        """
+        pass
+
+    @abstractmethod
+    def update_document_metadata(self, document_id: str, updates: Dict) -> None:
+        """Merge metadata updates into every chunk of the given document without re-embedding; None removes a key."""
+        pass
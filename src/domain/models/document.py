@@ -1,6 +1,12 @@
+import hashlib
+import uuid
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List, Dict
 
+# Prefix of the per-tag boolean metadata keys that make tags filterable
+TAG_KEY_PREFIX = "tag_"
+
 @dataclass
 class Document:
     id: str
@@ -14,4 +20,38 @@ class Chunk:
     document_id: str
     content: str
     chunk_id: str
-    metadata: Dict[str, str]
\ No newline at end of file
+    metadata: Dict[str, str]
+
+def tag_key(tag: str) -> str:
+    """Metadata key that flags a chunk as carrying the given tag."""
+    return f"{TAG_KEY_PREFIX}{tag}"
+
+def tag_metadata(tags: List[str]) -> Dict[str, bool]:
+    """One boolean metadata key per tag, so vector stores can filter on tags inside the index."""
+    return {tag_key(tag): True for tag in tags}
+
+def tags_of(metadata: Dict) -> List[str]:
+    """Tags a chunk carries, read back from its per-tag boolean keys."""
+    return [key[len(TAG_KEY_PREFIX):] for key in metadata if key.startswith(TAG_KEY_PREFIX)]
+
+def merged_metadata(metadata: Dict, updates: Dict) -> Dict:
+    """Metadata with updates applied; a None value removes the key."""
+    return {key: value for key, value in {**metadata, **updates}.items() if value is not None}
+
+
+def new_document_id() -> str:
+    """A fresh document ID; the ingestion ledger keeps it for the file from then on, renames included."""
+    return str(uuid.uuid4())
+
+def hash_file(file_path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content, computed without loading it all in memory."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def chunk_id_for(index: int, content: str) -> str:
+    """Stable chunk ID from its position and text; unchanged chunks keep their ID across runs."""
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+    return f"{index}-{digest}"
@@ -8,16 +8,115 @@ load_dotenv()
 # === OpenAI Config ===
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+# Shortened embeddings (text-embedding-3 models only); 0 keeps the model's native size
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0"))
+# Identifies the vectors an embedding request produces, e.g. for cache keys
+EMBEDDING_MODEL_KEY = f"{EMBEDDING_MODEL}@{EMBEDDING_DIMENSIONS}" if EMBEDDING_DIMENSIONS else EMBEDDING_MODEL
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.1"))
 LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "1000"))
+# Alternative API endpoint, e.g. the local fake embedding server
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# === Embedding Requests ===
+EMBEDDING_MAX_REQUEST_TOKENS = int(os.getenv("EMBEDDING_MAX_REQUEST_TOKENS", "100000"))
+EMBEDDING_MAX_REQUEST_INPUTS = int(os.getenv("EMBEDDING_MAX_REQUEST_INPUTS", "2048"))
+EMBEDDING_MAX_INPUT_TOKENS = int(os.getenv("EMBEDDING_MAX_INPUT_TOKENS", "8191"))
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+EMBEDDING_REQUESTS_PER_MINUTE = int(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "0"))  # 0 = unlimited
+EMBEDDING_TOKENS_PER_MINUTE = int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "0"))  # 0 = unlimited
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "6"))
+
+# === Embedding Cache ===
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "2048"))
+
+# === Vector Store ===
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()  # "chroma" or "local"
 
 # === Chroma Config ===
 CHROMA_DB_DIR = os.getenv("CHROMA_DB_DIR", ".chroma/")
+# HNSW index settings, fixed when a collection is created (make rebuild-index applies changes); 0 = Chroma's default
+CHROMA_HNSW_SPACE = os.getenv("CHROMA_HNSW_SPACE", "cosine")  # cosine, l2 or ip
+CHROMA_HNSW_M = int(os.getenv("CHROMA_HNSW_M", "0"))  # Links per node (Chroma: 16)
+CHROMA_HNSW_CONSTRUCTION_EF = int(os.getenv("CHROMA_HNSW_CONSTRUCTION_EF", "0"))  # Candidates per insert (Chroma: 100)
+CHROMA_HNSW_SEARCH_EF = int(os.getenv("CHROMA_HNSW_SEARCH_EF", "0"))  # Candidates per query (Chroma: 100)
+CHROMA_HNSW_BATCH_SIZE = int(os.getenv("CHROMA_HNSW_BATCH_SIZE", "0"))  # Vectors buffered before joining the graph (Chroma: 100)
+CHROMA_HNSW_SYNC_THRESHOLD = int(os.getenv("CHROMA_HNSW_SYNC_THRESHOLD", "0"))  # Vectors added between index saves (Chroma: 1000)
+# Writes are buffered and upserted in batches capped by chunk count and size
+CHROMA_WRITE_BATCH_SIZE = int(os.getenv("CHROMA_WRITE_BATCH_SIZE", "0"))  # 0 = the most the client accepts per call
+CHROMA_WRITE_BATCH_MB = float(os.getenv("CHROMA_WRITE_BATCH_MB", "32"))
+
+# === Local Index Config (VECTOR_BACKEND=local) ===
+LOCAL_INDEX_DIR = Path(os.getenv("LOCAL_INDEX_DIR", ".local_index/"))
+LOCAL_INDEX_DTYPE = os.getenv("LOCAL_INDEX_DTYPE", "float32")  # float32, float16 (1/2 the size) or int8 (1/4)
+LOCAL_INDEX_NPROBE = int(os.getenv("LOCAL_INDEX_NPROBE", "8"))  # IVF lists scanned per query, once built
+LOCAL_INDEX_RESCORE = int(os.getenv("LOCAL_INDEX_RESCORE", "4"))  # Rescore top_k x N with full precision (0 = off)
+
+# === Hybrid Search (BM25 keyword index fused with vector results) ===
+HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))  # Results taken from each retriever before fusion
 
 # === Data Paths ===
 RAW_DATA_PATH = Path(".data/raw")
 PROCESSED_DATA_PATH = Path(".data/processed")
+EMBEDDING_CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", str(PROCESSED_DATA_PATH / "embedding_cache.db")))
+
+# === Ingestion Pipeline ===
+INGEST_PARSE_WORKERS = int(os.getenv("INGEST_PARSE_WORKERS", str(os.cpu_count() or 1)))
+INGEST_EMBED_WORKERS = int(os.getenv("INGEST_EMBED_WORKERS", "4"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "32"))
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "1024"))
+INGEST_WRITE_BATCH_SIZE = int(os.getenv("INGEST_WRITE_BATCH_SIZE", "256"))
+INGEST_PART_CHUNKS = int(os.getenv("INGEST_PART_CHUNKS", "512"))  # Large documents are embedded in parts of this many chunks
+
+# === Document Parsing ===
+PARSER_STRATEGY = os.getenv("PARSER_STRATEGY", "fast")  # fast, auto, hi_res or ocr_only
+# Per-folder overrides, e.g. "scans=ocr_only,legal/contracts=hi_res"
+PARSER_FOLDER_STRATEGIES = {
+    folder.strip(): strategy.strip()
+    for folder, strategy in (
+        item.split("=", 1) for item in os.getenv("PARSER_FOLDER_STRATEGIES", "").split(",") if "=" in item
+    )
+}
+
+# === Parse Cache (extracted text reused when only chunking or embedding settings change) ===
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+PARSE_CACHE_MAX_MB = int(os.getenv("PARSE_CACHE_MAX_MB", "1024"))
+PARSE_CACHE_PATH = Path(os.getenv("PARSE_CACHE_PATH", str(PROCESSED_DATA_PATH / "parse_cache.db")))
+
+# === Chunking ===
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))  # Characters per chunk
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
 
 # === Other Configs ===
-TOP_K_RESULTS = int(os.getenv("TOP_K_RESULTS", "5"))
\ No newline at end of file
+TOP_K_RESULTS = int(os.getenv("TOP_K_RESULTS", "5"))
+
+# === Batch Question Answering (batch_qa.py) ===
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "8"))  # LLM calls in flight
+BATCH_EMBED_SIZE = int(os.getenv("BATCH_EMBED_SIZE", "256"))  # Questions embedded and searched together
+
+# === Context Assembly (between retrieval and the LLM) ===
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "6000"))  # 0 = no budget
+CONTEXT_MERGE_ADJACENT = os.getenv("CONTEXT_MERGE_ADJACENT", "true").lower() == "true"
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.85"))  # Above 1 disables deduplication
+
+# === Answer Cache ===
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+
+# === Tracing (latency spans of questions and ingestion runs) ===
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACE_JSONL_PATH = os.getenv("TRACE_JSONL_PATH", str(PROCESSED_DATA_PATH / "traces.jsonl"))  # Empty = no span log
+TRACE_PROMETHEUS_PATH = os.getenv("TRACE_PROMETHEUS_PATH", str(PROCESSED_DATA_PATH / "metrics.prom"))  # Empty = no metrics file
+TRACE_FLUSH_SECONDS = float(os.getenv("TRACE_FLUSH_SECONDS", "10"))
+
+# === HTTP Server ===
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+SERVER_MAX_CONCURRENCY = int(os.getenv("SERVER_MAX_CONCURRENCY", "32"))  # Questions answered at once
+SERVER_MAX_QUEUE = int(os.getenv("SERVER_MAX_QUEUE", "128"))  # Waiting questions before answering 503
+SERVER_REQUEST_TIMEOUT = float(os.getenv("SERVER_REQUEST_TIMEOUT", "60"))
@@ -0,0 +1,128 @@
+import asyncio
+from typing import List, Optional
+
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError, APITimeoutError
+
+from domain.interfaces.async_embedding_generator import AsyncEmbeddingGenerator
+from infrastructure.config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_MAX_CONCURRENCY,
+    EMBEDDING_MAX_INPUT_TOKENS,
+    EMBEDDING_MAX_REQUEST_INPUTS,
+    EMBEDDING_MAX_REQUEST_TOKENS,
+    EMBEDDING_MAX_RETRIES,
+    EMBEDDING_REQUESTS_PER_MINUTE,
+    EMBEDDING_TOKENS_PER_MINUTE,
+)
+from infrastructure.embedding.openai_embedder import pack_inputs, retry_delay, retryable_status
+from infrastructure.embedding.rate_limiter import RateLimiter
+from infrastructure.tokenizer import TokenCounter
+
+
+class AsyncOpenAIEmbeddingGenerator(AsyncEmbeddingGenerator):
+    """
+    Asynchronous counterpart of OpenAIEmbeddingGenerator.
+
+    Uses the same token-aware packing, RPM/TPM budgets and retry policy, but
+    waits on the event loop so one process can serve many questions at once.
+    """
+
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        client: Optional[AsyncOpenAI] = None,
+        max_request_tokens: int = EMBEDDING_MAX_REQUEST_TOKENS,
+        max_request_inputs: int = EMBEDDING_MAX_REQUEST_INPUTS,
+        max_input_tokens: int = EMBEDDING_MAX_INPUT_TOKENS,
+        max_concurrency: int = EMBEDDING_MAX_CONCURRENCY,
+        requests_per_minute: int = EMBEDDING_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = EMBEDDING_TOKENS_PER_MINUTE,
+        max_retries: int = EMBEDDING_MAX_RETRIES,
+        dimensions: int = EMBEDDING_DIMENSIONS
+    ):
+        """
+        Initialize the async OpenAI embedding client.
+
+        Args:
+            model: The OpenAI embedding model to use
+            client: Shared AsyncOpenAI client (a new one is created if omitted)
+            max_request_tokens: Maximum total tokens packed into one request
+            max_request_inputs: Maximum number of inputs packed into one request
+            max_input_tokens: Inputs longer than this are truncated
+            max_concurrency: Number of requests kept in flight at once by one embed() call
+            requests_per_minute: RPM budget (0 disables it)
+            tokens_per_minute: TPM budget (0 disables it)
+            max_retries: Attempts after the first one for retryable errors
+            dimensions: Request shortened embeddings of this size (0 keeps the model's default)
+        """
+        client = client or AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+        # Retries are handled here so they share the rate limiter; the connection pool is shared
+        self.client = client.with_options(max_retries=0)
+        self.model = model
+        self.max_request_tokens = max_request_tokens
+        self.max_request_inputs = max_request_inputs
+        self.max_input_tokens = max_input_tokens
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_retries = max_retries
+        self.dimensions = dimensions
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.token_counter = TokenCounter(model)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for texts, splitting them into as many requests as needed.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embeddings in the same order as the input texts
+        """
+        if not texts:
+            return []
+
+        batches = pack_inputs(
+            texts,
+            self.token_counter,
+            self.max_request_tokens,
+            self.max_request_inputs,
+            self.max_input_tokens
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(inputs: List[str], tokens: int) -> List[List[float]]:
+            async with semaphore:
+                return await self._embed_batch(inputs, tokens)
+
+        results = await asyncio.gather(*(run(inputs, tokens) for inputs, tokens in batches))
+        return [embedding for batch in results for embedding in batch]
+
+    async def _embed_batch(self, inputs: List[str], tokens: int) -> List[List[float]]:
+        """Send one embeddings request, retrying rate limits and server errors."""
+        attempt = 0
+        while True:
+            wait = self.rate_limiter.reserve(tokens)
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = self.rate_limiter.reserve(tokens)
+            try:
+                response = await self.client.embeddings.create(
+                    model=self.model,
+                    input=inputs,
+                    **({"dimensions": self.dimensions} if self.dimensions else {})
+                )
+                data = sorted(response.data, key=lambda r: r.index)
+                return [r.embedding for r in data]
+            except (APIStatusError, APIConnectionError, APITimeoutError) as e:
+                status = retryable_status(e)
+                if status is None or attempt >= self.max_retries:
+                    raise
+
+                delay = retry_delay(attempt, e)
+                if status == 429:
+                    self.rate_limiter.penalize(delay)
+                else:
+                    await asyncio.sleep(delay)
+                attempt += 1
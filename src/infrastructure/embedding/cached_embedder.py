@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from domain.interfaces.async_embedding_generator import AsyncEmbeddingGenerator
+from domain.interfaces.embedding_generator import EmbeddingGenerator
+from infrastructure.sqlite_utils import SQL_BATCH, lru_victims
+
+
+class EmbeddingCache:
+    """
+    On-disk SQLite cache of embeddings, shared by the sync and async cached generators.
+
+    Vectors are stored as float32 blobs keyed by the model name and a hash of
+    the text, so byte-identical texts (repeated questions, boilerplate chunks,
+    re-ingests after changing chunk settings) are only embedded once. The cache
+    is capped in size and evicts the least recently used entries.
+    """
+
+    def __init__(self, model: str, db_path: Path, max_bytes: int):
+        """
+        Open (or create) the cache.
+
+        Args:
+            model: Model identifier stored in the cache key (include anything that changes vectors)
+            db_path: Location of the SQLite cache file
+            max_bytes: Maximum total size of cached vectors before LRU eviction
+        """
+        self.model = model
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access);
+        """)
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+    def partition(self, texts: List[str]) -> Tuple[List[str], Dict[str, List[float]], Dict[str, str]]:
+        """
+        Look texts up in the cache.
+
+        Returns:
+            Tuple of the key of each text, the cached embeddings by key and the
+            distinct missing texts by key (a text repeated in the call is embedded once)
+        """
+        keys = [self._key(text) for text in texts]
+        cached = self._lookup(set(keys))
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        miss_count = sum(1 for key in keys if key not in cached)
+        with self._lock:
+            self.hits += len(keys) - miss_count
+            self.misses += miss_count
+        return keys, cached, missing
+
+    def store(self, embeddings: Dict[str, List[float]]) -> None:
+        """Insert new vectors and evict old ones if the cache grew past its cap."""
+        now = time.time()
+        rows = []
+        for key, embedding in embeddings.items():
+            blob = array("f", embedding).tobytes()
+            rows.append((key, self.model, blob, len(blob), now))
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, vector, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._total_bytes += sum(row[3] for row in rows)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current cache size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size_bytes": self._total_bytes
+            }
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: set) -> Dict[str, List[float]]:
+        """Fetch cached vectors for the given keys and refresh their access time."""
+        found: Dict[str, List[float]] = {}
+        key_list = list(keys)
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(key_list), SQL_BATCH):
+                batch = key_list[i:i + SQL_BATCH]
+                placeholders = ", ".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_access = ? WHERE key IN ({', '.join('?' for _ in rows)})",
+                        [now] + [key for key, _ in rows]
+                    )
+        return found
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache is back under 90% of its cap."""
+        self._conn.execute("BEGIN")
+        try:
+            # Concurrent misses on the same text replace rows, so resync the running total first
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+            doomed, freed = lru_victims(self._conn, "embeddings", self._total_bytes, self.max_bytes)
+            self._conn.executemany("DELETE FROM embeddings WHERE key = ?", [(key,) for key in doomed])
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._total_bytes -= freed
+        self.evictions += len(doomed)
+
+
+class CachedEmbeddingGenerator(EmbeddingGenerator):
+    """EmbeddingGenerator wrapper that embeds only the texts missing from an EmbeddingCache."""
+
+    def __init__(self, embedder: EmbeddingGenerator, model: str, db_path: Path, max_bytes: int):
+        """
+        Initialize the cache around another embedding generator.
+
+        Args:
+            embedder: The generator used on cache misses
+            model: Model identifier stored in the cache key (include anything that changes vectors)
+            db_path: Location of the SQLite cache file
+            max_bytes: Maximum total size of cached vectors before LRU eviction
+        """
+        self.embedder = embedder
+        self.cache = EmbeddingCache(model, db_path, max_bytes)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Return cached embeddings where available and embed only the missing texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embeddings in the same order as the input texts
+        """
+        if not texts:
+            return []
+        keys, cached, missing = self.cache.partition(texts)
+        if missing:
+            fresh = dict(zip(missing.keys(), self.embedder.embed(list(missing.values()))))
+            self.cache.store(fresh)
+            cached.update(fresh)
+        return [cached[key] for key in keys]
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current cache size."""
+        return self.cache.stats()
+
+
+class AsyncCachedEmbeddingGenerator(AsyncEmbeddingGenerator):
+    """
+    AsyncEmbeddingGenerator wrapper around an EmbeddingCache.
+
+    The SQLite lookups and writes run in a worker thread so they never block
+    the event loop.
+    """
+
+    def __init__(self, embedder: AsyncEmbeddingGenerator, model: str, db_path: Path, max_bytes: int):
+        """
+        Initialize the cache around another async embedding generator.
+
+        Args:
+            embedder: The generator awaited on cache misses
+            model: Model identifier stored in the cache key (include anything that changes vectors)
+            db_path: Location of the SQLite cache file
+            max_bytes: Maximum total size of cached vectors before LRU eviction
+        """
+        self.embedder = embedder
+        self.cache = EmbeddingCache(model, db_path, max_bytes)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Return cached embeddings where available and await the embedder for the missing texts."""
+        if not texts:
+            return []
+        keys, cached, missing = await asyncio.to_thread(self.cache.partition, texts)
+        if missing:
+            fresh = dict(zip(missing.keys(), await self.embedder.embed(list(missing.values()))))
+            await asyncio.to_thread(self.cache.store, fresh)
+            cached.update(fresh)
+        return [cached[key] for key in keys]
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current cache size."""
+        return self.cache.stats()
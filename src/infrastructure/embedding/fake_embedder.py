@@ -0,0 +1,50 @@
+import re
+import time
+import zlib
+from typing import List
+
+import numpy as np
+
+from domain.interfaces.embedding_generator import EmbeddingGenerator
+
+_WORD = re.compile(r"\w+")
+
+
+class FakeEmbeddingGenerator(EmbeddingGenerator):
+    """
+    Deterministic, offline stand-in for OpenAIEmbeddingGenerator, for benchmarks.
+
+    Texts are embedded by feature hashing: every word adds +1 or -1 to one of
+    `dimensions` buckets picked by its CRC-32, and the vector is normalized.
+    Texts that share words get similar vectors, so retrieval over a synthetic
+    corpus behaves roughly as it would with a real model, and a text always
+    gets the same vector, in any process. API latency can be simulated.
+    """
+
+    def __init__(self, dimensions: int = 384, latency_ms: float = 0.0, per_text_ms: float = 0.0):
+        """
+        Initialize the generator.
+
+        Args:
+            dimensions: Size of the vectors
+            latency_ms: Simulated round trip of each embed() call
+            per_text_ms: Simulated extra time per text in a call
+        """
+        self.dimensions = dimensions
+        self.latency_ms = latency_ms
+        self.per_text_ms = per_text_ms
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        delay = (self.latency_ms + self.per_text_ms * len(texts)) / 1000.0
+        if delay > 0:
+            time.sleep(delay)
+
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in _WORD.findall(text.lower()):
+                code = zlib.crc32(word.encode("utf-8"))
+                # The low bits pick the bucket, a higher one the sign, so collisions tend to cancel out
+                vectors[row, code % self.dimensions] += 1.0 if code & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).tolist()
@@ -1,16 +1,194 @@
-from openai import OpenAI
-from typing import List
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from openai import OpenAI, APIConnectionError, APIStatusError, APITimeoutError
+
 from domain.interfaces.embedding_generator import EmbeddingGenerator
-import os
+from infrastructure.config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_MAX_CONCURRENCY,
+    EMBEDDING_MAX_INPUT_TOKENS,
+    EMBEDDING_MAX_REQUEST_INPUTS,
+    EMBEDDING_MAX_REQUEST_TOKENS,
+    EMBEDDING_MAX_RETRIES,
+    EMBEDDING_REQUESTS_PER_MINUTE,
+    EMBEDDING_TOKENS_PER_MINUTE,
+)
+from infrastructure.embedding.rate_limiter import RateLimiter
+from infrastructure.tokenizer import TokenCounter
+
+
+def pack_inputs(
+    texts: List[str],
+    token_counter: TokenCounter,
+    max_request_tokens: int,
+    max_request_inputs: int,
+    max_input_tokens: int
+) -> List[Tuple[List[str], int]]:
+    """Group texts into (inputs, token_count) batches that respect the request limits."""
+    batches = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for text, tokens in zip(texts, token_counter.count_many(texts)):
+        if tokens > max_input_tokens:
+            text = token_counter.truncate(text, max_input_tokens)
+            tokens = max_input_tokens
+
+        if current and (
+            current_tokens + tokens > max_request_tokens
+            or len(current) >= max_request_inputs
+        ):
+            batches.append((current, current_tokens))
+            current, current_tokens = [], 0
+
+        current.append(text)
+        current_tokens += tokens
+
+    if current:
+        batches.append((current, current_tokens))
+    return batches
+
+
+def retryable_status(error: Exception) -> Optional[int]:
+    """
+    Classify an OpenAI error for retrying.
+
+    Returns:
+        The HTTP status (or 0 for connection errors and timeouts) if the error is
+        worth retrying, None otherwise
+    """
+    if not isinstance(error, (APIStatusError, APIConnectionError, APITimeoutError)):
+        return None
+    status = getattr(error, "status_code", None)
+    if status is None:
+        return 0
+    return status if status == 429 or status >= 500 else None
+
+
+def retry_delay(attempt: int, error: Exception) -> float:
+    """Full-jitter exponential backoff, honoring Retry-After when the server sends it."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return float(retry_after) + random.uniform(0, 0.5)
+        except ValueError:
+            pass
+    return random.uniform(0, min(60.0, 0.5 * (2 ** attempt)))
+
 
 class OpenAIEmbeddingGenerator(EmbeddingGenerator):
-    def __init__(self, model: str = "text-embedding-3-small"):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    """
+    OpenAI embeddings implementation of the EmbeddingGenerator interface.
+
+    Inputs are packed into requests sized by token count, several requests
+    are kept in flight at once, RPM/TPM budgets are enforced with a token
+    bucket and 429/5xx responses are retried with jittered backoff.
+    """
+
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        max_request_tokens: int = EMBEDDING_MAX_REQUEST_TOKENS,
+        max_request_inputs: int = EMBEDDING_MAX_REQUEST_INPUTS,
+        max_input_tokens: int = EMBEDDING_MAX_INPUT_TOKENS,
+        max_concurrency: int = EMBEDDING_MAX_CONCURRENCY,
+        requests_per_minute: int = EMBEDDING_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = EMBEDDING_TOKENS_PER_MINUTE,
+        max_retries: int = EMBEDDING_MAX_RETRIES,
+        base_url: Optional[str] = OPENAI_BASE_URL,
+        dimensions: int = EMBEDDING_DIMENSIONS
+    ):
+        """
+        Initialize the OpenAI embedding client.
+
+        Args:
+            model: The OpenAI embedding model to use
+            max_request_tokens: Maximum total tokens packed into one request
+            max_request_inputs: Maximum number of inputs packed into one request
+            max_input_tokens: Inputs longer than this are truncated
+            max_concurrency: Number of requests kept in flight at once
+            requests_per_minute: RPM budget (0 disables it)
+            tokens_per_minute: TPM budget (0 disables it)
+            max_retries: Attempts after the first one for retryable errors
+            base_url: Alternative API endpoint, e.g. a local fake embedding server
+            dimensions: Request shortened embeddings of this size (0 keeps the model's default)
+        """
+        # Retries are handled here so they share the rate limiter
+        self.client = OpenAI(api_key=OPENAI_API_KEY, base_url=base_url, max_retries=0)
         self.model = model
+        self.max_request_tokens = max_request_tokens
+        self.max_request_inputs = max_request_inputs
+        self.max_input_tokens = max_input_tokens
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_retries = max_retries
+        self.dimensions = dimensions
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.token_counter = TokenCounter(model)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="embedding-request"
+        )
 
     def embed(self, texts: List[str]) -> List[List[float]]:
-        response = self.client.embeddings.create(
-            model=self.model,
-            input=texts
+        """
+        Generate embeddings for texts, splitting them into as many requests as needed.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embeddings in the same order as the input texts
+        """
+        if not texts:
+            return []
+
+        batches = self._pack(texts)
+        if len(batches) == 1:
+            return self._embed_batch(*batches[0])
+
+        embeddings: List[List[float]] = []
+        for batch_embeddings in self._executor.map(lambda batch: self._embed_batch(*batch), batches):
+            embeddings.extend(batch_embeddings)
+        return embeddings
+
+    def _pack(self, texts: List[str]) -> List[Tuple[List[str], int]]:
+        return pack_inputs(
+            texts,
+            self.token_counter,
+            self.max_request_tokens,
+            self.max_request_inputs,
+            self.max_input_tokens
         )
-        return [r.embedding for r in response.data]
\ No newline at end of file
+
+    def _embed_batch(self, inputs: List[str], tokens: int) -> List[List[float]]:
+        """Send one embeddings request, retrying rate limits and server errors."""
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(tokens)
+            try:
+                response = self.client.embeddings.create(
+                    model=self.model,
+                    input=inputs,
+                    **({"dimensions": self.dimensions} if self.dimensions else {})
+                )
+                data = sorted(response.data, key=lambda r: r.index)
+                return [r.embedding for r in data]
+            except (APIStatusError, APIConnectionError, APITimeoutError) as e:
+                status = retryable_status(e)
+                if status is None or attempt >= self.max_retries:
+                    raise
+
+                delay = retry_delay(attempt, e)
+                if status == 429:
+                    # Everyone sharing this client should slow down, not just this request;
+                    # acquire() sleeps until the pause is over
+                    self.rate_limiter.penalize(delay)
+                else:
+                    time.sleep(delay)
+                attempt += 1
@@ -0,0 +1,87 @@
+import threading
+import time
+
+
+class _TokenBucket:
+    """A bucket refilled continuously up to a per-minute capacity."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until the bucket holds the requested amount."""
+        deficit = amount - self.available
+        return deficit / self.rate if deficit > 0 else 0.0
+
+
+class RateLimiter:
+    """
+    Token-bucket scheduler enforcing requests-per-minute and tokens-per-minute budgets.
+
+    A limit of 0 disables that budget. Synchronous callers block in acquire()
+    until both budgets can cover the request; asynchronous callers poll
+    reserve() and sleep on the event loop instead.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self._requests = _TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = _TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Block until one request of the given token count fits the budgets.
+
+        Args:
+            tokens: Number of tokens the request will consume
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self.reserve(tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def reserve(self, tokens: int) -> float:
+        """
+        Take budget for one request if it is available right now.
+
+        Returns:
+            float: 0 if the request may proceed, otherwise the seconds to wait before trying again
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            token_cost = float(tokens)
+            if self._requests:
+                self._requests.refill(now)
+                wait = max(wait, self._requests.wait_time(1))
+            if self._tokens:
+                self._tokens.refill(now)
+                # A single oversized request can never exceed a full bucket
+                token_cost = min(token_cost, self._tokens.capacity)
+                wait = max(wait, self._tokens.wait_time(token_cost))
+            if wait > 0:
+                return wait
+            if self._requests:
+                self._requests.available -= 1
+            if self._tokens:
+                self._tokens.available -= token_cost
+            return 0.0
+
+    def penalize(self, seconds: float) -> None:
+        """Pause every caller for the given time after the server reported a rate limit."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
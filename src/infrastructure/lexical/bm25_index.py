@@ -0,0 +1,280 @@
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from domain.interfaces.lexical_index import LexicalIndex
+from domain.models.document import Chunk, merged_metadata, tags_of
+from infrastructure.sqlite_utils import SQL_BATCH
+
+# Maximum number of distinct query terms searched; longer questions keep the first ones
+_MAX_QUERY_TERMS = 32
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Words that match nearly every chunk; dropping them keeps OR queries selective
+_STOPWORDS = frozenset("""
+    a an and are as at be but by can do does for from has have how i if in into is it its
+    me my no not of on or our so than that the their them then there these they this to
+    was we were what when where which who why will with you your
+""".split())
+
+
+class SQLiteBM25Index(LexicalIndex):
+    """
+    BM25 keyword index on SQLite FTS5.
+
+    Chunk text is tokenized into an FTS5 table (case- and diacritic-insensitive)
+    and ranked with its built-in bm25() function; metadata and tags live in
+    side tables so searches are filtered the same way as in the vector stores.
+    Queries match any of their terms, so a chunk only needs to share one rare
+    word (an error code, a product name) with the question to be found.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS chunks (
+            row INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
+            document_id TEXT NOT NULL,
+            chunk_id TEXT NOT NULL,
+            metadata TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS chunks_document_id ON chunks (document_id);
+        CREATE TABLE IF NOT EXISTS chunk_tags (
+            row INTEGER NOT NULL,
+            tag TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS chunk_tags_row ON chunk_tags (row);
+        CREATE INDEX IF NOT EXISTS chunk_tags_tag ON chunk_tags (tag, row);
+        CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+            content,
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Open (or create) a BM25 index.
+
+        Args:
+            db_path: SQLite database file holding the index
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+
+    def add_chunks(self, chunks: List[Chunk]) -> None:
+        """
+        Index chunks, replacing any already stored under the same document and chunk ID.
+
+        Args:
+            chunks: Chunks with their text and metadata
+        """
+        if not chunks:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for chunk in chunks:
+                    metadata = {key: value for key, value in chunk.metadata.items() if key != "content"}
+                    chunk_key = self._chunk_key(chunk.document_id, chunk.chunk_id)
+                    self._delete_rows(self._conn.execute("SELECT row FROM chunks WHERE id = ?", (chunk_key,)).fetchall())
+                    row = self._conn.execute(
+                        "INSERT INTO chunks (id, document_id, chunk_id, metadata) VALUES (?, ?, ?, ?)",
+                        (chunk_key, chunk.document_id, chunk.chunk_id, json.dumps(metadata))
+                    ).lastrowid
+                    self._conn.execute("INSERT INTO chunks_fts (rowid, content) VALUES (?, ?)", (row, chunk.content))
+                    self._conn.executemany(
+                        "INSERT INTO chunk_tags (row, tag) VALUES (?, ?)",
+                        [(row, tag) for tag in tags_of(metadata)]
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def search(self, query_text: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """
+        Rank chunks containing any of the query terms with BM25.
+
+        Args:
+            query_text: Question or keywords to look up
+            top_k: Number of results to return
+            filters: Metadata filter (see VectorStore.search)
+
+        Returns:
+            List of dictionaries containing chunk metadata, content and BM25 scores (higher is better)
+        """
+        match = self._match_expression(query_text)
+        if match is None or top_k <= 0:
+            return []
+
+        clauses, params = ["chunks_fts MATCH ?"], [match]
+        for key, value in (filters or {}).items():
+            if value is None:
+                continue
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            if key == "tags":
+                if not values:
+                    continue
+                clauses.append(
+                    f"EXISTS (SELECT 1 FROM chunk_tags t WHERE t.row = chunks_fts.rowid AND t.tag IN ({', '.join('?' for _ in values)}))"
+                )
+                params.extend(values)
+            else:
+                clauses.append(
+                    f"EXISTS (SELECT 1 FROM chunks c WHERE c.row = chunks_fts.rowid "
+                    f"AND json_extract(c.metadata, ?) IN ({', '.join('?' for _ in values)}))"
+                )
+                params.append(f'$."{key}"')
+                params.extend(values)
+
+        with self._lock:
+            # Rank first and fetch text only for the winners
+            ranked = self._conn.execute(
+                f"SELECT rowid, bm25(chunks_fts) AS rank FROM chunks_fts WHERE {' AND '.join(clauses)} ORDER BY rank LIMIT ?",
+                params + [top_k]
+            ).fetchall()
+            if not ranked:
+                return []
+            rows = [row for row, _ in ranked]
+            placeholders = ", ".join("?" for _ in rows)
+            stored = {
+                row: (chunk_key, metadata, content)
+                for row, chunk_key, metadata, content in self._conn.execute(
+                    f"SELECT c.row, c.id, c.metadata, f.content FROM chunks c JOIN chunks_fts f ON f.rowid = c.row "
+                    f"WHERE c.row IN ({placeholders})",
+                    rows
+                )
+            }
+
+        results = []
+        for row, rank in ranked:
+            chunk_key, metadata, content = stored[row]
+            results.append({
+                "id": chunk_key,
+                "metadata": json.loads(metadata),
+                "content": content,
+                # FTS5 reports BM25 negated so that ascending order is best first
+                "score": -rank
+            })
+        return results
+
+    def existing_chunk_ids(self, document_id: str, chunk_ids: List[str]) -> Set[str]:
+        """
+        Find which chunks of a document are already indexed.
+
+        Args:
+            document_id: ID of the document the chunks belong to
+            chunk_ids: Candidate chunk IDs
+
+        Returns:
+            Set of the chunk IDs present in the index
+        """
+        found = set()
+        with self._lock:
+            for i in range(0, len(chunk_ids), SQL_BATCH):
+                batch = chunk_ids[i:i + SQL_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT chunk_id FROM chunks WHERE document_id = ? AND chunk_id IN ({', '.join('?' for _ in batch)})",
+                    [document_id] + batch
+                ).fetchall()
+                found.update(chunk_id for chunk_id, in rows)
+        return found
+
+    def delete_document(self, document_id: str, keep_chunk_ids: Optional[Iterable[str]] = None) -> None:
+        """
+        Delete the chunks belonging to a document.
+
+        Args:
+            document_id: ID of the document whose chunks should be removed
+            keep_chunk_ids: Chunk IDs to leave in place
+        """
+        keep = set(keep_chunk_ids or [])
+        with self._lock:
+            stored = self._conn.execute(
+                "SELECT row, chunk_id FROM chunks WHERE document_id = ?",
+                (document_id,)
+            ).fetchall()
+            stale = [(row,) for row, chunk_id in stored if chunk_id not in keep]
+            if not stale:
+                return
+            self._conn.execute("BEGIN")
+            try:
+                self._delete_rows(stale)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def update_document_metadata(self, document_id: str, updates: Dict) -> None:
+        """
+        Merge metadata updates into all chunks of a document.
+
+        Args:
+            document_id: ID of the document whose chunks should be updated
+            updates: Metadata keys and values to set on every chunk; a None value removes the key
+        """
+        with self._lock:
+            stored = self._conn.execute(
+                "SELECT row, metadata FROM chunks WHERE document_id = ?",
+                (document_id,)
+            ).fetchall()
+            if not stored:
+                return
+            self._conn.execute("BEGIN")
+            try:
+                for row, metadata_json in stored:
+                    metadata = merged_metadata(json.loads(metadata_json), updates)
+                    self._conn.execute("UPDATE chunks SET metadata = ? WHERE row = ?", (json.dumps(metadata), row))
+                    self._conn.execute("DELETE FROM chunk_tags WHERE row = ?", (row,))
+                    self._conn.executemany(
+                        "INSERT INTO chunk_tags (row, tag) VALUES (?, ?)",
+                        [(row, tag) for tag in tags_of(metadata)]
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def count(self) -> int:
+        """Number of indexed chunks."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _delete_rows(self, rows: List[tuple]) -> None:
+        """Remove rows from all tables; must run inside a transaction."""
+        if not rows:
+            return
+        self._conn.executemany("DELETE FROM chunks_fts WHERE rowid = ?", rows)
+        self._conn.executemany("DELETE FROM chunk_tags WHERE row = ?", rows)
+        self._conn.executemany("DELETE FROM chunks WHERE row = ?", rows)
+
+    @staticmethod
+    def _match_expression(query_text: str) -> Optional[str]:
+        """FTS5 query matching any distinct, non-trivial term of the text, or None if there is none."""
+        terms: List[str] = []
+        for token in _TOKEN.findall(query_text.lower()):
+            if token in _STOPWORDS or token in terms:
+                continue
+            terms.append(token)
+            if len(terms) >= _MAX_QUERY_TERMS:
+                break
+        if not terms:
+            return None
+        # Quoted terms are matched literally, so words like AND, NEAR or column names cannot change the query
+        return " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+    @staticmethod
+    def _chunk_key(document_id: str, chunk_id: str) -> str:
+        return f"{document_id}_{chunk_id}"
@@ -0,0 +1,79 @@
+from typing import AsyncIterator, List, Optional
+
+from openai import AsyncOpenAI
+
+from domain.interfaces.async_llm_client import AsyncLLMClient
+from infrastructure.config import LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS, OPENAI_API_KEY, OPENAI_BASE_URL
+from infrastructure.llm.openai_chat import build_chat_messages
+
+
+class AsyncOpenAIChat(AsyncLLMClient):
+    """
+    Asynchronous OpenAI chat model implementation of the AsyncLLMClient interface.
+    Uses the same prompt as OpenAIChat.
+    """
+    
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        model: str = None,
+        temperature: float = None,
+        max_tokens: int = None
+    ):
+        """
+        Initialize the async OpenAI chat client.
+        
+        Args:
+            client: Shared AsyncOpenAI client (a new one is created if omitted)
+            model: The OpenAI model to use (default: from config.LLM_MODEL)
+            temperature: Controls randomness in the response (default: from config.LLM_TEMPERATURE)
+            max_tokens: Maximum number of tokens in the response (default: from config.LLM_MAX_TOKENS)
+        """
+        self.client = client or AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+        self.model = model or LLM_MODEL
+        self.temperature = temperature if temperature is not None else LLM_TEMPERATURE
+        self.max_tokens = max_tokens or LLM_MAX_TOKENS
+    
+    async def answer(self, question: str, context_chunks: List[str]) -> str:
+        """
+        Generate an answer to a question based on provided context chunks.
+        
+        Args:
+            question: The user's question to answer
+            context_chunks: List of text chunks containing context for answering
+            
+        Returns:
+            str: The answer generated by the OpenAI model
+        """
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=build_chat_messages(question, context_chunks),
+            temperature=self.temperature,
+            max_tokens=self.max_tokens
+        )
+        return response.choices[0].message.content.strip()
+    
+    async def stream_answer(self, question: str, context_chunks: List[str]) -> AsyncIterator[str]:
+        """
+        Stream an answer from the OpenAI model as it is generated.
+        
+        Args:
+            question: The user's question to answer
+            context_chunks: List of text chunks containing context for answering
+            
+        Yields:
+            str: Consecutive fragments of the answer
+        """
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=build_chat_messages(question, context_chunks),
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        async for event in stream:
+            if not event.choices:
+                continue
+            delta = event.choices[0].delta.content
+            if delta:
+                yield delta
@@ -0,0 +1,46 @@
+import time
+from typing import Iterator, List
+
+from domain.interfaces.llm_client import LLMClient
+
+
+class FakeChat(LLMClient):
+    """
+    Deterministic, offline stand-in for OpenAIChat, for benchmarks.
+
+    The "answer" repeats the start of the first context chunk, so it depends
+    only on what was retrieved. Time to the first token and time per token
+    can be simulated; words count as tokens.
+    """
+
+    def __init__(self, first_token_ms: float = 0.0, per_token_ms: float = 0.0, answer_words: int = 50):
+        """
+        Initialize the client.
+
+        Args:
+            first_token_ms: Simulated delay before the first token
+            per_token_ms: Simulated delay of each further token
+            answer_words: Length of the answers
+        """
+        self.first_token_ms = first_token_ms
+        self.per_token_ms = per_token_ms
+        self.answer_words = answer_words
+
+    def answer(self, question: str, context_chunks: List[str]) -> str:
+        words = self._words(context_chunks)
+        delay = (self.first_token_ms + self.per_token_ms * max(len(words) - 1, 0)) / 1000.0
+        if delay > 0:
+            time.sleep(delay)
+        return " ".join(words)
+
+    def stream_answer(self, question: str, context_chunks: List[str]) -> Iterator[str]:
+        for i, word in enumerate(self._words(context_chunks)):
+            delay = (self.first_token_ms if i == 0 else self.per_token_ms) / 1000.0
+            if delay > 0:
+                time.sleep(delay)
+            yield word if i == 0 else " " + word
+
+    def _words(self, context_chunks: List[str]) -> List[str]:
+        intro = ["Based", "on", str(len(context_chunks)), "passage(s):"]
+        source = context_chunks[0].split() if context_chunks else []
+        return (intro + source)[:max(self.answer_words, len(intro))]
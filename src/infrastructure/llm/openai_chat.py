@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, Iterator, List
 import os
 
 from openai import OpenAI
@@ -7,6 +7,33 @@ from domain.interfaces.llm_client import LLMClient
 from infrastructure.config import LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS, OPENAI_API_KEY
 
 
+def build_chat_messages(question: str, context_chunks: List[str]) -> List[Dict[str, str]]:
+    """Build the system and user messages for a question and its context."""
+    # Format the context chunks into a single string
+    formatted_context = "\n\n".join(
+        [f"Context chunk {i+1}:\n{chunk}" for i, chunk in enumerate(context_chunks)]
+    )
+    
+    # Create system and user messages
+    system_message = {
+        "role": "system",
+        "content": (
+            "You are an intelligent assistant tasked with answering questions "
+            "based only on the provided context. "
+            "If the answer cannot be found in the context, say 'I don't have enough "
+            "information to answer this question.' "
+            "Don't use prior knowledge. Be concise and precise."
+        )
+    }
+    
+    user_message = {
+        "role": "user",
+        "content": f"Context information is below:\n\n{formatted_context}\n\nQuestion: {question}"
+    }
+    
+    return [system_message, user_message]
+
+
 class OpenAIChat(LLMClient):
     """
     OpenAI chat model implementation of the LLMClient interface.
@@ -38,35 +65,39 @@ class OpenAIChat(LLMClient):
         Returns:
             str: The answer generated by the OpenAI model
         """
-        # Format the context chunks into a single string
-        formatted_context = "\n\n".join(
-            [f"Context chunk {i+1}:\n{chunk}" for i, chunk in enumerate(context_chunks)]
-        )
-        
-        # Create system and user messages
-        system_message = {
-            "role": "system",
-            "content": (
-                "You are an intelligent assistant tasked with answering questions "
-                "based only on the provided context. "
-                "If the answer cannot be found in the context, say 'I don't have enough "
-                "information to answer this question.' "
-                "Don't use prior knowledge. Be concise and precise."
-            )
-        }
-        
-        user_message = {
-            "role": "user",
-            "content": f"Context information is below:\n\n{formatted_context}\n\nQuestion: {question}"
-        }
-        
         # Make the API call
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[system_message, user_message],
+            messages=build_chat_messages(question, context_chunks),
             temperature=self.temperature,
             max_tokens=self.max_tokens
         )
         
         # Extract and return the answer
-        return response.choices[0].message.content.strip() 
\ No newline at end of file
+        return response.choices[0].message.content.strip()
+    
+    def stream_answer(self, question: str, context_chunks: List[str]) -> Iterator[str]:
+        """
+        Stream an answer from the OpenAI model as it is generated.
+        
+        Args:
+            question: The user's question to answer
+            context_chunks: List of text chunks containing context for answering
+            
+        Yields:
+            str: Consecutive fragments of the answer
+        """
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=build_chat_messages(question, context_chunks),
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        
+        for event in stream:
+            if not event.choices:
+                continue
+            delta = event.choices[0].delta.content
+            if delta:
+                yield delta
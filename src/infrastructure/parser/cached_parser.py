@@ -0,0 +1,313 @@
+import hashlib
+import importlib.util
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from domain.interfaces.document_parser import DocumentParser
+from domain.models.document import Document, hash_file
+from infrastructure.sqlite_utils import SQL_BATCH, lru_victims
+
+# Compression levels: parsed text is written once per file and read on every re-chunk
+_ZSTD_LEVEL = 3
+_ZLIB_LEVEL = 6
+
+# Each page in a blob file is its compressed length followed by the compressed bytes
+_PAGE_HEADER = struct.Struct("<I")
+
+
+def _compressor() -> Tuple[str, Callable[[bytes], bytes]]:
+    """Codec name and compress function: zstd when zstandard is installed, zlib otherwise."""
+    if importlib.util.find_spec("zstandard") is not None:
+        import zstandard
+        return "zstd", zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress
+    return "zlib", lambda data: zlib.compress(data, _ZLIB_LEVEL)
+
+
+def _decompressor(codec: str) -> Optional[Callable[[bytes], bytes]]:
+    """Decompress function for a codec, or None if it is not available here."""
+    if codec == "zlib":
+        return zlib.decompress
+    if codec == "zstd" and importlib.util.find_spec("zstandard") is not None:
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress
+    return None
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed document text.
+
+    Entries are keyed by the SHA-256 of the file's content plus the parser's
+    cache key (parser version, strategy, library versions), so they survive
+    moves and renames but are never reused once any of those change. Each
+    page is compressed separately with zstd (zlib when zstandard is not
+    installed) and appended to a blob file as it is parsed, so a large
+    document is never held in memory; a SQLite table indexes the blobs. The
+    cache is capped in size and evicts the least recently used entries.
+
+    The database is opened lazily and the connection is left out when the
+    cache is pickled, so it can travel to parse worker processes; each
+    process opens its own connection and SQLite serializes their writes.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            file TEXT NOT NULL,
+            codec TEXT NOT NULL,
+            pages INTEGER NOT NULL,
+            text_bytes INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+    """
+
+    def __init__(self, db_path: Path, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: Location of the SQLite index; blobs go in a directory next to it
+            max_bytes: Maximum total size of compressed text before LRU eviction
+        """
+        self.db_path = Path(db_path)
+        self.blob_dir = self.db_path.with_name(f"{self.db_path.stem}_blobs")
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def key_for(self, file_path: str, parser_key: str, content_hash: Optional[str] = None) -> str:
+        """
+        Cache key of a file as read by a parser with the given cache key.
+
+        Args:
+            file_path: Path to the file
+            parser_key: The parser's cache_key for the file
+            content_hash: SHA-256 of the file's content, if the caller already computed it
+        """
+        return f"{content_hash or hash_file(Path(file_path))}/{parser_key}"
+
+    def get(self, key: str) -> Optional[Iterator[str]]:
+        """
+        Look up the pages stored under a key.
+
+        Returns:
+            An iterator over the page texts, or None on a miss
+        """
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT file, codec FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            decompress = _decompressor(row[1])
+            if decompress is None:
+                return None
+            try:
+                # Opened before returning, so an eviction by another process cannot pull the file away
+                blob = open(self.blob_dir / row[0], "rb")
+            except FileNotFoundError:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return self._read_pages(blob, decompress)
+
+    def record(self, key: str, pages: Iterable[str]) -> Iterator[str]:
+        """
+        Pass pages through while compressing them to a blob file, and store it once all were read.
+
+        Pages are written to a temporary file as they arrive, which is renamed
+        into place at the end. Nothing is stored if the pages raise or are not
+        consumed to the end, so a failed parse is never cached.
+
+        Yields:
+            The pages, unchanged
+        """
+        codec, compress = _compressor()
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.bin"
+        handle, temporary = tempfile.mkstemp(dir=self.blob_dir, suffix=".tmp")
+        stored = False
+        try:
+            count = text_bytes = size = 0
+            with os.fdopen(handle, "wb") as f:
+                for page in pages:
+                    data = page.encode("utf-8")
+                    blob = compress(data)
+                    f.write(_PAGE_HEADER.pack(len(blob)))
+                    f.write(blob)
+                    count += 1
+                    text_bytes += len(data)
+                    size += _PAGE_HEADER.size + len(blob)
+                    yield page
+            stored = self._store(key, name, temporary, codec, count, text_bytes, size)
+        finally:
+            if not stored and os.path.exists(temporary):
+                os.remove(temporary)
+
+    def purge(self, older_than: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Delete cached entries and reclaim their disk space.
+
+        Args:
+            older_than: Only delete entries not used for this many seconds (None deletes everything)
+
+        Returns:
+            Number of entries and compressed bytes removed
+        """
+        cutoff = time.time() - older_than if older_than is not None else None
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                doomed = conn.execute(
+                    "SELECT key, size FROM entries WHERE ? IS NULL OR last_access < ?",
+                    (cutoff, cutoff)
+                ).fetchall()
+                files = self._delete(conn, [key for key, _ in doomed])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("VACUUM")
+        self._remove_files(files)
+        return len(doomed), sum(size for _, size in doomed)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of entries and their total compressed and original size."""
+        with self._lock:
+            entries, size, text_bytes = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(text_bytes), 0) FROM entries"
+            ).fetchone()
+        return {"entries": entries, "size_bytes": size, "text_bytes": text_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use in this process; must hold the lock."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Parse workers in other processes write to the same file, so wait for their locks
+            conn = sqlite3.connect(str(self.db_path), timeout=60, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _store(self, key: str, name: str, temporary: str, codec: str, pages: int, text_bytes: int, size: int) -> bool:
+        """Move a finished blob into place, index it and evict old entries if the cache grew past its cap."""
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Identical files parsed by two workers end up as one entry, under the same file name
+                os.replace(temporary, self.blob_dir / name)
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.execute(
+                    "INSERT INTO entries (key, file, codec, pages, text_bytes, size, last_access) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, name, codec, pages, text_bytes, size, time.time())
+                )
+                # Other processes add entries too, so the total is always read from the table
+                total = conn.execute("SELECT SUM(size) FROM entries").fetchone()[0]
+                doomed = lru_victims(conn, "entries", total, self.max_bytes)[0] if total > self.max_bytes else []
+                files = self._delete(conn, doomed)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self._remove_files(files)
+        return True
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, keys: List[str]) -> List[str]:
+        """Delete entries and return the blob files to remove once the deletion is committed."""
+        files = []
+        for i in range(0, len(keys), SQL_BATCH):
+            batch = keys[i:i + SQL_BATCH]
+            placeholders = ", ".join("?" for _ in batch)
+            files.extend(file for file, in conn.execute(f"SELECT file FROM entries WHERE key IN ({placeholders})", batch))
+            conn.execute(f"DELETE FROM entries WHERE key IN ({placeholders})", batch)
+        return files
+
+    def _remove_files(self, files: List[str]) -> None:
+        for file in files:
+            try:
+                os.remove(self.blob_dir / file)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _read_pages(blob: BinaryIO, decompress: Callable[[bytes], bytes]) -> Iterator[str]:
+        """Expand the pages of a blob file one at a time as they are consumed."""
+        with blob:
+            while True:
+                header = blob.read(_PAGE_HEADER.size)
+                if not header:
+                    return
+                (length,) = _PAGE_HEADER.unpack(header)
+                yield decompress(blob.read(length)).decode("utf-8")
+
+
+class CachedDocumentParser(DocumentParser):
+    """
+    DocumentParser wrapper that keeps the text of parsed files in a ParseCache.
+
+    A file whose content was already parsed with the same parser settings is
+    read back from the cache instead of being parsed again, so re-chunking
+    and re-embedding with different settings skip the parse entirely.
+    """
+
+    def __init__(self, parser: DocumentParser, cache: ParseCache):
+        """
+        Initialize the wrapper.
+
+        Args:
+            parser: The parser used on cache misses
+            cache: Where parsed text is kept
+        """
+        self.parser = parser
+        self.cache = cache
+
+    def parse(self, file_path: str) -> Document:
+        document = self.describe(file_path)
+        document.content = "\n".join(self.parse_pages(file_path))
+        return document
+
+    def describe(self, file_path: str) -> Document:
+        return self.parser.describe(file_path)
+
+    def parse_pages(self, file_path: str, content_hash: Optional[str] = None) -> Iterator[str]:
+        """Yield the file's pages from the cache, or parse and cache them on a miss."""
+        key = self.cache.key_for(file_path, self.parser.cache_key(file_path), content_hash)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield from cached
+            return
+        yield from self.cache.record(key, self.parser.parse_pages(file_path, content_hash))
+
+    def cache_key(self, file_path: str) -> str:
+        return self.parser.cache_key(file_path)
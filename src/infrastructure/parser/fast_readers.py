@@ -0,0 +1,85 @@
+"""
+Lightweight readers for file types that do not need unstructured's full pipeline.
+
+Each reader yields the document's text piece by piece, like
+DocumentParser.parse_pages, and imports its library only when called.
+"""
+
+import io
+from typing import Callable, Iterator
+
+# Characters read from a text file at a time
+_TEXT_BLOCK_CHARS = 1 << 20
+
+
+def read_text(file_path: str) -> Iterator[str]:
+    """
+    Yield a plain-text file in blocks that end at line breaks.
+
+    Joining the blocks with newlines gives the file's text back exactly.
+    """
+    with open(file_path, encoding="utf-8", errors="replace") as f:
+        carry = ""
+        while True:
+            block = f.read(_TEXT_BLOCK_CHARS)
+            if not block:
+                break
+            carry += block
+            cut = carry.rfind("\n")
+            if cut >= 0:
+                yield carry[:cut]
+                carry = carry[cut + 1:]
+        yield carry
+
+
+def read_pdf(file_path: str, ocr_page: Callable[[io.BytesIO], str]) -> Iterator[str]:
+    """
+    Yield the text layer of a PDF page by page.
+
+    Pages without any extractable text (scans, images) are extracted into a
+    one-page PDF and handed to ocr_page instead, so OCR only runs where it
+    is needed.
+
+    Raises:
+        ImportError: If pypdf is not installed
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(file_path)
+    for page in reader.pages:
+        text = page.extract_text() or ""
+        if text.strip():
+            yield text
+            continue
+
+        writer = PdfWriter()
+        writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        buffer.seek(0)
+        yield ocr_page(buffer)
+
+
+def read_docx(file_path: str) -> Iterator[str]:
+    """
+    Yield the paragraphs and table rows of a DOCX file in document order.
+
+    Raises:
+        ImportError: If python-docx is not installed
+    """
+    from docx import Document as DocxDocument
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    document = DocxDocument(file_path)
+    for element in document.element.body.iterchildren():
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag == "p":
+            text = Paragraph(element, document).text.strip()
+            if text:
+                yield text
+        elif tag == "tbl":
+            for row in Table(element, document).rows:
+                cells = [cell.text.strip() for cell in row.cells]
+                if any(cells):
+                    yield " | ".join(cells)
@@ -1,14 +1,71 @@
-import uuid
+import importlib.metadata
+import importlib.util
+import io
+from functools import lru_cache
+from itertools import groupby
 from pathlib import Path
-from typing import List
-
-from unstructured.partition.auto import partition
+from typing import Dict, Iterator, List, Optional
 
 from domain.interfaces.document_parser import DocumentParser
-from domain.models.document import Document
+from domain.models.document import Document, new_document_id
+from infrastructure.parser import fast_readers
+
+# PDF pages partitioned at a time when streaming, bounding the elements held in memory
+PDF_PAGE_WINDOW = 20
+
+# "fast" reads text directly and only OCRs PDF pages without a text layer;
+# the others are unstructured's partitioning strategies
+STRATEGIES = ("fast", "auto", "hi_res", "ocr_only")
+
+# Distributions whose version goes into the cache key of each fast reader (pypdf OCRs with unstructured)
+_READER_LIBRARIES = {"text": (), "pypdf": ("pypdf", "unstructured"), "docx": ("python-docx",)}
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+@lru_cache(maxsize=None)
+def _library_version(distribution: str) -> str:
+    try:
+        return importlib.metadata.version(distribution)
+    except importlib.metadata.PackageNotFoundError:
+        return "missing"
 
 
 class UnstructuredParser(DocumentParser):
+    """
+    Document parser that picks the cheapest way to read each file.
+
+    With the "fast" strategy, .txt files are read directly, PDFs through
+    their text layer (OCR only for pages without one) and DOCX files with
+    python-docx; anything else goes through unstructured. The other
+    strategies send every file through unstructured's partitioning with that
+    strategy. unstructured is only imported when a file needs it.
+
+    The strategy can be set per folder (relative to the raw data directory),
+    e.g. {"scans": "ocr_only", "legal/contracts": "hi_res"}; the deepest
+    matching folder wins.
+    """
+
+    def __init__(self, strategy: str = "fast", folder_strategies: Optional[Dict[str, str]] = None):
+        """
+        Initialize the parser.
+
+        Args:
+            strategy: Default strategy, one of STRATEGIES
+            folder_strategies: Strategy overrides keyed by folder path
+        """
+        folder_strategies = folder_strategies or {}
+        for value in [strategy, *folder_strategies.values()]:
+            if value not in STRATEGIES:
+                raise ValueError(f"Unknown parser strategy {value!r}; use one of {', '.join(STRATEGIES)}")
+        self.strategy = strategy
+        self.folder_strategies = {
+            tuple(part for part in folder.replace("\\", "/").split("/") if part): value
+            for folder, value in folder_strategies.items()
+        }
+
     def parse(self, file_path: str) -> Document:
         """
         Parse a document file and extract its content using unstructured library.
@@ -19,11 +76,136 @@ class UnstructuredParser(DocumentParser):
         Returns:
             Document: Document object with extracted content and metadata
         """
+        # Build the document metadata from the path
+        document = self.describe(file_path)
+        
+        # Parse the document and extract the text content of its elements
+        document.content = "\n".join(self.parse_pages(file_path))
+        
+        return document
+    
+    def parse_pages(self, file_path: str, content_hash: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield the text of a document page by page.
+        
+        Fast readers stream their file directly. With unstructured, PDFs are
+        partitioned a window of pages at a time, so only that window's
+        elements are ever in memory; other formats are partitioned at once and
+        their elements grouped by page number (when they have one).
+        
+        Args:
+            file_path: Path to the document file
+            content_hash: Unused; the file is always read
+            
+        Yields:
+            str: Text of consecutive pages, elements separated by newlines
+        """
+        reader = self._reader_for(file_path)
+        if reader == "text":
+            yield from fast_readers.read_text(file_path)
+            return
+        if reader == "pypdf":
+            yield from fast_readers.read_pdf(file_path, self._ocr_page)
+            return
+        if reader == "docx":
+            yield from fast_readers.read_docx(file_path)
+            return
+        
+        from unstructured.partition.auto import partition
+        
+        if Path(file_path).suffix.lower() == ".pdf":
+            windows = self._pdf_windows(file_path)
+            if windows is not None:
+                for window in windows:
+                    yield from self._pages_of(partition(file=window, content_type="application/pdf", strategy=reader))
+                return
+        yield from self._pages_of(partition(file_path, strategy=reader))
+    
+    def cache_key(self, file_path: str) -> str:
+        """Parser version, the reader or strategy used for the file and the versions of the libraries doing the work."""
+        reader = self._reader_for(file_path)
+        libraries = [f"{name}-{_library_version(name)}" for name in _READER_LIBRARIES.get(reader, ("unstructured",))]
+        return "/".join([super().cache_key(file_path), reader, *libraries])
+    
+    def strategy_for(self, file_path: str) -> str:
+        """Strategy used for a file: the override of its deepest configured folder, or the default."""
+        folders = self._folders_of(Path(file_path))
+        for depth in range(len(folders), 0, -1):
+            strategy = self.folder_strategies.get(tuple(folders[:depth]))
+            if strategy is not None:
+                return strategy
+        return self.strategy
+    
+    def _reader_for(self, file_path: str) -> str:
+        """How a file is read: a fast reader ("text", "pypdf", "docx") or the unstructured strategy to partition it with."""
+        strategy = self.strategy_for(file_path)
+        if strategy != "fast":
+            return strategy
+        suffix = Path(file_path).suffix.lower()
+        if suffix == ".txt":
+            return "text"
+        if suffix == ".pdf" and _installed("pypdf"):
+            return "pypdf"
+        if suffix == ".docx" and _installed("docx"):
+            return "docx"
+        return "auto"
+    
+    @staticmethod
+    def _ocr_page(page: io.BytesIO) -> str:
+        """OCR a one-page PDF that has no text layer."""
+        from unstructured.partition.pdf import partition_pdf
+        
+        return "\n".join(str(element) for element in partition_pdf(file=page, strategy="ocr_only"))
+    
+    @staticmethod
+    def _pages_of(elements) -> Iterator[str]:
+        """Join consecutive elements of the same page into one text."""
+        for _, page in groupby(elements, key=lambda element: element.metadata.page_number):
+            yield "\n".join(str(element) for element in page)
+    
+    @staticmethod
+    def _pdf_windows(file_path: str):
+        """
+        Split a PDF into in-memory PDFs of PDF_PAGE_WINDOW pages each, lazily.
+        
+        Returns None when pypdf is not installed or the file is a single window anyway.
+        """
+        try:
+            from pypdf import PdfReader, PdfWriter
+        except ImportError:
+            return None
+        
+        reader = PdfReader(file_path)
+        if len(reader.pages) <= PDF_PAGE_WINDOW:
+            return None
+        
+        def windows() -> Iterator[io.BytesIO]:
+            for start in range(0, len(reader.pages), PDF_PAGE_WINDOW):
+                writer = PdfWriter()
+                for page in reader.pages[start:start + PDF_PAGE_WINDOW]:
+                    writer.add_page(page)
+                buffer = io.BytesIO()
+                writer.write(buffer)
+                buffer.seek(0)
+                yield buffer
+        
+        return windows()
+    
+    def describe(self, file_path: str) -> Document:
+        """
+        Build a Document with metadata derived from the file path and no content.
+        
+        Args:
+            file_path: Path to the document file
+            
+        Returns:
+            Document: Document object with an empty content field
+        """
         # Convert to Path object for easier path manipulation
         path = Path(file_path)
         
-        # Generate a unique ID for the document
-        doc_id = str(uuid.uuid4())
+        # Ingestion replaces it with the ID the ledger keeps for the file
+        doc_id = new_document_id()
         
         # Use filename without extension as document name
         name = path.stem
@@ -31,22 +213,20 @@ class UnstructuredParser(DocumentParser):
         # Extract tags from parent folder path
         tags = self._extract_tags_from_path(path)
         
-        # Parse the document
-        elements = partition(file_path)
-        
-        # Extract text content from elements
-        content = "\n".join([str(element) for element in elements])
-        
         # Create Document object
-        document = Document(
+        return Document(
             id=doc_id,
             name=name,
-            content=content,
+            content="",
             path=str(path),
             tags=tags
         )
-        
-        return document
+    
+    @staticmethod
+    def _folders_of(path: Path) -> List[str]:
+        """Folders between the raw data directory and the file."""
+        # Skip the first two parts (data/raw) and the filename
+        return list(path.parts)[2:-1]
     
     def _extract_tags_from_path(self, path: Path) -> List[str]:
         """
@@ -63,8 +243,7 @@ class UnstructuredParser(DocumentParser):
         """
         tags = []
         
-        # Skip the first two parts (data/raw)
-        parts = list(path.parts)[2:-1]  # exclude filename
+        parts = self._folders_of(path)
         
         # Add each part as a tag
         for i, part in enumerate(parts):
@@ -0,0 +1,33 @@
+"""Limits and helpers shared by the SQLite-backed indexes and caches."""
+
+import sqlite3
+from typing import List, Tuple
+
+# Maximum number of values bound in a single SQLite IN (...) clause
+SQL_BATCH = 500
+
+# Share of its cap a size-capped cache is brought back to when it overflows
+_EVICTION_TARGET = 0.9
+
+
+def lru_victims(conn: sqlite3.Connection, table: str, total: int, max_bytes: int) -> Tuple[List[str], int]:
+    """
+    Pick the least recently used entries of a size-capped cache table to delete.
+
+    The table must have key, size and last_access columns. Entries are picked
+    until the remaining total is back under 90% of max_bytes, so the cache
+    does not evict again on its very next write.
+
+    Returns:
+        Keys of the entries to delete and their total size
+    """
+    target = int(max_bytes * _EVICTION_TARGET)
+    keys, freed = [], 0
+    cursor = conn.execute(f"SELECT key, size FROM {table} ORDER BY last_access")
+    for key, size in cursor:
+        if total - freed <= target:
+            break
+        keys.append(key)
+        freed += size
+    cursor.close()
+    return keys, freed
@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import List
+
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+# Rough characters-per-token ratio used when tiktoken is unavailable
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def _encoding_for(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+class TokenCounter:
+    """
+    Counts tokens the way OpenAI models do.
+
+    Uses tiktoken when it is installed and falls back to a character-based
+    estimate otherwise.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._encoding = _encoding_for(model) if HAS_TIKTOKEN else None
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens in a text."""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return max(1, (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN)
+
+    def count_many(self, texts: List[str]) -> List[int]:
+        """Return the number of tokens in each text."""
+        if self._encoding is not None:
+            return [len(tokens) for tokens in self._encoding.encode_batch(texts, disallowed_special=())]
+        return [self.count(text) for text in texts]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut a text down to at most max_tokens tokens."""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            return self._encoding.decode(tokens[:max_tokens])
+        return text[:max_tokens * _CHARS_PER_TOKEN]
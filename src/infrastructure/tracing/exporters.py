@@ -0,0 +1,99 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+from infrastructure.tracing.recording_tracer import QUANTILES, LatencyStats, SpanExporter, SpanRecord, quantile_key
+
+
+class JsonlSpanExporter(SpanExporter):
+    """
+    Appends one JSON object per finished span to a file.
+
+    Lines carry the trace and parent IDs, so the steps of one question or
+    document can be regrouped afterwards, e.g. with jq.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file: Optional[TextIO] = None
+
+    def export(self, record: SpanRecord) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps({
+            "name": record.name,
+            "trace_id": record.trace_id,
+            "span_id": record.span_id,
+            "parent_id": record.parent_id,
+            "start": round(record.start, 6),
+            "seconds": round(record.seconds, 6),
+            "attributes": record.attributes
+        }, ensure_ascii=False, default=str) + "\n")
+
+    def flush(self, stats: LatencyStats) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self, stats: LatencyStats) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PrometheusTextExporter(SpanExporter):
+    """
+    Writes the latency statistics in the Prometheus text format.
+
+    The file is rewritten on every flush and replaced atomically, so it can be
+    picked up by node_exporter's textfile collector or scraped as is. Span
+    durations are a summary with p50/p95/p99 quantiles; numeric attributes
+    (tokens, bytes, chunks) are totals per span name.
+    """
+
+    def __init__(self, path: Path, prefix: str = "rag"):
+        self.path = Path(path)
+        self.prefix = prefix
+
+    def flush(self, stats: LatencyStats) -> None:
+        snapshot = stats.snapshot()
+        if not snapshot:
+            return
+
+        metric = f"{self.prefix}_span_seconds"
+        lines: List[str] = [
+            f"# HELP {metric} Duration of traced steps.",
+            f"# TYPE {metric} summary"
+        ]
+        for name, entry in sorted(snapshot.items()):
+            span = _label(name)
+            for quantile in QUANTILES:
+                lines.append(f'{metric}{{span="{span}",quantile="{quantile:g}"}} {entry[quantile_key(quantile)]:.6f}')
+            lines.append(f'{metric}_sum{{span="{span}"}} {entry["sum"]:.6f}')
+            lines.append(f'{metric}_count{{span="{span}"}} {entry["count"]}')
+
+        totals = f"{self.prefix}_span_attribute_total"
+        lines += [
+            f"# HELP {totals} Sum of numeric span attributes such as token counts and payload sizes.",
+            f"# TYPE {totals} counter"
+        ]
+        for name, entry in sorted(snapshot.items()):
+            for key, value in sorted(entry["attributes"].items()):
+                lines.append(f'{totals}{{span="{_label(name)}",attribute="{_label(key)}"}} {_number(value)}')
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        temp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+
+def _number(value: float) -> str:
+    """Format a sample value without losing precision; totals of counts stay integers."""
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return re.sub(r'(["\\])', r"\\\1", value).replace("\n", "\\n")
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from domain.interfaces.tracer import NullTracer, Tracer
+from infrastructure.config import TRACE_FLUSH_SECONDS, TRACE_JSONL_PATH, TRACE_PROMETHEUS_PATH, TRACING_ENABLED
+
+
+def create_tracer() -> Tracer:
+    """
+    Create the tracer selected by TRACING_ENABLED.
+
+    When enabled, spans are appended to TRACE_JSONL_PATH and p50/p95/p99
+    latencies are written to TRACE_PROMETHEUS_PATH (either can be left empty).
+    Disabled tracing returns a NullTracer, whose spans do nothing.
+    """
+    if not TRACING_ENABLED:
+        return NullTracer()
+
+    from infrastructure.tracing.exporters import JsonlSpanExporter, PrometheusTextExporter
+    from infrastructure.tracing.recording_tracer import RecordingTracer
+    exporters = []
+    if TRACE_JSONL_PATH:
+        exporters.append(JsonlSpanExporter(Path(TRACE_JSONL_PATH)))
+    if TRACE_PROMETHEUS_PATH:
+        exporters.append(PrometheusTextExporter(Path(TRACE_PROMETHEUS_PATH)))
+    return RecordingTracer(exporters, flush_seconds=TRACE_FLUSH_SECONDS)
+
+
+def tracing_location() -> str:
+    """Human-readable list of where traces are written."""
+    paths = [path for path in (TRACE_JSONL_PATH, TRACE_PROMETHEUS_PATH) if path]
+    return ", ".join(paths) if paths else "in memory only"
@@ -0,0 +1,237 @@
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from domain.interfaces.tracer import Span, Tracer
+
+# Percentiles reported for every span name
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass
+class SpanRecord:
+    """A finished span."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float  # Unix time
+    seconds: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class LatencyStats:
+    """
+    Per-span-name latency percentiles and attribute totals.
+
+    Counts, sums and attribute totals cover every span; percentiles are
+    computed over the most recent max_samples durations of each name, so
+    memory stays bounded on long-running processes.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._sums: Dict[str, float] = {}
+        self._attributes: Dict[str, Dict[str, float]] = {}
+
+    def add(self, record: SpanRecord) -> None:
+        with self._lock:
+            samples = self._samples.get(record.name)
+            if samples is None:
+                samples = self._samples[record.name] = deque(maxlen=self.max_samples)
+            samples.append(record.seconds)
+            self._counts[record.name] = self._counts.get(record.name, 0) + 1
+            self._sums[record.name] = self._sums.get(record.name, 0.0) + record.seconds
+            totals = self._attributes.setdefault(record.name, {})
+            for key, value in record.attributes.items():
+                # Only numbers add up (tokens, bytes, chunks); flags and labels are left out
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    totals[key] = totals.get(key, 0) + value
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Statistics per span name.
+
+        Returns:
+            {name: {"count", "sum", "p50", "p95", "p99", "attributes": {key: total}}}
+        """
+        with self._lock:
+            names = list(self._samples)
+            samples = {name: sorted(self._samples[name]) for name in names}
+            result = {}
+            for name in names:
+                entry: Dict[str, Any] = {"count": self._counts[name], "sum": self._sums[name]}
+                for quantile in QUANTILES:
+                    entry[quantile_key(quantile)] = _percentile(samples[name], quantile)
+                entry["attributes"] = dict(self._attributes[name])
+                result[name] = entry
+        return result
+
+
+class SpanExporter:
+    """Receives every finished span; flushed periodically with the current statistics."""
+
+    def export(self, record: SpanRecord) -> None:
+        pass
+
+    def flush(self, stats: LatencyStats) -> None:
+        pass
+
+    def close(self, stats: LatencyStats) -> None:
+        self.flush(stats)
+
+
+_current_span: ContextVar[Optional["_RecordedSpan"]] = ContextVar("current_span", default=None)
+
+
+class _RecordedSpan(Span):
+    def __init__(self, tracer: "RecordingTracer", name: str, attributes: Optional[Dict[str, Any]], parent: Optional[Span]):
+        self._tracer = tracer
+        self.name = name
+        self.attributes = dict(attributes or {})
+        parent = parent if isinstance(parent, _RecordedSpan) else _current_span.get()
+        self.trace_id = parent.trace_id if parent else os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = os.urandom(8).hex()
+        self._token = None
+        self._start = 0.0
+        self._started = 0.0
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "_RecordedSpan":
+        self._start = time.time()
+        self._started = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        seconds = time.perf_counter() - self._started
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited in another context than it was entered (e.g. a generator closed elsewhere)
+            pass
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self._tracer._finish(SpanRecord(
+            name=self.name,
+            trace_id=self.trace_id,
+            span_id=self.span_id,
+            parent_id=self.parent_id,
+            start=self._start,
+            seconds=seconds,
+            attributes=self.attributes
+        ))
+
+
+class RecordingTracer(Tracer):
+    """
+    Tracer that records span durations and attributes.
+
+    Spans opened while another one is open (in the same thread or task)
+    become its children and share its trace ID, so the steps of one
+    question can be told apart from those of another. Every finished span
+    feeds the latency statistics and the exporters; exporters are flushed
+    at most every flush_seconds, and on close().
+    """
+
+    def __init__(self, exporters: Sequence[SpanExporter] = (), flush_seconds: float = 10.0, max_samples: int = 10000):
+        """
+        Initialize the tracer.
+
+        Args:
+            exporters: Destinations for spans and statistics (JSONL, Prometheus text, ...)
+            flush_seconds: Minimum interval between two exporter flushes
+            max_samples: Recent durations kept per span name for percentiles
+        """
+        self.exporters: List[SpanExporter] = list(exporters)
+        self.flush_seconds = flush_seconds
+        self.stats = LatencyStats(max_samples)
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None, parent: Optional[Span] = None) -> Span:
+        return _RecordedSpan(self, name, attributes, parent)
+
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[Span] = None
+    ) -> None:
+        span = _RecordedSpan(self, name, attributes, parent)
+        self._finish(SpanRecord(
+            name=name,
+            trace_id=span.trace_id,
+            span_id=span.span_id,
+            parent_id=span.parent_id,
+            start=time.time() - seconds,
+            seconds=seconds,
+            attributes=span.attributes
+        ))
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def summary(self) -> List[str]:
+        """Latency table of every span name seen so far, one line per name."""
+        snapshot = self.stats.snapshot()
+        lines = [f"  {'span':<24}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'total':>10}"]
+        for name, entry in sorted(snapshot.items()):
+            lines.append(
+                f"  {name:<24}{entry['count']:>8}{entry['p50'] * 1000:>8.1f}ms{entry['p95'] * 1000:>8.1f}ms"
+                f"{entry['p99'] * 1000:>8.1f}ms{entry['sum']:>9.2f}s"
+            )
+        return lines if snapshot else []
+
+    def close(self) -> None:
+        with self._lock:
+            for exporter in self.exporters:
+                try:
+                    exporter.close(self.stats)
+                except OSError as e:
+                    print(f"Warning: Failed to export traces: {str(e)}")
+
+    def _finish(self, record: SpanRecord) -> None:
+        self.stats.add(record)
+        with self._lock:
+            for exporter in self.exporters:
+                try:
+                    exporter.export(record)
+                except OSError as e:
+                    print(f"Warning: Failed to export traces: {str(e)}")
+            if time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush()
+
+    def _flush(self) -> None:
+        """Flush every exporter; must hold the lock."""
+        self._last_flush = time.monotonic()
+        for exporter in self.exporters:
+            try:
+                exporter.flush(self.stats)
+            except OSError as e:
+                print(f"Warning: Failed to export traces: {str(e)}")
+
+
+def quantile_key(quantile: float) -> str:
+    """Key of a percentile in LatencyStats snapshots, e.g. "p95"."""
+    return f"p{quantile * 100:g}"
+
+
+def _percentile(sorted_values: List[float], quantile: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(quantile * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
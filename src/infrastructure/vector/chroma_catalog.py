@@ -0,0 +1,36 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+# Maps the collection names the app uses to the Chroma collections holding them
+_CATALOG_FILE = "collections.json"
+
+
+def _read(db_dir: Path) -> Dict[str, str]:
+    path = Path(db_dir) / _CATALOG_FILE
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def active_collection_name(db_dir: Path, name: str) -> str:
+    """
+    The Chroma collection currently serving a collection name.
+
+    A collection that was never rebuilt is stored under its own name.
+    """
+    return _read(db_dir).get(name, name)
+
+
+def set_active_collection(db_dir: Path, name: str, collection: str) -> None:
+    """Point a collection name at another Chroma collection; readers see the old or the new one, never neither."""
+    catalog = {**_read(db_dir), name: collection}
+    path = Path(db_dir) / _CATALOG_FILE
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
@@ -1,77 +1,574 @@
+import threading
+import weakref
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict
+from datetime import datetime
+from typing import Any, Iterable, List, Dict, Optional, Set, Tuple
 from pathlib import Path
 
-from domain.interfaces.vector_store import VectorStore
-from infrastructure.config import CHROMA_DB_DIR
+from domain.interfaces.tracer import NullTracer, Tracer
+from domain.interfaces.vector_store import VectorStore, VectorWriteError
+from domain.models.document import merged_metadata, tag_key, tag_metadata
+from infrastructure.config import (
+    CHROMA_DB_DIR,
+    CHROMA_WRITE_BATCH_SIZE,
+    CHROMA_WRITE_BATCH_MB,
+    CHROMA_HNSW_SPACE,
+    CHROMA_HNSW_M,
+    CHROMA_HNSW_CONSTRUCTION_EF,
+    CHROMA_HNSW_SEARCH_EF,
+    CHROMA_HNSW_BATCH_SIZE,
+    CHROMA_HNSW_SYNC_THRESHOLD,
+)
+from infrastructure.vector.chroma_catalog import active_collection_name, set_active_collection
+
+
+def configured_index_params() -> Dict[str, Any]:
+    """HNSW settings from the configuration, as collection metadata; unset ones are left to Chroma."""
+    params = {
+        "hnsw:M": CHROMA_HNSW_M,
+        "hnsw:construction_ef": CHROMA_HNSW_CONSTRUCTION_EF,
+        "hnsw:search_ef": CHROMA_HNSW_SEARCH_EF,
+        "hnsw:batch_size": CHROMA_HNSW_BATCH_SIZE,
+        "hnsw:sync_threshold": CHROMA_HNSW_SYNC_THRESHOLD,
+    }
+    return {"hnsw:space": CHROMA_HNSW_SPACE, **{key: value for key, value in params.items() if value}}
+
+
+# HNSW settings a collection can be created with, and the value Chroma uses when one is not set
+_HNSW_DEFAULTS: Dict[str, Any] = {
+    "hnsw:space": "l2",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 100,
+    "hnsw:search_ef": 100,
+    "hnsw:batch_size": 100,
+    "hnsw:sync_threshold": 1000,
+}
+_HNSW_SPACES = ("l2", "cosine", "ip")
+
+
+def validate_index_params(params: Dict[str, Any]) -> None:
+    """
+    Check HNSW settings before they are used as collection metadata.
+    
+    Raises:
+        ValueError: If a key is not a known HNSW setting or its value is out of range
+    """
+    for key, value in params.items():
+        if key not in _HNSW_DEFAULTS:
+            raise ValueError(f"Unknown HNSW setting '{key}'; expected one of {', '.join(_HNSW_DEFAULTS)}")
+        if key == "hnsw:space":
+            if value not in _HNSW_SPACES:
+                raise ValueError(f"{key} must be one of {', '.join(_HNSW_SPACES)}, got {value!r}")
+        elif isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValueError(f"{key} must be a positive integer, got {value!r}")
+
+
+def effective_index_params(metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """HNSW settings a collection with this metadata uses, with Chroma's defaults filled in."""
+    metadata = metadata or {}
+    return {key: metadata.get(key, default) for key, default in _HNSW_DEFAULTS.items()}
+
+
+class _UpsertBuffer:
+    """
+    Chunks waiting to be upserted into a collection, written in batches capped by count and size.
+    
+    Kept apart from ChromaVectorStore so a finalizer can flush it without
+    keeping the store alive.
+    """
+    
+    def __init__(self, collection: Any, max_chunks: int, max_bytes: int, tracer: Tracer):
+        self.collection = collection
+        self.max_chunks = max_chunks
+        self.max_bytes = max_bytes
+        self.tracer = tracer
+        # By record ID: (embedding, metadata, content, approximate bytes)
+        self._records: Dict[str, Tuple[List[float], Dict, str, int]] = {}
+        self._bytes = 0
+        # Buffered chunks per document ID
+        self._documents: Dict[str, int] = {}
+        self._lock = threading.RLock()
+    
+    def add(self, ids: List[str], embeddings: List[List[float]], metadatas: List[Dict], contents: List[str]) -> None:
+        with self._lock:
+            for key, embedding, metadata, content in zip(ids, embeddings, metadatas, contents):
+                # Chroma rejects a batch that repeats an ID, so a later write replaces the buffered one
+                self._discard(key)
+                size = self._record_bytes(embedding, metadata, content)
+                if self._records and self._bytes + size > self.max_bytes:
+                    self._write()
+                self._records[key] = (embedding, metadata, content, size)
+                self._bytes += size
+                document_id = metadata.get("document_id", "")
+                self._documents[document_id] = self._documents.get(document_id, 0) + 1
+                if len(self._records) >= self.max_chunks or self._bytes >= self.max_bytes:
+                    self._write()
+    
+    def flush(self) -> None:
+        if not self._records:
+            return
+        with self._lock:
+            self._write()
+    
+    def document_ids(self) -> Set[str]:
+        with self._lock:
+            return set(self._documents)
+    
+    def buffered(self, keys: Iterable[str]) -> Set[str]:
+        """The given record IDs that are waiting in the buffer."""
+        with self._lock:
+            return {key for key in keys if key in self._records}
+    
+    def _discard(self, key: str) -> None:
+        record = self._records.pop(key, None)
+        if record is None:
+            return
+        self._bytes -= record[3]
+        document_id = record[1].get("document_id", "")
+        self._documents[document_id] -= 1
+        if not self._documents[document_id]:
+            del self._documents[document_id]
+    
+    def _write(self) -> None:
+        """Upsert the buffered chunks as one batch (the lock must be held)."""
+        if not self._records:
+            return
+        records, size = self._records, self._bytes
+        self._records, self._bytes, self._documents = {}, 0, {}
+        try:
+            with self.tracer.span("chroma.upsert", {"chunks": len(records), "bytes": size}):
+                self.collection.upsert(
+                    ids=list(records),
+                    embeddings=[record[0] for record in records.values()],
+                    metadatas=[record[1] for record in records.values()],
+                    documents=[record[2] for record in records.values()]
+                )
+        except Exception as e:
+            # The batch may hold chunks of earlier callers' documents, so the error names them all
+            document_ids = {record[1].get("document_id", "") for record in records.values()}
+            raise VectorWriteError(f"Upsert of {len(records)} chunk(s) failed: {e}", document_ids) from e
+    
+    @staticmethod
+    def _record_bytes(embedding: List[float], metadata: Dict, content: str) -> int:
+        """Approximate size of a chunk in an upsert: float32 vector, text and metadata."""
+        metadata_bytes = sum(len(str(key)) + len(str(value)) for key, value in metadata.items())
+        return 4 * len(embedding) + len(content.encode("utf-8")) + metadata_bytes
+
 
 class ChromaVectorStore(VectorStore):
-    def __init__(self, collection_name: str = "documents"):
-        """Initialize ChromaDB client and collection."""
+    def __init__(
+        self,
+        collection_name: str = "documents",
+        index_params: Optional[Dict[str, Any]] = None,
+        write_batch_size: int = CHROMA_WRITE_BATCH_SIZE,
+        write_batch_bytes: int = int(CHROMA_WRITE_BATCH_MB * 1024 * 1024),
+        tracer: Optional[Tracer] = None
+    ):
+        """
+        Initialize ChromaDB client and collection.
+        
+        Args:
+            collection_name: Name of the collection
+            index_params: HNSW settings for a newly created collection, e.g. {"hnsw:M": 32},
+                on top of the configured ones; an existing collection keeps the settings
+                it was created with until it is rebuilt
+            write_batch_size: Most chunks per upsert, capped by the client's maximum (0 = that maximum)
+            write_batch_bytes: Approximate size budget of one upsert
+            tracer: Receives a "chroma.upsert" span for every batch written
+        """
         # Create directory if it doesn't exist
-        db_path = Path(CHROMA_DB_DIR)
-        db_path.mkdir(parents=True, exist_ok=True)
+        self.db_path = Path(CHROMA_DB_DIR)
+        self.db_path.mkdir(parents=True, exist_ok=True)
         
         # Initialize client with persistent storage
         self.client = chromadb.PersistentClient(
-            path=str(db_path),
+            path=str(self.db_path),
             settings=Settings(anonymized_telemetry=False)
         )
         
-        # Get or create collection
+        # Get or create collection; after a rebuild the name is served by the rebuilt collection
+        self.collection_name = collection_name
+        self.index_params = {**configured_index_params(), **(index_params or {})}
+        validate_index_params(self.index_params)
         self.collection = self.client.get_or_create_collection(
-            name=collection_name,
-            metadata={"hnsw:space": "cosine"}  # Using cosine similarity
+            name=active_collection_name(self.db_path, collection_name),
+            metadata=self.index_params
+        )
+        self._space = effective_index_params(self.collection.metadata)["hnsw:space"]
+        
+        max_batch_size = self.client.get_max_batch_size()
+        self._buffer = _UpsertBuffer(
+            self.collection,
+            max_chunks=min(write_batch_size, max_batch_size) if write_batch_size > 0 else max_batch_size,
+            max_bytes=write_batch_bytes,
+            tracer=tracer or NullTracer()
         )
+        # Buffered chunks are written when the store is garbage collected or at interpreter exit,
+        # should close() never be called
+        self._finalizer = weakref.finalize(self, self._buffer.flush)
     
-    def add_documents(self, embeddings: List[List[float]], metadatas: List[Dict]):
+    def add_documents(
+        self,
+        embeddings: List[List[float]],
+        metadatas: List[Dict],
+        contents: Optional[List[str]] = None
+    ):
         """
         Add document embeddings with metadata to the vector store.
         
+        The chunk text is stored once, as the Chroma document; it is never
+        duplicated into the metadata. Chunks are buffered across calls and
+        upserted in batches of up to write_batch_size chunks and
+        write_batch_bytes; flush() and close() write the rest. Buffered
+        chunks count for existing_chunk_ids, and deleting or updating a
+        document writes its buffered chunks first, but search only finds
+        chunks once they are written.
+        
         Args:
             embeddings: List of document embeddings
             metadatas: List of metadata dicts containing document_id, chunk_id, etc.
+            contents: Text of each chunk (taken from a "content" metadata key if omitted)
         """
-        # Generate IDs from metadata (document_id + chunk_id)
-        ids = [f"{m.get('document_id', '')}_{m.get('chunk_id', '')}" for m in metadatas]
+        # Generate IDs from metadata (document_id + chunk_id); stable IDs make upsert idempotent
+        ids = [self._chunk_key(m.get("document_id", ""), m.get("chunk_id", "")) for m in metadatas]
         
-        # Convert documents to strings for storage (required by ChromaDB)
-        documents = [m.get('content', '') for m in metadatas]
+        if contents is None:
+            contents = [m.get("content", "") for m in metadatas]
+        metadatas = [{key: value for key, value in m.items() if key != "content"} for m in metadatas]
         
-        # Add to collection
-        self.collection.upsert(
-            embeddings=embeddings,
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        self._buffer.add(ids, embeddings, metadatas, contents)
+    
+    def flush(self) -> None:
+        """
+        Upsert the chunks buffered by add_documents.
+        
+        Raises:
+            VectorWriteError: If an upsert failed; its chunks are dropped and their documents named
+        """
+        self._buffer.flush()
+    
+    def buffered_document_ids(self) -> Set[str]:
+        return self._buffer.document_ids()
     
-    def search(self, query_embedding: List[float], top_k: int = 5) -> List[Dict]:
+    def close(self) -> None:
+        """Write buffered chunks; the store must not be used afterwards."""
+        self._finalizer()
+    
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
         """
         Search for similar documents using query embedding.
         
         Args:
             query_embedding: Embedding of the query text
             top_k: Number of results to return
+            filters: Metadata filter evaluated by Chroma inside the index (see VectorStore.search)
             
         Returns:
             List of dictionaries containing document metadata and similarity scores
         """
+        return self.search_batch([query_embedding], top_k=top_k, filters=filters)[0]
+    
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict]]:
+        """
+        Search for several query embeddings in one Chroma query.
+        
+        Args:
+            query_embeddings: Embeddings of the query texts
+            top_k: Number of results to return per query
+            filters: Metadata filter applied to every query (see VectorStore.search)
+            
+        Returns:
+            One list of results per query embedding, in the same order
+        """
+        if not query_embeddings:
+            return []
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=top_k,
+            where=self._build_where(filters),
             include=["metadatas", "documents", "distances"]
         )
         
         # Format results
         formatted_results = []
-        for i in range(len(results["ids"][0])):
-            formatted_results.append({
-                "id": results["ids"][0][i],
-                "metadata": results["metadatas"][0][i],
-                "content": results["documents"][0][i],
-                "score": 1.0 - results["distances"][0][i]  # Convert distance to similarity score
-            })
+        for q in range(len(query_embeddings)):
+            formatted_results.append([
+                {
+                    "id": results["ids"][q][i],
+                    "metadata": results["metadatas"][q][i],
+                    "content": results["documents"][q][i],
+                    "score": self._similarity(results["distances"][q][i])
+                }
+                for i in range(len(results["ids"][q]))
+            ])
             
-        return formatted_results 
\ No newline at end of file
+        return formatted_results
+    
+    def existing_chunk_ids(self, document_id: str, chunk_ids: List[str]) -> Set[str]:
+        """
+        Find which chunks of a document are already stored.
+        
+        Args:
+            document_id: ID of the document the chunks belong to
+            chunk_ids: Candidate chunk IDs
+            
+        Returns:
+            Set of the chunk IDs present in the collection
+        """
+        if not chunk_ids:
+            return set()
+        keys = {self._chunk_key(document_id, chunk_id): chunk_id for chunk_id in chunk_ids}
+        found = set(self.collection.get(ids=list(keys), include=[])["ids"]) | self._buffer.buffered(keys)
+        return {keys[key] for key in found}
+    
+    def delete_document(self, document_id: str, keep_chunk_ids: Optional[Iterable[str]] = None) -> None:
+        """
+        Delete the chunks belonging to a document.
+        
+        Args:
+            document_id: ID of the document whose chunks should be removed
+            keep_chunk_ids: Chunk IDs to leave in place
+        """
+        self._flush_document(document_id)
+        if not keep_chunk_ids:
+            self.collection.delete(where={"document_id": document_id})
+            return
+        
+        keep = {self._chunk_key(document_id, chunk_id) for chunk_id in keep_chunk_ids}
+        stored = self.collection.get(where={"document_id": document_id}, include=[])["ids"]
+        stale = [key for key in stored if key not in keep]
+        if stale:
+            self.collection.delete(ids=stale)
+    
+    def update_document_metadata(self, document_id: str, updates: Dict) -> None:
+        """
+        Merge metadata updates into all chunks of a document, keeping their embeddings.
+        
+        Args:
+            document_id: ID of the document whose chunks should be updated
+            updates: Metadata keys and values to set on every chunk; a None value removes the key
+        """
+        self._flush_document(document_id)
+        removes_keys = any(value is None for value in updates.values())
+        existing = self.collection.get(
+            where={"document_id": document_id},
+            include=["metadatas", "documents", "embeddings"] if removes_keys else ["metadatas"]
+        )
+        if not existing["ids"]:
+            return
+        
+        metadatas = [merged_metadata(metadata or {}, updates) for metadata in existing["metadatas"]]
+        if removes_keys:
+            self._replace_chunks(existing["ids"], list(existing["embeddings"]), metadatas, existing["documents"])
+        else:
+            self.collection.update(ids=existing["ids"], metadatas=metadatas)
+    
+    def migrate_tag_keys(self, batch_size: int = 1000) -> int:
+        """
+        Add per-tag boolean keys to chunks stored before tags were filterable.
+        
+        Args:
+            batch_size: Number of chunks read and updated per round trip
+            
+        Returns:
+            int: Number of chunks updated
+        """
+        self.flush()
+        updated = 0
+        offset = 0
+        while True:
+            page = self.collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                return updated
+            offset += len(page["ids"])
+            
+            ids, metadatas = [], []
+            for chunk_id, metadata in zip(page["ids"], page["metadatas"]):
+                metadata = metadata or {}
+                tags = [tag.strip() for tag in str(metadata.get("tags", "")).split(",") if tag.strip()]
+                missing = {key: value for key, value in tag_metadata(tags).items() if key not in metadata}
+                if missing:
+                    ids.append(chunk_id)
+                    metadatas.append({**metadata, **missing})
+            
+            if ids:
+                self.collection.update(ids=ids, metadatas=metadatas)
+                updated += len(ids)
+    
+    def migrate_content_out_of_metadata(self, batch_size: int = 1000) -> int:
+        """
+        Remove the copy of the chunk text that older versions kept in metadata.
+        
+        Affected chunks are written back whole under their own IDs, without
+        the "content" key; the text itself is kept as the Chroma document.
+        Stop the app first: a chunk is briefly missing from search while it
+        is rewritten.
+        
+        Args:
+            batch_size: Number of chunks read and rewritten per round trip
+            
+        Returns:
+            int: Number of chunks rewritten
+        """
+        self.flush()
+        # Snapshot the IDs first; pages by offset are not stable while chunks are updated
+        all_ids = self.collection.get(include=[])["ids"]
+        migrated = 0
+        for i in range(0, len(all_ids), batch_size):
+            page = self.collection.get(
+                ids=all_ids[i:i + batch_size],
+                include=["metadatas", "documents", "embeddings"]
+            )
+            ids, embeddings, metadatas, documents = [], [], [], []
+            for j, chunk_id in enumerate(page["ids"]):
+                metadata = page["metadatas"][j] or {}
+                if "content" not in metadata:
+                    continue
+                ids.append(chunk_id)
+                embeddings.append(page["embeddings"][j])
+                documents.append(page["documents"][j] or metadata["content"])
+                metadatas.append({key: value for key, value in metadata.items() if key != "content"})
+            
+            if ids:
+                self._replace_chunks(ids, embeddings, metadatas, documents)
+                migrated += len(ids)
+        return migrated
+    
+    def pending_index_changes(self) -> Dict[str, Tuple[Any, Any]]:
+        """
+        Compare the collection's HNSW settings with the requested ones.
+        
+        Returns:
+            Dict mapping each setting that differs to (current value, requested value)
+        """
+        current = effective_index_params(self.collection.metadata)
+        requested = effective_index_params(self.index_params)
+        return {key: (current[key], requested[key]) for key in requested if current[key] != requested[key]}
+    
+    def rebuild(self, batch_size: int = 1000, keep_previous: bool = False) -> Dict[str, Any]:
+        """
+        Copy the collection into a fresh one built with the requested HNSW settings and switch to it.
+        
+        Rebuilding applies changed settings and compacts the index: HNSW only marks
+        deleted vectors, so after many upserts and deletes the graph is full of
+        tombstones that every query still walks. Embeddings are copied, not recomputed.
+        The copy gets a new Chroma collection name; once it is complete, the
+        collection catalog next to the database points the store's collection
+        name at it in one atomic file replace, and the old collection is deleted.
+        Writes made by other processes during the copy are lost, and processes that
+        opened the old collection keep using it until restarted.
+        
+        Args:
+            batch_size: Number of chunks read and written per round trip
+            keep_previous: Keep the old collection instead of deleting it
+            
+        Returns:
+            Dict with the number of chunks copied and the Chroma name of the kept old collection
+        """
+        self.flush()
+        previous = self.collection
+        suffix = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        fresh = self.client.create_collection(name=f"{self.collection_name}_{suffix}", metadata=self.index_params)
+        batch_size = min(batch_size, self.client.get_max_batch_size())
+        try:
+            # Snapshot the IDs first, as migrate_content_out_of_metadata does
+            all_ids = previous.get(include=[])["ids"]
+            for i in range(0, len(all_ids), batch_size):
+                page = previous.get(
+                    ids=all_ids[i:i + batch_size],
+                    include=["metadatas", "documents", "embeddings"]
+                )
+                if page["ids"]:
+                    fresh.add(
+                        ids=page["ids"],
+                        embeddings=page["embeddings"],
+                        metadatas=page["metadatas"],
+                        documents=page["documents"]
+                    )
+            if fresh.count() != len(all_ids):
+                raise RuntimeError(f"Rebuilt collection has {fresh.count()} chunk(s), expected {len(all_ids)}")
+            set_active_collection(self.db_path, self.collection_name, fresh.name)
+        except BaseException:
+            self.client.delete_collection(fresh.name)
+            raise
+        
+        self.collection = self._buffer.collection = fresh
+        self._space = effective_index_params(fresh.metadata)["hnsw:space"]
+        if not keep_previous:
+            self.client.delete_collection(previous.name)
+        return {"chunks": len(all_ids), "previous": previous.name if keep_previous else None}
+    
+    def _similarity(self, distance: float) -> float:
+        """
+        Turn a Chroma distance into a cosine similarity, whatever space the collection uses.
+        
+        cosine and ip distances are 1 - similarity; l2 distances are squared,
+        which for unit-length embeddings is 2 - 2 * cosine similarity.
+        """
+        if self._space == "l2":
+            return 1.0 - distance / 2.0
+        return 1.0 - distance
+    
+    def _replace_chunks(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict],
+        documents: List[str]
+    ) -> None:
+        """
+        Write chunks back whole, so metadata keys they no longer carry are dropped.
+        
+        Chroma merges metadata on update and upsert, and chromadb 0.6 rejects
+        the None value that would delete a key, so the chunks are deleted and
+        added again under the same IDs. Embeddings are passed back unchanged;
+        without them Chroma would re-embed the documents.
+        """
+        self.collection.delete(ids=ids)
+        self.collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+    
+    def _flush_document(self, document_id: str) -> None:
+        """Write buffered chunks first if some belong to the document, so a later upsert cannot undo a change."""
+        if document_id in self._buffer.document_ids():
+            self._buffer.flush()
+    
+    @staticmethod
+    def _chunk_key(document_id: str, chunk_id: str) -> str:
+        """Chroma record ID of a chunk."""
+        return f"{document_id}_{chunk_id}"
+    
+    @staticmethod
+    def _build_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Translate a VectorStore metadata filter into a Chroma where clause."""
+        if not filters:
+            return None
+        
+        clauses = []
+        for key, value in filters.items():
+            if value is None:
+                continue
+            if key == "tags":
+                tags = value if isinstance(value, (list, tuple, set)) else [value]
+                tag_clauses = [{tag_key(tag): True} for tag in tags]
+                if not tag_clauses:
+                    continue
+                clauses.append(tag_clauses[0] if len(tag_clauses) == 1 else {"$or": tag_clauses})
+            elif isinstance(value, (list, tuple, set)):
+                clauses.append({key: {"$in": list(value)}})
+            else:
+                clauses.append({key: value})
+        
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from typing import Optional
+
+from domain.interfaces.lexical_index import LexicalIndex
+from domain.interfaces.tracer import Tracer
+from domain.interfaces.vector_store import VectorStore
+from infrastructure.config import (
+    CHROMA_DB_DIR,
+    VECTOR_BACKEND,
+    LOCAL_INDEX_DIR,
+    LOCAL_INDEX_DTYPE,
+    LOCAL_INDEX_NPROBE,
+    LOCAL_INDEX_RESCORE,
+)
+
+
+def create_vector_store(collection_name: str = "documents", tracer: Optional[Tracer] = None) -> VectorStore:
+    """
+    Create the vector store selected by VECTOR_BACKEND ("chroma" or "local").
+
+    Backends are imported lazily so the local index never pays Chroma's import cost.
+    The tracer, if given, times each batch Chroma writes.
+    """
+    if VECTOR_BACKEND == "local":
+        from infrastructure.vector.local_store import LocalVectorStore
+        return LocalVectorStore(
+            LOCAL_INDEX_DIR / collection_name,
+            dtype=LOCAL_INDEX_DTYPE,
+            n_probe=LOCAL_INDEX_NPROBE,
+            rescore=LOCAL_INDEX_RESCORE
+        )
+    if VECTOR_BACKEND == "chroma":
+        from infrastructure.vector.chroma_store import ChromaVectorStore
+        return ChromaVectorStore(collection_name=collection_name, tracer=tracer)
+    raise ValueError(f"Unknown VECTOR_BACKEND {VECTOR_BACKEND!r}; use 'chroma' or 'local'")
+
+
+def vector_store_location() -> str:
+    """Human-readable location of the configured vector store."""
+    if VECTOR_BACKEND == "local":
+        return f"local index at {LOCAL_INDEX_DIR}"
+    return f"ChromaDB at {CHROMA_DB_DIR}"
+
+
+def create_lexical_index(collection_name: str = "documents") -> LexicalIndex:
+    """Create the BM25 keyword index kept next to the configured vector store's data."""
+    from infrastructure.lexical.bm25_index import SQLiteBM25Index
+    if VECTOR_BACKEND == "local":
+        return SQLiteBM25Index(LOCAL_INDEX_DIR / collection_name / "bm25.db")
+    return SQLiteBM25Index(Path(CHROMA_DB_DIR) / f"{collection_name}_bm25.db")
@@ -0,0 +1,683 @@
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, List, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from domain.interfaces.vector_store import VectorStore
+from domain.models.document import merged_metadata, tags_of
+from infrastructure.sqlite_utils import SQL_BATCH
+
+# Rows scored per matrix product, bounding the temporary memory of a full scan
+_SCAN_BLOCK_ROWS = 65536
+
+# Budget for the rows x queries score matrix of a batched search
+_BATCH_SCORE_BYTES = 256 * 1024 * 1024
+
+_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization.
+
+    Returns:
+        Tuple of the int8 codes and the float32 scale of each row (value = code * scale)
+    """
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+@dataclass
+class _Vectors:
+    """Memory-mapped views of the stored vectors."""
+    codes: np.ndarray
+    scales: Optional[np.ndarray] = None  # Per-row scale of int8 codes
+    full: Optional[np.ndarray] = None    # Float32 copy kept for rescoring quantized scores
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def decode(self, index) -> np.ndarray:
+        """Approximate float32 vectors for a slice or array of rows."""
+        block = np.asarray(self.codes[index], dtype=np.float32)
+        if self.scales is not None:
+            block *= np.asarray(self.scales[index], dtype=np.float32)[:, None]
+        return block
+
+    def score(self, index, query: np.ndarray) -> np.ndarray:
+        """Cosine scores of a slice or array of rows against a normalized query (or a dim x queries matrix)."""
+        scores = np.asarray(self.codes[index], dtype=np.float32) @ query
+        if self.scales is not None:
+            # Transposing lines the per-row scales up with the last axis for one query or many
+            scores = (scores.T * np.asarray(self.scales[index], dtype=np.float32)).T
+        return scores
+
+
+@dataclass
+class _IVF:
+    """Trained inverted-file index."""
+    centroids: np.ndarray
+    rows: np.ndarray      # Live rows at training time, grouped by list
+    offsets: np.ndarray   # Start of each list in rows, plus the end
+    covered_rows: int     # Rows past this were appended after training
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector index backed by a memory-mapped matrix and a SQLite side table.
+
+    Normalized embeddings are appended to a flat float32 (or float16) file
+    that is memory-mapped for search, so opening the index costs nothing and
+    several processes share the same pages through the OS page cache. Chunk
+    text and metadata live in SQLite next to it.
+
+    Search is an exact, vectorized cosine top-k over the live rows. For large
+    collections an IVF index can be trained with build_ivf(); searches then
+    only scan the n_probe closest lists plus any rows added since training.
+
+    With int8 storage each vector takes a quarter of its float32 size. If
+    rescore is set when the index is created, a float32 copy is also kept
+    on disk; only the top candidates are read from it to rescore them, so it
+    barely touches memory.
+
+    Deletes and upserts tombstone rows; the file is append-only so readers
+    never see a partially rewritten matrix. Tombstoned rows are never
+    reclaimed: they keep their space on disk and are still read (and
+    skipped) by exact scans, so an index that has been re-ingested many
+    times should be rebuilt from scratch into an empty directory.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS chunks (
+            row INTEGER PRIMARY KEY,
+            id TEXT NOT NULL,
+            document_id TEXT,
+            content TEXT,
+            metadata TEXT NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS chunks_id ON chunks (id);
+        CREATE INDEX IF NOT EXISTS chunks_document_id ON chunks (document_id);
+        CREATE TABLE IF NOT EXISTS chunk_tags (
+            row INTEGER NOT NULL,
+            tag TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS chunk_tags_tag ON chunk_tags (tag, row);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, index_dir: Path, dtype: str = "float32", n_probe: int = 8, rescore: int = 0):
+        """
+        Open (or create) a local index.
+
+        Args:
+            index_dir: Directory holding the vector files and metadata database
+            dtype: Storage precision for new indexes, "float32", "float16" or "int8"
+            n_probe: IVF lists scanned per query once an IVF index has been built
+            rescore: For reduced-precision indexes, rescore top_k * rescore candidates
+                with full-precision vectors (0 disables; must be set when the index is created)
+        """
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported dtype {dtype!r}; use one of {sorted(_DTYPES)}")
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.index_dir / "vectors.bin"
+        self.scales_path = self.index_dir / "scales.bin"
+        self.full_path = self.index_dir / "full.bin"
+        self.n_probe = n_probe
+        self.rescore = rescore
+        self._lock = threading.RLock()
+
+        self._conn = sqlite3.connect(str(self.index_dir / "metadata.db"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+
+        # Dimension and dtype are fixed by the first write; until then the requested layout is used
+        self.dtype = _DTYPES[dtype]
+        self.full_precision = rescore > 0 and self.dtype != np.float32
+        self.dimension: Optional[int] = None
+        self._load_layout()
+
+        self._version: Optional[str] = None
+        self._vectors: Optional[_Vectors] = None
+        self._live = np.zeros(0, dtype=bool)
+        self._ivf: Optional[_IVF] = None
+
+    def add_documents(
+        self,
+        embeddings: List[List[float]],
+        metadatas: List[Dict],
+        contents: Optional[List[str]] = None
+    ):
+        """
+        Append chunk embeddings with their metadata and text.
+
+        Chunks whose ID is already stored are replaced.
+
+        Args:
+            embeddings: List of document embeddings
+            metadatas: List of metadata dicts containing document_id, chunk_id, etc.
+            contents: Text of each chunk (taken from a "content" metadata key if omitted)
+        """
+        if len(embeddings) == 0:
+            return
+        if contents is None:
+            contents = [m.get("content", "") for m in metadatas]
+        metadatas = [{key: value for key, value in m.items() if key != "content"} for m in metadatas]
+        ids = [self._chunk_key(m.get("document_id", ""), m.get("chunk_id", "")) for m in metadatas]
+
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            if self.dimension is None:
+                # Another process may have written the first vectors since this one opened the index
+                self._load_layout()
+            if self.dimension is None:
+                self.dimension = vectors.shape[1]
+                self._set_meta("dimension", str(self.dimension))
+                self._set_meta("dtype", np.dtype(self.dtype).name)
+                self._set_meta("full_precision", "1" if self.full_precision else "0")
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the index ({self.dimension})")
+
+            start = self._row_count()
+            # Vectors go first: rows past the committed count are simply overwritten next time
+            if self.dtype == np.int8:
+                codes, scales = quantize_int8(vectors)
+                self._append(self.vectors_path, start, codes)
+                self._append(self.scales_path, start, scales)
+            else:
+                self._append(self.vectors_path, start, vectors.astype(self.dtype))
+            if self.full_precision:
+                self._append(self.full_path, start, vectors)
+
+            rows = range(start, start + len(ids))
+            self._conn.execute("BEGIN")
+            try:
+                for i in range(0, len(ids), SQL_BATCH):
+                    batch = ids[i:i + SQL_BATCH]
+                    self._tombstone_where(f"id IN ({', '.join('?' for _ in batch)})", batch)
+                self._conn.executemany(
+                    "INSERT INTO chunks (row, id, document_id, content, metadata) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (row, chunk_key, metadata.get("document_id"), content, json.dumps(metadata))
+                        for row, chunk_key, metadata, content in zip(rows, ids, metadatas, contents)
+                    ]
+                )
+                self._conn.executemany(
+                    "INSERT INTO chunk_tags (row, tag) VALUES (?, ?)",
+                    [(row, tag) for row, metadata in zip(rows, metadatas) for tag in tags_of(metadata)]
+                )
+                self._bump_version()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
+        """
+        Search for similar documents using query embedding.
+
+        Args:
+            query_embedding: Embedding of the query text
+            top_k: Number of results to return
+            filters: Metadata filter (see VectorStore.search)
+
+        Returns:
+            List of dictionaries containing document metadata and similarity scores
+        """
+        with self._lock:
+            self._refresh()
+            vectors, live, ivf = self._vectors, self._live, self._ivf
+            if vectors is None or not live.any():
+                return []
+            query = self._normalize(np.asarray(query_embedding, dtype=np.float32)[None, :])[0]
+
+            candidates = self._filtered_rows(filters)
+            if candidates is None and ivf is not None and self.n_probe > 0:
+                candidates = self._ivf_candidates(query, ivf)
+
+        if candidates is None:
+            scores = self._scan(vectors, query)
+            scores[~live] = -np.inf
+            rows = np.arange(len(scores))
+        else:
+            # Sorted rows read the memory map sequentially
+            rows = np.sort(candidates[live[candidates]])
+            if rows.size == 0:
+                return []
+            scores = self._score_rows(vectors, rows, query)
+        return self._best(vectors, rows, scores, query, top_k)
+
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict]]:
+        """
+        Search for several query embeddings, reading the vectors once per group of queries.
+
+        Every query shares the filter, so the candidate rows are scored
+        against all of them with one matrix product per block. With an IVF
+        index each query probes its own lists, so queries run one by one.
+
+        Returns:
+            One list of results per query embedding, in the same order
+        """
+        if not query_embeddings:
+            return []
+        with self._lock:
+            self._refresh()
+            vectors, live, ivf = self._vectors, self._live, self._ivf
+            if vectors is None or not live.any():
+                return [[] for _ in query_embeddings]
+            candidates = self._filtered_rows(filters)
+        if candidates is None and ivf is not None and self.n_probe > 0:
+            return [self.search(query_embedding, top_k=top_k, filters=filters) for query_embedding in query_embeddings]
+
+        if candidates is None:
+            rows = np.arange(len(vectors))
+        else:
+            rows = np.sort(candidates[live[candidates]])
+            if rows.size == 0:
+                return [[] for _ in query_embeddings]
+        queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32))
+        group = max(1, _BATCH_SCORE_BYTES // (4 * len(rows)))
+
+        results = []
+        for start in range(0, len(queries), group):
+            block = queries[start:start + group]
+            if candidates is None:
+                scores = self._scan(vectors, block.T)
+                scores[~live] = -np.inf
+            else:
+                scores = self._score_rows(vectors, rows, block.T)
+            for i, query in enumerate(block):
+                results.append(self._best(vectors, rows, scores[:, i], query, top_k))
+        return results
+
+    def _best(self, vectors: _Vectors, rows: np.ndarray, scores: np.ndarray, query: np.ndarray, top_k: int) -> List[Dict]:
+        """Results for the top_k scored rows, rescored at full precision when configured."""
+        rescoring = vectors.full is not None and self.rescore > 0
+        best = self._top(scores, top_k * self.rescore if rescoring else top_k)
+        rows, scores = rows[best], scores[best]
+        if rescoring and len(rows):
+            # Exact scores for the shortlist, read from the full-precision copy
+            order = np.argsort(rows)
+            exact = np.empty(len(rows), dtype=np.float32)
+            exact[order] = np.asarray(vectors.full[rows[order]], dtype=np.float32) @ query
+            best = self._top(exact, top_k)
+            rows, scores = rows[best], exact[best]
+        return self._results([int(row) for row in rows], [float(score) for score in scores])
+
+    def existing_chunk_ids(self, document_id: str, chunk_ids: List[str]) -> Set[str]:
+        """
+        Find which chunks of a document are already stored.
+
+        Args:
+            document_id: ID of the document the chunks belong to
+            chunk_ids: Candidate chunk IDs
+
+        Returns:
+            Set of the chunk IDs present in the index
+        """
+        keys = {self._chunk_key(document_id, chunk_id): chunk_id for chunk_id in chunk_ids}
+        found = set()
+        key_list = list(keys)
+        with self._lock:
+            for i in range(0, len(key_list), SQL_BATCH):
+                batch = key_list[i:i + SQL_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT id FROM chunks WHERE deleted = 0 AND id IN ({', '.join('?' for _ in batch)})",
+                    batch
+                ).fetchall()
+                found.update(keys[key] for key, in rows)
+        return found
+
+    def delete_document(self, document_id: str, keep_chunk_ids: Optional[Iterable[str]] = None) -> None:
+        """
+        Delete the chunks belonging to a document.
+
+        Args:
+            document_id: ID of the document whose chunks should be removed
+            keep_chunk_ids: Chunk IDs to leave in place
+        """
+        keep = {self._chunk_key(document_id, chunk_id) for chunk_id in keep_chunk_ids or []}
+        with self._lock:
+            stored = self._conn.execute(
+                "SELECT row, id FROM chunks WHERE deleted = 0 AND document_id = ?",
+                (document_id,)
+            ).fetchall()
+            stale = [row for row, key in stored if key not in keep]
+            if not stale:
+                return
+            self._conn.execute("BEGIN")
+            try:
+                for i in range(0, len(stale), SQL_BATCH):
+                    batch = stale[i:i + SQL_BATCH]
+                    self._tombstone_where(f"row IN ({', '.join('?' for _ in batch)})", batch)
+                self._bump_version()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def update_document_metadata(self, document_id: str, updates: Dict) -> None:
+        """
+        Merge metadata updates into all chunks of a document, keeping their embeddings.
+
+        Args:
+            document_id: ID of the document whose chunks should be updated
+            updates: Metadata keys and values to set on every chunk; a None value removes the key
+        """
+        with self._lock:
+            stored = self._conn.execute(
+                "SELECT row, metadata FROM chunks WHERE deleted = 0 AND document_id = ?",
+                (document_id,)
+            ).fetchall()
+            if not stored:
+                return
+            self._conn.execute("BEGIN")
+            try:
+                for row, metadata_json in stored:
+                    metadata = merged_metadata(json.loads(metadata_json), updates)
+                    self._conn.execute("UPDATE chunks SET metadata = ? WHERE row = ?", (json.dumps(metadata), row))
+                    self._conn.execute("DELETE FROM chunk_tags WHERE row = ?", (row,))
+                    self._conn.executemany(
+                        "INSERT INTO chunk_tags (row, tag) VALUES (?, ?)",
+                        [(row, tag) for tag in tags_of(metadata)]
+                    )
+                self._bump_version()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def count(self) -> int:
+        """Number of live chunks in the index."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks WHERE deleted = 0").fetchone()[0]
+
+    def sample_vectors(self, limit: int) -> np.ndarray:
+        """Up to limit live vectors as float32, at full precision when a copy is kept."""
+        with self._lock:
+            self._refresh()
+            vectors, live = self._vectors, self._live
+        if vectors is None:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        rows = np.flatnonzero(live)[:limit]
+        if vectors.full is not None:
+            return np.asarray(vectors.full[rows], dtype=np.float32)
+        return vectors.decode(rows)
+
+    def build_ivf(self, n_lists: int, iterations: int = 10, sample_size: int = 100_000, seed: int = 0) -> int:
+        """
+        Train an inverted-file index over the current live rows with spherical k-means.
+
+        Rows appended later are scanned exhaustively until the index is rebuilt.
+        The index files of each build get a new generation number, which is
+        recorded in the metadata database once they are complete, so readers
+        never mix files from two builds.
+
+        Args:
+            n_lists: Number of clusters (roughly sqrt(rows) is a good start)
+            iterations: k-means iterations
+            sample_size: Rows sampled to train the centroids
+            seed: Random seed for sampling and initialization
+
+        Returns:
+            int: Number of rows covered by the index
+        """
+        with self._lock:
+            self._refresh(force=True)
+            vectors = self._vectors
+            live_rows = np.flatnonzero(self._live)
+            if vectors is None or len(live_rows) == 0:
+                return 0
+            rng = np.random.default_rng(seed)
+            n_lists = max(1, min(n_lists, len(live_rows)))
+
+            sample_rows = np.sort(rng.choice(live_rows, size=min(sample_size, len(live_rows)), replace=False))
+            sample = vectors.decode(sample_rows)
+            centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                for list_id in range(n_lists):
+                    members = sample[assignment == list_id]
+                    if len(members):
+                        centroids[list_id] = members.mean(axis=0)
+                centroids = self._normalize(centroids)
+
+            assignments = np.empty(len(live_rows), dtype=np.int32)
+            for start in range(0, len(live_rows), _SCAN_BLOCK_ROWS):
+                block = vectors.decode(live_rows[start:start + _SCAN_BLOCK_ROWS])
+                assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+            # Inverted lists: rows sorted by list, with each list's start offset
+            order = np.argsort(assignments, kind="stable")
+            list_rows = live_rows[order].astype(np.int64)
+            offsets = np.searchsorted(assignments[order], np.arange(n_lists + 1)).astype(np.int64)
+
+            generation = int(self._get_meta("ivf_generation") or 0) + 1
+            for name, array in (("centroids", centroids), ("rows", list_rows), ("offsets", offsets)):
+                path = self._ivf_path(name, generation)
+                temporary = path.with_name(path.name + ".tmp")
+                with open(temporary, "wb") as f:
+                    np.save(f, array)
+                os.replace(temporary, path)
+
+            self._conn.execute("BEGIN")
+            try:
+                self._set_meta("ivf_generation", str(generation))
+                self._set_meta("ivf_covered_rows", str(len(vectors)))
+                # Tell other processes to reload the index
+                self._bump_version()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._ivf = _IVF(centroids, list_rows, offsets, len(vectors))
+            self._remove_stale_ivf(generation)
+            return len(list_rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._vectors = None
+            self._conn.close()
+
+    def _refresh(self, force: bool = False) -> None:
+        """Remap the vector file and reload tombstones if another writer changed the index."""
+        version = self._get_meta("version") or "0"
+        if not force and version == self._version:
+            return
+        self._version = version
+
+        rows = self._row_count()
+        if self.dimension is None:
+            self._load_layout()
+        if rows == 0 or self.dimension is None:
+            self._vectors, self._live = None, np.zeros(0, dtype=bool)
+            return
+        shape = (rows, self.dimension)
+        self._vectors = _Vectors(
+            codes=np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=shape),
+            scales=np.memmap(self.scales_path, dtype=np.float32, mode="r", shape=(rows,)) if self.dtype == np.int8 else None,
+            full=np.memmap(self.full_path, dtype=np.float32, mode="r", shape=shape) if self.full_precision else None
+        )
+
+        live = np.ones(rows, dtype=bool)
+        deleted = [row for row, in self._conn.execute("SELECT row FROM chunks WHERE deleted = 1")]
+        live[deleted] = False
+        self._live = live
+        self._ivf = self._load_ivf()
+
+    def _load_layout(self) -> None:
+        """Adopt the dimension, dtype and full-precision copy fixed by the first write, once there was one."""
+        dimension = self._get_meta("dimension")
+        if not dimension:
+            return
+        self.dtype = _DTYPES[self._get_meta("dtype")]
+        self.full_precision = self._get_meta("full_precision") == "1"
+        self.dimension = int(dimension)
+
+    def _ivf_path(self, name: str, generation: int) -> Path:
+        return self.index_dir / f"ivf_{name}.{generation}.npy"
+
+    def _load_ivf(self) -> Optional[_IVF]:
+        # One query, so a build committing in between cannot pair its generation with another's coverage
+        stored = dict(self._conn.execute(
+            "SELECT key, value FROM meta WHERE key IN ('ivf_generation', 'ivf_covered_rows')"
+        ).fetchall())
+        if "ivf_generation" not in stored:
+            return None
+        generation = int(stored["ivf_generation"])
+        return _IVF(
+            centroids=np.load(self._ivf_path("centroids", generation)),
+            rows=np.load(self._ivf_path("rows", generation), mmap_mode="r"),
+            offsets=np.load(self._ivf_path("offsets", generation)),
+            covered_rows=int(stored["ivf_covered_rows"])
+        )
+
+    def _remove_stale_ivf(self, generation: int) -> None:
+        """Delete the files of earlier builds; ones still mapped by another process are left for the next build."""
+        current = {self._ivf_path(name, generation).name for name in ("centroids", "rows", "offsets")}
+        for path in self.index_dir.glob("ivf_*.npy*"):
+            if path.name not in current:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def _ivf_candidates(self, query: np.ndarray, ivf: _IVF) -> np.ndarray:
+        """Rows in the n_probe lists closest to the query, plus rows added after training."""
+        n_probe = min(self.n_probe, len(ivf.centroids))
+        lists = np.argpartition(-(ivf.centroids @ query), n_probe - 1)[:n_probe]
+        indexed = [ivf.rows[ivf.offsets[i]:ivf.offsets[i + 1]] for i in lists]
+        unindexed = np.arange(ivf.covered_rows, len(self._live))
+        return np.concatenate(indexed + [unindexed])
+
+    def _filtered_rows(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Rows matching a VectorStore filter, or None when nothing is filtered."""
+        clauses, params = [], []
+        for key, value in (filters or {}).items():
+            if value is None:
+                continue
+            if key == "tags":
+                tags = list(value) if isinstance(value, (list, tuple, set)) else [value]
+                if not tags:
+                    continue
+                clauses.append(f"row IN (SELECT row FROM chunk_tags WHERE tag IN ({', '.join('?' for _ in tags)}))")
+                params.extend(tags)
+            else:
+                values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+                clauses.append(f"json_extract(metadata, ?) IN ({', '.join('?' for _ in values)})")
+                params.append(f'$."{key}"')
+                params.extend(values)
+        if not clauses:
+            return None
+        rows = self._conn.execute(
+            f"SELECT row FROM chunks WHERE deleted = 0 AND {' AND '.join(clauses)}",
+            params
+        ).fetchall()
+        return np.fromiter((row for row, in rows), dtype=np.int64, count=len(rows))
+
+    @staticmethod
+    def _scan(vectors: _Vectors, query: np.ndarray) -> np.ndarray:
+        """Cosine scores of every row (one column per query for a matrix), computed block by block."""
+        scores = np.empty((len(vectors),) + query.shape[1:], dtype=np.float32)
+        for start in range(0, len(vectors), _SCAN_BLOCK_ROWS):
+            block = slice(start, min(start + _SCAN_BLOCK_ROWS, len(vectors)))
+            scores[block] = vectors.score(block, query)
+        return scores
+
+    @staticmethod
+    def _score_rows(vectors: _Vectors, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Cosine scores of the given rows, in the same order (one column per query for a matrix)."""
+        scores = np.empty((len(rows),) + query.shape[1:], dtype=np.float32)
+        for start in range(0, len(rows), _SCAN_BLOCK_ROWS):
+            block_rows = rows[start:start + _SCAN_BLOCK_ROWS]
+            scores[start:start + len(block_rows)] = vectors.score(block_rows, query)
+        return scores
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest finite scores, best first."""
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        best = np.argpartition(-scores, k - 1)[:k]
+        return best[np.argsort(-scores[best])]
+
+    @staticmethod
+    def _append(path: Path, start: int, array: np.ndarray) -> None:
+        """Write rows at a given row offset, dropping anything a failed write left behind."""
+        row_bytes = array[0].nbytes
+        with open(path, "r+b" if path.exists() else "w+b") as f:
+            f.seek(start * row_bytes)
+            f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate()
+            f.flush()
+
+    def _results(self, rows: List[int], scores: List[float]) -> List[Dict]:
+        with self._lock:
+            stored = self._conn.execute(
+                f"SELECT row, id, content, metadata FROM chunks WHERE row IN ({', '.join('?' for _ in rows)})",
+                rows
+            ).fetchall()
+        by_row = {row: (chunk_key, content, metadata) for row, chunk_key, content, metadata in stored}
+        results = []
+        for row, score in zip(rows, scores):
+            chunk_key, content, metadata = by_row[row]
+            results.append({
+                "id": chunk_key,
+                "metadata": json.loads(metadata),
+                "content": content,
+                "score": score
+            })
+        return results
+
+    def _tombstone_where(self, condition: str, params: List) -> None:
+        self._conn.execute(f"DELETE FROM chunk_tags WHERE row IN (SELECT row FROM chunks WHERE deleted = 0 AND {condition})", params)
+        self._conn.execute(f"UPDATE chunks SET deleted = 1 WHERE deleted = 0 AND {condition}", params)
+
+    def _row_count(self) -> int:
+        return self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM chunks").fetchone()[0]
+
+    def _bump_version(self) -> None:
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def _chunk_key(document_id: str, chunk_id: str) -> str:
+        return f"{document_id}_{chunk_id}"
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
@@ -0,0 +1,41 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Dict, Optional
+
+from domain.interfaces.async_vector_store import AsyncVectorStore
+from domain.interfaces.vector_store import VectorStore
+
+
+class ThreadedAsyncVectorStore(AsyncVectorStore):
+    """
+    Exposes a synchronous VectorStore to async code.
+
+    Chroma's embedded PersistentClient has no async API, so searches run on a
+    dedicated thread pool; all requests share the one underlying client.
+    """
+
+    def __init__(self, store: VectorStore, max_workers: int = 8):
+        """
+        Args:
+            store: The synchronous store to wrap
+            max_workers: Maximum number of searches running at once
+        """
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vector-search")
+
+    async def search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            lambda: self.store.search(query_embedding, top_k, filters)
+        )
+
+    def close(self) -> None:
+        """Wait for running searches, then close the wrapped store."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.store.close()
@@ -1,23 +1,51 @@
 #!/usr/bin/env python3
+import argparse
 import os
 import time
 from pathlib import Path
 
-# Import components
-from infrastructure.parser.unstructured_parser import UnstructuredParser
-from infrastructure.embedding.openai_embedder import OpenAIEmbeddingGenerator
-from infrastructure.vector.chroma_store import ChromaVectorStore
-from application.ingestion_service import IngestionService
+# Import components; the heavy ones (openai, chromadb, langchain) are imported in main()
+from application.pipeline import PipelineReport, PipelineSettings
 
 # Import config
 import infrastructure.config as config
 
 
+def print_pipeline_report(report: PipelineReport) -> None:
+    """Print per-stage throughput for an ingestion run."""
+    print("\nStage throughput:")
+    print(f"  {'stage':<8}{'workers':>8}{'docs':>8}{'chunks':>9}{'errors':>8}{'docs/s':>9}{'chunks/s':>10}{'busy':>7}")
+    for stats in report.stages.values():
+        print(
+            f"  {stats.name:<8}{stats.workers:>8}{stats.documents:>8}{stats.chunks:>9}{stats.errors:>8}"
+            f"{stats.documents_per_second:>9.2f}{stats.chunks_per_second:>10.1f}{stats.utilization:>7.0%}"
+        )
+    print(
+        f"  Unchanged: {report.skipped}, renamed: {report.renamed}, removed: {report.removed}"
+    )
+    embed_stats = report.stages.get("embed")
+    if embed_stats and embed_stats.reused_chunks:
+        print(f"  Chunks already stored (not re-embedded): {embed_stats.reused_chunks}")
+
+
 def main():
     """
     Main function to run the document ingestion process.
     Instantiates all required components and runs the ingestion service.
     """
+    arg_parser = argparse.ArgumentParser(description="Ingest documents into the vector store.")
+    arg_parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Only retry files whose previous ingestion attempt failed"
+    )
+    arg_parser.add_argument(
+        "--reprocess",
+        action="store_true",
+        help="Re-chunk and re-embed every file, e.g. after changing CHUNK_SIZE (parsed text comes from the parse cache)"
+    )
+    args = arg_parser.parse_args()
+    
     print("Starting document ingestion process...")
     print(f"Processing documents from: {config.RAW_DATA_PATH}")
     
@@ -33,34 +61,109 @@ def main():
     start_time = time.time()
     print("Initializing components...")
     
-    parser = UnstructuredParser()
-    print("✓ Document parser initialized")
+    # Deferred so --help and argument errors return immediately
+    from infrastructure.parser.unstructured_parser import UnstructuredParser
+    from infrastructure.parser.cached_parser import CachedDocumentParser, ParseCache
+    from infrastructure.embedding.openai_embedder import OpenAIEmbeddingGenerator
+    from infrastructure.embedding.cached_embedder import CachedEmbeddingGenerator
+    from infrastructure.vector.factory import create_lexical_index, create_vector_store, vector_store_location
+    from infrastructure.tracing.factory import create_tracer, tracing_location
+    from infrastructure.tracing.recording_tracer import RecordingTracer
+    from application.ingestion_service import IngestionService
+    
+    parser = UnstructuredParser(
+        strategy=config.PARSER_STRATEGY,
+        folder_strategies=config.PARSER_FOLDER_STRATEGIES
+    )
+    print(f"✓ Document parser initialized ({config.PARSER_STRATEGY} strategy)")
+    
+    parse_cache = None
+    if config.PARSE_CACHE_ENABLED:
+        parse_cache = ParseCache(config.PARSE_CACHE_PATH, max_bytes=config.PARSE_CACHE_MAX_MB * 1024 * 1024)
+        parser = CachedDocumentParser(parser, parse_cache)
+        print(f"✓ Parse cache enabled (at {config.PARSE_CACHE_PATH})")
     
     embedder = OpenAIEmbeddingGenerator(model=config.EMBEDDING_MODEL)
-    print(f"✓ Embedding generator initialized (using {config.EMBEDDING_MODEL})")
+    print(f"✓ Embedding generator initialized (using {config.EMBEDDING_MODEL_KEY})")
+    
+    if config.EMBEDDING_CACHE_ENABLED:
+        embedder = CachedEmbeddingGenerator(
+            embedder,
+            model=config.EMBEDDING_MODEL_KEY,
+            db_path=config.EMBEDDING_CACHE_PATH,
+            max_bytes=config.EMBEDDING_CACHE_MAX_MB * 1024 * 1024
+        )
+        print(f"✓ Embedding cache enabled (at {config.EMBEDDING_CACHE_PATH})")
     
-    vector_store = ChromaVectorStore(collection_name="documents")
-    print(f"✓ Vector store initialized (using ChromaDB at {config.CHROMA_DB_DIR})")
+    tracer = create_tracer()
+    if config.TRACING_ENABLED:
+        print(f"✓ Tracing enabled ({tracing_location()})")
+    
+    vector_store = create_vector_store(collection_name="documents", tracer=tracer)
+    print(f"✓ Vector store initialized (using {vector_store_location()})")
+    
+    lexical_index = None
+    if config.HYBRID_SEARCH_ENABLED:
+        lexical_index = create_lexical_index(collection_name="documents")
+        print("✓ Lexical index initialized (BM25 keyword search)")
     
     # Create and run ingestion service
     ingestion_service = IngestionService(
         parser=parser,
         embedder=embedder,
         store=vector_store,
-        chunk_size=1000,  # Can be customized or loaded from config
-        chunk_overlap=200  # Can be customized or loaded from config
+        chunk_size=config.CHUNK_SIZE,
+        chunk_overlap=config.CHUNK_OVERLAP,
+        settings=PipelineSettings(
+            parse_workers=config.INGEST_PARSE_WORKERS,
+            embed_workers=config.INGEST_EMBED_WORKERS,
+            queue_size=config.INGEST_QUEUE_SIZE,
+            embed_batch_size=config.INGEST_EMBED_BATCH_SIZE,
+            write_batch_size=config.INGEST_WRITE_BATCH_SIZE,
+            part_chunks=config.INGEST_PART_CHUNKS
+        ),
+        lexical_index=lexical_index,
+        tracer=tracer
+    )
+    print(
+        f"✓ Ingestion service initialized ({config.INGEST_PARSE_WORKERS} parse worker(s), "
+        f"{config.INGEST_EMBED_WORKERS} embed worker(s))"
     )
-    print("✓ Ingestion service initialized")
     print("Starting document processing...")
     
     # Run the ingestion process
-    ingestion_service.run(str(config.RAW_DATA_PATH))
+    try:
+        report = ingestion_service.run(
+            str(config.RAW_DATA_PATH),
+            retry_failed_only=args.retry_failed,
+            reprocess_all=args.reprocess
+        )
+    finally:
+        vector_store.close()
+        tracer.close()
     
     # Print completion message with elapsed time
     elapsed_time = time.time() - start_time
+    print_pipeline_report(report)
+    if isinstance(embedder, CachedEmbeddingGenerator):
+        cache_stats = embedder.stats()
+        print(
+            f"  Embedding cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es) "
+            f"({cache_stats['hit_rate']:.0%} hit rate), {cache_stats['size_bytes'] / 1024 / 1024:.1f} MB"
+        )
+    if parse_cache is not None:
+        parse_stats = parse_cache.stats()
+        print(
+            f"  Parse cache: {parse_stats['entries']} file(s), {parse_stats['size_bytes'] / 1024 / 1024:.1f} MB "
+            f"({parse_stats['text_bytes'] / 1024 / 1024:.1f} MB of text)"
+        )
+    if isinstance(tracer, RecordingTracer) and tracer.summary():
+        print("\nLatency (traced spans):")
+        for line in tracer.summary():
+            print(line)
     print(f"\nDocument ingestion completed in {elapsed_time:.2f} seconds")
-    print(f"Processed documents have been marked in: {config.PROCESSED_DATA_PATH / 'processed_files.json'}")
-    print(f"Embeddings stored in: {config.CHROMA_DB_DIR}")
+    print(f"Ingestion ledger updated in: {config.PROCESSED_DATA_PATH / 'ingestion.db'}")
+    print(f"Embeddings stored in: {vector_store_location()}")
 
 
 if __name__ == "__main__":
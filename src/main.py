@@ -5,37 +5,119 @@ Provides a simple CLI interface to ask questions about documents.
 """
 
 import sys
-from typing import List, Optional
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional
 
 from domain.models.query import Query
-from application.qa_service import QAService
-from infrastructure.embedding.openai_embedder import OpenAIEmbeddingGenerator
-from infrastructure.vector.chroma_store import ChromaVectorStore
-from infrastructure.llm.openai_chat import OpenAIChat
-from infrastructure.config import EMBEDDING_MODEL, TOP_K_RESULTS
+from infrastructure.config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_MODEL_KEY,
+    TOP_K_RESULTS,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_MAX_MB,
+    EMBEDDING_CACHE_PATH,
+    PROCESSED_DATA_PATH,
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_TTL_SECONDS,
+    ANSWER_CACHE_SIMILARITY,
+    HYBRID_SEARCH_ENABLED,
+    HYBRID_RRF_K,
+    HYBRID_CANDIDATES,
+    LLM_MODEL,
+    CONTEXT_MAX_TOKENS,
+    CONTEXT_MERGE_ADJACENT,
+    CONTEXT_DEDUP_THRESHOLD,
+    TRACING_ENABLED,
+)
 
+if TYPE_CHECKING:
+    from application.qa_service import QAService
 
-def setup_dependencies() -> QAService:
-    """Set up and wire all components needed for the QA system."""
-    print("Initializing components...")
+
+def setup_dependencies(log: Callable[[str], None] = print) -> "QAService":
+    """
+    Set up and wire all components needed for the QA system.
+    
+    openai, chromadb, tiktoken and the rest of the stack are imported here
+    rather than at module load, so the CLI can show its prompt first.
+    
+    Args:
+        log: Receives the progress messages
+    """
+    from application.qa_service import QAService
+    from application.answer_cache import AnswerCache
+    from application.context_builder import ContextBuilder
+    from application.ingestion_ledger import LedgerReader
+    from infrastructure.embedding.openai_embedder import OpenAIEmbeddingGenerator
+    from infrastructure.embedding.cached_embedder import CachedEmbeddingGenerator
+    from infrastructure.vector.factory import create_lexical_index, create_vector_store, vector_store_location
+    from infrastructure.llm.openai_chat import OpenAIChat
+    from infrastructure.tokenizer import TokenCounter
+    from infrastructure.tracing.factory import create_tracer, tracing_location
     
     # Create infrastructure implementations
     embedder = OpenAIEmbeddingGenerator(model=EMBEDDING_MODEL)
-    print(f"✓ Embedding generator initialized (using {EMBEDDING_MODEL})")
+    log(f"✓ Embedding generator initialized (using {EMBEDDING_MODEL_KEY})")
+    
+    if EMBEDDING_CACHE_ENABLED:
+        embedder = CachedEmbeddingGenerator(
+            embedder,
+            model=EMBEDDING_MODEL_KEY,
+            db_path=EMBEDDING_CACHE_PATH,
+            max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024
+        )
+        log("✓ Embedding cache enabled")
+    
+    vector_store = create_vector_store(collection_name="documents")
+    log(f"✓ Vector store initialized ({vector_store_location()})")
     
-    vector_store = ChromaVectorStore(collection_name="documents")
-    print("✓ Vector store initialized")
+    lexical_index = None
+    if HYBRID_SEARCH_ENABLED:
+        lexical_index = create_lexical_index(collection_name="documents")
+        log("✓ Hybrid search enabled (BM25 keyword index)")
     
     llm = OpenAIChat()
-    print("✓ Language model initialized")
+    log("✓ Language model initialized")
+    
+    answer_cache = None
+    if ANSWER_CACHE_ENABLED:
+        # Ingestion bumps the ledger's generation whenever the collection changes
+        ledger = LedgerReader(PROCESSED_DATA_PATH / "ingestion.db")
+        answer_cache = AnswerCache(
+            max_entries=ANSWER_CACHE_MAX_ENTRIES,
+            ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+            similarity_threshold=ANSWER_CACHE_SIMILARITY,
+            generation_provider=ledger.generation
+        )
+        log("✓ Answer cache enabled")
+    
+    # Merges, deduplicates and budgets retrieved chunks before they reach the LLM
+    context_builder = ContextBuilder(
+        max_tokens=CONTEXT_MAX_TOKENS,
+        count_tokens=TokenCounter(LLM_MODEL).count,
+        merge_adjacent=CONTEXT_MERGE_ADJACENT,
+        dedup_threshold=CONTEXT_DEDUP_THRESHOLD
+    )
+    
+    tracer = create_tracer()
+    if TRACING_ENABLED:
+        log(f"✓ Tracing enabled ({tracing_location()})")
     
     # Create the application service
     qa_service = QAService(
         llm=llm,
         vector_store=vector_store,
-        embedder=embedder
+        embedder=embedder,
+        answer_cache=answer_cache,
+        lexical_index=lexical_index,
+        rrf_k=HYBRID_RRF_K,
+        hybrid_candidates=HYBRID_CANDIDATES,
+        context_builder=context_builder,
+        tracer=tracer
     )
-    print("✓ QA service initialized")
+    log("✓ QA service initialized")
     
     return qa_service
 
@@ -49,14 +131,64 @@ def parse_tags(tags_input: str) -> Optional[List[str]]:
     return tags if tags else None
 
 
+class BackgroundSetup:
+    """
+    Builds the QA service on a daemon thread while the user types the first question.
+    
+    Progress messages are held back so they do not garble the prompt and
+    are printed once the service is needed. Being a daemon, the thread
+    never delays exiting before the first question.
+    """
+    
+    def __init__(self):
+        self.messages: List[str] = []
+        self._service: Optional["QAService"] = None
+        self._error: Optional[BaseException] = None
+        self._done = threading.Event()
+        threading.Thread(target=self._run, name="qa-warmup", daemon=True).start()
+    
+    def _run(self) -> None:
+        try:
+            self._service = setup_dependencies(log=self.messages.append)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._done.set()
+    
+    def result(self) -> "QAService":
+        """Return the QA service, waiting for the setup if it is still running; re-raises its error."""
+        if not self._done.is_set():
+            print("⏳ Still loading components...")
+            self._done.wait()
+        for message in self.messages:
+            print(message)
+        self.messages.clear()
+        if self._error is not None:
+            raise self._error
+        return self._service
+
+
+def print_cache_stats(qa_service: "QAService") -> None:
+    """Print answer cache hit rates for the session."""
+    if not qa_service.answer_cache:
+        return
+    stats = qa_service.answer_cache.stats()
+    print(
+        f"Answer cache: {stats['exact_hits']} exact hit(s), {stats['semantic_hits']} similar hit(s), "
+        f"{stats['misses']} miss(es) ({stats['hit_rate']:.0%} hit rate)"
+    )
+
+
 def main():
     """Main entry point for the CLI application."""
+    qa_service = None
     print("\n🤖 Document Assistant CLI")
     print("=" * 40)
     
     try:
-        # Set up all dependencies
-        qa_service = setup_dependencies()
+        # Set up all dependencies in the background; the first question only waits for what is left
+        print("Initializing components in the background...")
+        setup = BackgroundSetup()
         
         print("\nReady to answer questions! Type 'exit' or press Ctrl+C to quit.\n")
         
@@ -64,6 +196,8 @@ def main():
             # Get user question
             question = input("\n❓ Question: ").strip()
             if question.lower() in ["exit", "quit", "q"]:
+                if qa_service:
+                    print_cache_stats(qa_service)
                 print("\nGoodbye! 👋")
                 break
             
@@ -82,26 +216,44 @@ def main():
                 top_k=TOP_K_RESULTS
             )
             
+            if qa_service is None:
+                qa_service = setup.result()
+            
             print("\n🔍 Searching for relevant information...")
             
             try:
-                # Get answer from QA service
-                answer = qa_service.ask(query)
+                # Stream the answer from the QA service as it is generated
+                started = time.perf_counter()
+                first_token_at = None
+                for piece in qa_service.ask_stream(query):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        print("\n📝 Answer:")
+                        print("-" * 40)
+                    print(piece, end="", flush=True)
+                total = time.perf_counter() - started
                 
-                # Print the answer
-                print("\n📝 Answer:")
-                print("-" * 40)
-                print(answer)
+                print()
                 print("-" * 40)
+                if first_token_at is not None:
+                    print(f"⏱️  First token: {first_token_at - started:.2f}s | Total: {total:.2f}s")
             except Exception as e:
                 print(f"\n❌ Error getting answer: {str(e)}")
     
     except KeyboardInterrupt:
+        if qa_service:
+            print()
+            print_cache_stats(qa_service)
         print("\n\nGoodbye! 👋")
         sys.exit(0)
     except Exception as e:
         print(f"\n❌ Error: {str(e)}")
         sys.exit(1)
+    finally:
+        # Writes out spans and metrics still buffered by the tracer
+        if qa_service:
+            qa_service.vector_store.close()
+            qa_service.tracer.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+HTTP serving mode for the document-based smart assistant.
+
+Exposes the QA flow as a small JSON API so a team can share one instance:
+
+    POST /ask     {"question": "...", "tags": ["hr"], "top_k": 5, "stream": false}
+    GET  /health  liveness, load and cache statistics
+
+With "stream": true the answer is sent as chunked NDJSON, one {"delta": ...}
+line per fragment followed by a final {"done": true, ...} line.
+
+Every request shares one pooled AsyncOpenAI client and one vector store.
+At most SERVER_MAX_CONCURRENCY questions are answered at once, up to
+SERVER_MAX_QUEUE more wait for a slot, and anything beyond that is turned
+away with 503 so load spikes cannot pile up unbounded latency.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+from domain.models.query import Query
+from application.async_qa_service import AsyncQAService
+from application.answer_cache import AnswerCache
+from application.context_builder import ContextBuilder
+from application.ingestion_ledger import LedgerReader
+from infrastructure.embedding.async_openai_embedder import AsyncOpenAIEmbeddingGenerator
+from infrastructure.embedding.cached_embedder import AsyncCachedEmbeddingGenerator
+from infrastructure.llm.async_openai_chat import AsyncOpenAIChat
+from infrastructure.vector.factory import create_lexical_index, create_vector_store, vector_store_location
+from infrastructure.vector.threaded_vector_store import ThreadedAsyncVectorStore
+from infrastructure.tracing.factory import create_tracer, tracing_location
+from infrastructure.tokenizer import TokenCounter
+from infrastructure.config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    EMBEDDING_MODEL,
+    EMBEDDING_MODEL_KEY,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_MAX_MB,
+    EMBEDDING_CACHE_PATH,
+    TOP_K_RESULTS,
+    PROCESSED_DATA_PATH,
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_TTL_SECONDS,
+    ANSWER_CACHE_SIMILARITY,
+    HYBRID_SEARCH_ENABLED,
+    HYBRID_RRF_K,
+    HYBRID_CANDIDATES,
+    LLM_MODEL,
+    CONTEXT_MAX_TOKENS,
+    CONTEXT_MERGE_ADJACENT,
+    CONTEXT_DEDUP_THRESHOLD,
+    SERVER_HOST,
+    SERVER_PORT,
+    TRACING_ENABLED,
+    SERVER_MAX_CONCURRENCY,
+    SERVER_MAX_QUEUE,
+    SERVER_REQUEST_TIMEOUT,
+)
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 64 * 1024
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class HTTPError(Exception):
+    """An error answered with a JSON body and the given status code."""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+def setup_dependencies(max_concurrency: int) -> AsyncQAService:
+    """Set up and wire the shared clients used by every request."""
+    print("Initializing components...")
+
+    # One client, one connection pool for both embeddings and chat
+    client = AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+
+    embedder = AsyncOpenAIEmbeddingGenerator(model=EMBEDDING_MODEL, client=client)
+    print(f"✓ Embedding generator initialized (using {EMBEDDING_MODEL_KEY})")
+
+    if EMBEDDING_CACHE_ENABLED:
+        embedder = AsyncCachedEmbeddingGenerator(
+            embedder,
+            model=EMBEDDING_MODEL_KEY,
+            db_path=EMBEDDING_CACHE_PATH,
+            max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024
+        )
+        print("✓ Embedding cache enabled")
+
+    vector_store = ThreadedAsyncVectorStore(
+        create_vector_store(collection_name="documents"),
+        max_workers=max_concurrency
+    )
+    print(f"✓ Vector store initialized ({vector_store_location()})")
+
+    lexical_index = None
+    if HYBRID_SEARCH_ENABLED:
+        lexical_index = create_lexical_index(collection_name="documents")
+        print("✓ Hybrid search enabled (BM25 keyword index)")
+
+    llm = AsyncOpenAIChat(client=client)
+    print("✓ Language model initialized")
+
+    answer_cache = None
+    if ANSWER_CACHE_ENABLED:
+        ledger = LedgerReader(PROCESSED_DATA_PATH / "ingestion.db")
+        answer_cache = AnswerCache(
+            max_entries=ANSWER_CACHE_MAX_ENTRIES,
+            ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+            similarity_threshold=ANSWER_CACHE_SIMILARITY,
+            generation_provider=ledger.generation
+        )
+        print("✓ Answer cache enabled")
+
+    # Merges, deduplicates and budgets retrieved chunks before they reach the LLM
+    context_builder = ContextBuilder(
+        max_tokens=CONTEXT_MAX_TOKENS,
+        count_tokens=TokenCounter(LLM_MODEL).count,
+        merge_adjacent=CONTEXT_MERGE_ADJACENT,
+        dedup_threshold=CONTEXT_DEDUP_THRESHOLD
+    )
+
+    tracer = create_tracer()
+    if TRACING_ENABLED:
+        print(f"✓ Tracing enabled ({tracing_location()})")
+
+    qa_service = AsyncQAService(
+        llm=llm,
+        vector_store=vector_store,
+        embedder=embedder,
+        answer_cache=answer_cache,
+        lexical_index=lexical_index,
+        rrf_k=HYBRID_RRF_K,
+        hybrid_candidates=HYBRID_CANDIDATES,
+        context_builder=context_builder,
+        tracer=tracer
+    )
+    print("✓ QA service initialized")
+    return qa_service
+
+
+class QAServer:
+    """Minimal HTTP/1.1 JSON server around an AsyncQAService."""
+
+    def __init__(
+        self,
+        qa_service: AsyncQAService,
+        max_concurrency: int = SERVER_MAX_CONCURRENCY,
+        max_queue: int = SERVER_MAX_QUEUE,
+        request_timeout: float = SERVER_REQUEST_TIMEOUT
+    ):
+        """
+        Args:
+            qa_service: Service answering the questions
+            max_concurrency: Questions answered at the same time
+            max_queue: Questions allowed to wait for a free slot before answering 503
+            request_timeout: Seconds a question may take, waiting included, before answering 504
+        """
+        self.qa_service = qa_service
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.request_timeout = request_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.stats = {"requests": 0, "rejected": 0, "timeouts": 0, "errors": 0}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {"error": e.message}, e.headers, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    await self._dispatch(writer, method, path, body, keep_alive)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {"error": e.message}, e.headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, writer: asyncio.StreamWriter, method: str, path: str, body: bytes, keep_alive: bool) -> None:
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if path == "/health":
+            if method != "GET":
+                raise HTTPError(405, "Use GET /health")
+            await self._send_json(writer, 200, self._health(), keep_alive=keep_alive)
+        elif path == "/ask":
+            if method != "POST":
+                raise HTTPError(405, "Use POST /ask")
+            query, stream = self._parse_ask(body)
+            await self._ask(writer, query, stream, keep_alive)
+        else:
+            raise HTTPError(404, f"Unknown path {path}")
+
+    async def _ask(self, writer: asyncio.StreamWriter, query: Query, stream: bool, keep_alive: bool) -> None:
+        """Answer a question within the concurrency, queue and time limits."""
+        self.stats["requests"] += 1
+        # Backpressure: refuse work that could not start within a reasonable time
+        if self.active + self.waiting >= self.max_concurrency + self.max_queue:
+            self.stats["rejected"] += 1
+            raise HTTPError(503, "Server busy, retry later", {"Retry-After": "1"})
+
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.request_timeout
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self._remaining(deadline))
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise HTTPError(504, "Timed out waiting for a free slot")
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            if stream:
+                await self._ask_stream(writer, query, started, deadline, keep_alive)
+                return
+            try:
+                answer = await asyncio.wait_for(self.qa_service.ask(query), self._remaining(deadline))
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise HTTPError(504, f"No answer within {self.request_timeout:g}s")
+            except Exception as e:
+                self.stats["errors"] += 1
+                raise HTTPError(500, str(e))
+            await self._send_json(writer, 200, {
+                "answer": answer,
+                "seconds": round(time.perf_counter() - started, 3)
+            }, keep_alive=keep_alive)
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    async def _ask_stream(
+        self,
+        writer: asyncio.StreamWriter,
+        query: Query,
+        started: float,
+        deadline: float,
+        keep_alive: bool
+    ) -> None:
+        """Send the answer as chunked NDJSON while the LLM produces it."""
+        fragments = self.qa_service.ask_stream(query)
+        try:
+            # Errors before the first fragment can still be reported with a proper status
+            try:
+                first = await asyncio.wait_for(fragments.__anext__(), self._remaining(deadline))
+            except StopAsyncIteration:
+                first = None
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise HTTPError(504, f"No answer within {self.request_timeout:g}s")
+            except Exception as e:
+                self.stats["errors"] += 1
+                raise HTTPError(500, str(e))
+
+            first_token = time.perf_counter() - started
+            self._write_head(writer, 200, {
+                "Content-Type": "application/x-ndjson",
+                "Transfer-Encoding": "chunked"
+            }, keep_alive)
+            if first is not None:
+                await self._write_chunk(writer, {"delta": first})
+
+            try:
+                while True:
+                    piece = await asyncio.wait_for(fragments.__anext__(), self._remaining(deadline))
+                    await self._write_chunk(writer, {"delta": piece})
+            except StopAsyncIteration:
+                final = {
+                    "done": True,
+                    "first_token_seconds": round(first_token, 3),
+                    "seconds": round(time.perf_counter() - started, 3)
+                }
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                final = {"done": False, "error": f"No complete answer within {self.request_timeout:g}s"}
+            except Exception as e:
+                self.stats["errors"] += 1
+                final = {"done": False, "error": str(e)}
+
+            await self._write_chunk(writer, final)
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            await fragments.aclose()
+
+    def _health(self) -> Dict:
+        health = {
+            "status": "ok",
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            **self.stats
+        }
+        if self.qa_service.answer_cache:
+            health["answer_cache"] = self.qa_service.answer_cache.stats()
+        if isinstance(self.qa_service.embedder, AsyncCachedEmbeddingGenerator):
+            health["embedding_cache"] = self.qa_service.embedder.stats()
+        return health
+
+    @staticmethod
+    def _parse_ask(body: bytes) -> Tuple[Query, bool]:
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            raise HTTPError(400, "Body must be JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+
+        question = payload.get("question")
+        if not isinstance(question, str) or not question.strip():
+            raise HTTPError(400, "'question' must be a non-empty string")
+
+        tags = payload.get("tags")
+        if isinstance(tags, str):
+            tags = [tag.strip() for tag in tags.split(",")]
+        if tags is not None and not (isinstance(tags, list) and all(isinstance(tag, str) for tag in tags)):
+            raise HTTPError(400, "'tags' must be a list of strings")
+        tags = [tag for tag in tags or [] if tag.strip()] or None
+
+        top_k = payload.get("top_k", TOP_K_RESULTS)
+        # bool is an int subclass, so true would otherwise be accepted as 1
+        if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+            raise HTTPError(400, "'top_k' must be a positive integer")
+
+        return Query(text=question.strip(), tags=tags, top_k=top_k), bool(payload.get("stream", False))
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        return max(deadline - time.monotonic(), 0.0)
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        """Read one request; returns None when the client closed the connection."""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Body larger than {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path, headers, body
+
+    @staticmethod
+    def _write_head(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str], keep_alive: bool) -> None:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def _send_json(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Dict,
+        headers: Optional[Dict[str, str]] = None,
+        keep_alive: bool = True
+    ) -> None:
+        encoded = json.dumps(payload).encode("utf-8")
+        self._write_head(writer, status, {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(encoded)),
+            **(headers or {})
+        }, keep_alive)
+        writer.write(encoded)
+        await writer.drain()
+
+    @staticmethod
+    async def _write_chunk(writer: asyncio.StreamWriter, payload: Dict) -> None:
+        data = (json.dumps(payload) + "\n").encode("utf-8")
+        writer.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        await writer.drain()
+
+
+async def serve(host: str, port: int, max_concurrency: int, max_queue: int, request_timeout: float) -> None:
+    qa_service = setup_dependencies(max_concurrency)
+    server = QAServer(qa_service, max_concurrency, max_queue, request_timeout)
+    listener = await asyncio.start_server(server.handle_connection, host, port)
+    print(f"\n🤖 Document Assistant listening on http://{host}:{port}")
+    print(f"   {max_concurrency} concurrent question(s), {max_queue} queued, {request_timeout:g}s timeout")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        # Writes out chunks and spans still buffered, like the CLI does on exit
+        qa_service.vector_store.close()
+        qa_service.tracer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the document assistant over HTTP.")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--max-concurrency", type=int, default=SERVER_MAX_CONCURRENCY, help="Questions answered at once")
+    parser.add_argument("--max-queue", type=int, default=SERVER_MAX_QUEUE, help="Questions waiting before answering 503")
+    parser.add_argument("--timeout", type=float, default=SERVER_REQUEST_TIMEOUT, help="Seconds per question before answering 504")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, max(args.max_concurrency, 1), max(args.max_queue, 0), args.timeout))
+    except KeyboardInterrupt:
+        print("\nGoodbye! 👋")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Import the application modules the same way the entry points do
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from infrastructure import tokenizer
+
+
+@pytest.fixture(autouse=True)
+def offline_tokenizer(monkeypatch):
+    """Count tokens with the character estimate, so tests never download tiktoken encodings."""
+    monkeypatch.setattr(tokenizer, "HAS_TIKTOKEN", False)
@@ -0,0 +1,25 @@
+import io
+
+import pytest
+
+from batch_qa import read_queries
+
+
+def test_read_queries_parses_ids_tags_and_top_k():
+    queries = read_queries(io.StringIO(
+        '{"id": "pto-1", "question": " Vacation days? ", "tags": "hr, legal", "top_k": "3"}\n'
+        '\n'
+        '{"question": "Sick leave?", "top_k": 7}\n'
+    ))
+
+    (first_id, first), (second_id, second) = queries
+    assert (first_id, first.text, first.tags, first.top_k) == ("pto-1", "Vacation days?", ["hr", "legal"], 3)
+    assert (second_id, second.tags, second.top_k) == ("3", None, 7)
+
+
+@pytest.mark.parametrize("top_k", ["null", "0", "-2", "2.5", "true", '"five"', "[3]"])
+def test_read_queries_rejects_an_invalid_top_k_with_its_line(top_k):
+    lines = io.StringIO('{"question": "Vacation days?"}\n{"question": "Sick leave?", "top_k": %s}\n' % top_k)
+
+    with pytest.raises(ValueError, match=r'^Line 2: "top_k" must be a positive integer'):
+        read_queries(lines)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+
+from chromadb.api.client import SharedSystemClient
+
+from infrastructure.vector.chroma_catalog import active_collection_name
+from infrastructure.vector.chroma_store import ChromaVectorStore
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Chroma keeps its database under CHROMA_DB_DIR, relative to the working directory."""
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    # Clients are cached by path, and the relative path is the same in every test
+    SharedSystemClient.clear_system_cache()
+
+
+def unit_vectors(count: int, dimensions: int = 8) -> np.ndarray:
+    vectors = np.random.default_rng(0).normal(size=(count, dimensions))
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def fill(store: ChromaVectorStore, vectors: np.ndarray) -> None:
+    store.add_documents(
+        vectors.tolist(),
+        [{"document_id": "doc", "chunk_id": str(i)} for i in range(len(vectors))],
+        [f"chunk {i}" for i in range(len(vectors))]
+    )
+    store.flush()
+
+
+@pytest.mark.parametrize("space", ["l2", "cosine", "ip"])
+def test_scores_are_cosine_similarities_in_every_space(workspace, space):
+    vectors = unit_vectors(20)
+    store = ChromaVectorStore(collection_name="documents", index_params={"hnsw:space": space})
+    fill(store, vectors)
+
+    results = store.search(vectors[3].tolist(), top_k=5)
+    for result in results:
+        row = int(result["metadata"]["chunk_id"])
+        assert result["score"] == pytest.approx(float(vectors[row] @ vectors[3]), abs=1e-4)
+    store.close()
+
+
+def test_rebuild_switches_the_collection_name_to_a_full_copy(workspace):
+    vectors = unit_vectors(30)
+    store = ChromaVectorStore(collection_name="documents", index_params={"hnsw:M": 8})
+    fill(store, vectors)
+    before = store.search(vectors[0].tolist(), top_k=5)
+
+    rebuilt = ChromaVectorStore(collection_name="documents", index_params={"hnsw:M": 32})
+    assert rebuilt.rebuild(batch_size=7) == {"chunks": 30, "previous": None}
+    name = active_collection_name(rebuilt.db_path, "documents")
+    assert name != "documents"
+    assert rebuilt.client.list_collections() == [name]
+
+    reopened = ChromaVectorStore(collection_name="documents")
+    assert reopened.collection.name == name
+    assert reopened.collection.metadata["hnsw:M"] == 32
+    assert [hit["id"] for hit in reopened.search(vectors[0].tolist(), top_k=5)] == [hit["id"] for hit in before]
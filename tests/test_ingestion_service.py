@@ -0,0 +1,294 @@
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pytest
+
+from application.ingestion_ledger import STATUS_DONE, STATUS_FAILED
+from application.ingestion_service import IngestionService
+from application.pipeline import PipelineSettings
+from infrastructure.embedding.fake_embedder import FakeEmbeddingGenerator
+from infrastructure.parser.unstructured_parser import UnstructuredParser
+from infrastructure.vector.local_store import LocalVectorStore
+
+RAW = Path(".data/raw")
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """An empty raw data directory; the ledger lives under .data/processed of the working directory."""
+    monkeypatch.chdir(tmp_path)
+    RAW.mkdir(parents=True)
+    return tmp_path
+
+
+@pytest.fixture
+def store(workspace):
+    store = LocalVectorStore(workspace / "index")
+    yield store
+    store.close()
+
+
+class FailingParser(UnstructuredParser):
+    """Reads text files like UnstructuredParser, but raises after the first pages of files named fail*."""
+
+    def parse_pages(self, file_path: str, content_hash: Optional[str] = None) -> Iterator[str]:
+        yield from super().parse_pages(file_path, content_hash)
+        if Path(file_path).name.startswith("fail"):
+            raise ValueError("truncated file")
+
+
+class CrashingParser(UnstructuredParser):
+    """Kills the parse worker process on files named crash*, as a segfaulting library would."""
+
+    def parse_pages(self, file_path: str, content_hash: Optional[str] = None) -> Iterator[str]:
+        if Path(file_path).name.startswith("crash"):
+            os._exit(1)
+        yield from super().parse_pages(file_path, content_hash)
+
+
+class FailingEmbedder(FakeEmbeddingGenerator):
+    """Raises on any call that embeds the given word."""
+
+    def __init__(self, word: str):
+        super().__init__(dimensions=32)
+        self.word = re.compile(rf"\b{word}\b")
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if any(self.word.search(text) for text in texts):
+            raise RuntimeError("embedding request failed")
+        return super().embed(texts)
+
+
+class FailingStore(LocalVectorStore):
+    """Raises on writes that carry chunks of the given file."""
+
+    def __init__(self, path, fail_path: Path):
+        super().__init__(path)
+        self.fail_path = str(fail_path)
+
+    def add_documents(self, embeddings, metadatas, contents=None):
+        if any(metadata["path"] == self.fail_path for metadata in metadatas):
+            raise OSError("disk full")
+        super().add_documents(embeddings, metadatas, contents)
+
+
+class FailingCollection:
+    """Wraps a Chroma collection; upserts that carry chunks of the given file raise."""
+
+    def __init__(self, collection, fail_path: Path):
+        self.collection = collection
+        self.fail_path = str(fail_path)
+        # Documents with chunks in a failed upsert
+        self.failed_documents = set()
+
+    def upsert(self, ids, embeddings, metadatas, documents):
+        if any(metadata["path"] == self.fail_path for metadata in metadatas):
+            self.failed_documents.update(metadata["document_id"] for metadata in metadatas)
+            raise RuntimeError("upsert rejected")
+        self.collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+def write_file(name: str, words: int = 200, seed: str = "") -> Path:
+    """A text file of distinct words, split into several chunks at the chunk size used here."""
+    path = RAW / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(" ".join(f"{seed}{path.stem}word{i}" for i in range(words)))
+    return path
+
+
+def make_service(store, parser=None, embedder=None, **settings) -> IngestionService:
+    return IngestionService(
+        parser or UnstructuredParser(),
+        embedder or FakeEmbeddingGenerator(dimensions=32),
+        store,
+        chunk_size=200,
+        chunk_overlap=0,
+        settings=PipelineSettings(**{"parse_workers": 0, "embed_workers": 1, **settings})
+    )
+
+
+def ingest(store, **kwargs):
+    service = make_service(store, **kwargs)
+    try:
+        return service, service.run(str(RAW))
+    finally:
+        service.ledger.close()
+
+
+def stored_chunks(store) -> Dict[str, Counter]:
+    """Chunk IDs in the store per file path, with how often each is stored."""
+    hits = store.search([1.0] + [0.0] * 31, top_k=100_000)
+    chunks: Dict[str, Counter] = {}
+    for hit in hits:
+        chunks.setdefault(hit["metadata"]["path"], Counter())[hit["metadata"]["chunk_id"]] += 1
+    return chunks
+
+
+def ledger_records(store):
+    service = make_service(store)
+    try:
+        return service.ledger.records()
+    finally:
+        service.ledger.close()
+
+
+def assert_fully_stored(store, *names: str) -> None:
+    """The files are recorded as done, with exactly their chunks stored once each."""
+    records = ledger_records(store)
+    chunks = stored_chunks(store)
+    for name in names:
+        record = records[str(RAW / name)]
+        assert record.status == STATUS_DONE
+        stored = chunks[str(RAW / name)]
+        assert len(stored) == record.chunk_count > 0
+        assert set(stored.values()) == {1}
+
+
+def assert_failed_and_absent(store, *names: str) -> None:
+    """The files are recorded as failed, with none of their chunks stored."""
+    records = ledger_records(store)
+    chunks = stored_chunks(store)
+    for name in names:
+        assert records[str(RAW / name)].status == STATUS_FAILED
+        assert str(RAW / name) not in chunks
+
+
+def test_clean_run_stores_every_chunk_once(store):
+    write_file("a.txt")
+    write_file("b.txt", words=20)
+    write_file("large.txt", words=2000)
+    _, report = ingest(store, part_chunks=4, embed_batch_size=8, write_batch_size=16)
+
+    assert_fully_stored(store, "a.txt", "b.txt", "large.txt")
+    assert report.stages["write"].documents == 3
+    assert sum(stats.errors for stats in report.stages.values()) == 0
+
+
+def test_embed_failure_fails_only_that_file(store):
+    write_file("a.txt")
+    write_file("bad.txt")
+    write_file("c.txt")
+    _, report = ingest(store, embedder=FailingEmbedder("badword5"), embed_batch_size=1)
+
+    assert_failed_and_absent(store, "bad.txt")
+    assert_fully_stored(store, "a.txt", "c.txt")
+    assert report.stages["embed"].errors == 1
+
+    _, report = ingest(store)
+    assert_fully_stored(store, "a.txt", "bad.txt", "c.txt")
+
+
+def test_write_failure_fails_only_that_file(workspace):
+    store = FailingStore(workspace / "index", RAW / "bad.txt")
+    write_file("a.txt")
+    write_file("bad.txt")
+    try:
+        _, report = ingest(store, write_batch_size=1)
+
+        assert_failed_and_absent(store, "bad.txt")
+        assert_fully_stored(store, "a.txt")
+        assert report.stages["write"].errors == 1
+    finally:
+        store.close()
+
+
+def test_crashed_parse_worker_fails_its_file(store):
+    write_file("crash.txt")
+    _, report = ingest(store, parser=CrashingParser(), parse_workers=1)
+
+    assert_failed_and_absent(store, "crash.txt")
+    assert report.stages["parse"].errors == 1
+
+    ingest(store)
+    assert_fully_stored(store, "crash.txt")
+
+
+def test_embed_failure_midway_through_a_large_file_leaves_none_of_it(store):
+    write_file("large.txt", words=2000)
+    write_file("a.txt")
+    ingest(store, embedder=FailingEmbedder("largeword1500"), part_chunks=4, embed_batch_size=1, write_batch_size=1)
+
+    assert_failed_and_absent(store, "large.txt")
+    assert_fully_stored(store, "a.txt")
+
+    ingest(store, part_chunks=4)
+    assert_fully_stored(store, "large.txt", "a.txt")
+
+
+def test_new_file_at_a_renamed_files_old_path_gets_its_own_document(store):
+    write_file("a.txt", seed="first")
+    ingest(store)
+    (RAW / "a.txt").rename(RAW / "b.txt")
+    ingest(store)
+    write_file("a.txt", seed="second")
+    ingest(store)
+
+    records = ledger_records(store)
+    a, b = records[str(RAW / "a.txt")], records[str(RAW / "b.txt")]
+    assert a.status == b.status == STATUS_DONE
+    assert a.document_id != b.document_id
+
+    chunks = stored_chunks(store)
+    assert sum(chunks[str(RAW / "a.txt")].values()) == a.chunk_count
+    assert sum(chunks[str(RAW / "b.txt")].values()) == b.chunk_count
+
+
+def test_moving_a_file_to_another_folder_replaces_its_tag_keys(store):
+    write_file("hr/a.txt")
+    ingest(store)
+    (RAW / "legal").mkdir()
+    (RAW / "hr/a.txt").rename(RAW / "legal/a.txt")
+    _, report = ingest(store)
+
+    assert report.renamed == 1
+    hits = store.search([1.0] + [0.0] * 31, top_k=1000)
+    assert hits
+    for hit in hits:
+        assert hit["metadata"]["tag_legal"] is True
+        assert "tag_hr" not in hit["metadata"]
+        assert hit["metadata"]["tags"] == "legal"
+    assert store.search([1.0] + [0.0] * 31, top_k=1000, filters={"tags": ["hr"]}) == []
+
+
+def test_parse_failing_after_the_first_part_deletes_the_parts_written(store):
+    write_file("fail.txt", words=2000)
+    write_file("ok.txt")
+    _, report = ingest(store, parser=FailingParser(), part_chunks=4, write_batch_size=1)
+
+    records = ledger_records(store)
+    assert records[str(RAW / "fail.txt")].status == STATUS_FAILED
+    assert records[str(RAW / "ok.txt")].status == STATUS_DONE
+    assert report.stages["parse"].errors == 1
+    assert set(stored_chunks(store)) == {str(RAW / "ok.txt")}
+
+
+def test_failed_chroma_upsert_fails_the_documents_in_its_batch(workspace):
+    pytest.importorskip("chromadb")
+    from chromadb.api.client import SharedSystemClient
+    from infrastructure.vector.chroma_store import ChromaVectorStore
+
+    # Small upserts, so one batch holds chunks of several files and the others are written apart
+    store = ChromaVectorStore(write_batch_size=3)
+    collection = FailingCollection(store._buffer.collection, RAW / "bad.txt")
+    store._buffer.collection = collection
+    names = ["a.txt", "bad.txt", "c.txt", "d.txt"]
+    for name in names:
+        write_file(name, words=40)
+    try:
+        ingest(store, write_batch_size=1)
+
+        records = ledger_records(store)
+        failed = [name for name in names if records[str(RAW / name)].document_id in collection.failed_documents]
+        assert "bad.txt" in failed and len(failed) < len(names)
+        assert_failed_and_absent(store, *failed)
+        assert_fully_stored(store, *[name for name in names if name not in failed])
+    finally:
+        store.close()
+        # Clients are cached by path, and the relative path is the same in every test
+        SharedSystemClient.clear_system_cache()
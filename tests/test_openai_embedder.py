@@ -0,0 +1,140 @@
+import threading
+from http.server import ThreadingHTTPServer
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from dev.fake_embedding_server import FakeEmbeddingHandler, FakeEmbeddingState, fake_embedding
+from infrastructure.embedding import openai_embedder
+from infrastructure.embedding.openai_embedder import (
+    OpenAIEmbeddingGenerator,
+    pack_inputs,
+    retry_delay,
+    retryable_status,
+)
+from infrastructure.tokenizer import TokenCounter
+
+
+def text_of(tokens: int) -> str:
+    """A text the character estimate counts as exactly this many tokens."""
+    return "x" * (tokens * 4)
+
+
+@pytest.fixture
+def counter():
+    return TokenCounter("text-embedding-3-small")
+
+
+def test_pack_fills_a_request_up_to_the_token_limit(counter):
+    texts = [text_of(40), text_of(60), text_of(1)]
+    batches = pack_inputs(texts, counter, max_request_tokens=100, max_request_inputs=10, max_input_tokens=100)
+    assert [(len(inputs), tokens) for inputs, tokens in batches] == [(2, 100), (1, 1)]
+
+
+def test_pack_starts_a_new_request_at_the_input_limit(counter):
+    texts = [text_of(1)] * 7
+    batches = pack_inputs(texts, counter, max_request_tokens=1000, max_request_inputs=3, max_input_tokens=100)
+    assert [len(inputs) for inputs, _ in batches] == [3, 3, 1]
+
+
+def test_pack_truncates_inputs_longer_than_the_input_limit(counter):
+    batches = pack_inputs([text_of(250), text_of(5)], counter, max_request_tokens=100, max_request_inputs=10, max_input_tokens=80)
+    assert batches == [([text_of(80), text_of(5)], 85)]
+
+
+def test_pack_keeps_order_and_every_input(counter):
+    texts = [text_of(n % 7 + 1) + str(n) for n in range(50)]
+    batches = pack_inputs(texts, counter, max_request_tokens=20, max_request_inputs=4, max_input_tokens=20)
+    assert [text for inputs, _ in batches for text in inputs] == texts
+    assert all(tokens <= 20 and len(inputs) <= 4 for inputs, tokens in batches)
+
+
+def test_retryable_status_classification():
+    request = httpx.Request("POST", "http://test/v1/embeddings")
+    assert retryable_status(_status_error(RateLimitError, 429)) == 429
+    assert retryable_status(_status_error(InternalServerError, 503)) == 503
+    assert retryable_status(APIConnectionError(request=request)) == 0
+    assert retryable_status(ValueError("not an API error")) is None
+
+
+def test_retry_delay_honors_retry_after():
+    error = _status_error(RateLimitError, 429, {"retry-after": "3"})
+    assert 3.0 <= retry_delay(0, error) <= 3.5
+
+
+def test_retry_delay_backs_off_with_jitter_without_retry_after():
+    error = _status_error(InternalServerError, 500)
+    delays = [retry_delay(attempt, error) for attempt in range(12) for _ in range(20)]
+    assert all(0.0 <= delay <= 60.0 for delay in delays)
+    assert max(retry_delay(0, error) for _ in range(50)) <= 0.5
+
+
+def _status_error(cls, status: int, headers=None):
+    request = httpx.Request("POST", "http://test/v1/embeddings")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return cls("error", response=response, body=None)
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    """Start the fake embedding server on a free port; yields a function that configures and returns its state."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    servers = []
+
+    def start(**settings):
+        defaults = {"dimensions": 8, "latency_ms": 0.0, "error_rate": 0.0, "rpm": 0, "max_inputs": 2048}
+        state = FakeEmbeddingState(SimpleNamespace(**{**defaults, **settings}))
+        handler = type("Handler", (FakeEmbeddingHandler,), {"state": state})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return state, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_embed_splits_requests_and_keeps_order(fake_server):
+    state, url = fake_server()
+    embedder = OpenAIEmbeddingGenerator(base_url=url, max_request_inputs=3, max_concurrency=4, dimensions=0)
+    texts = [f"text {n}" for n in range(10)]
+    embeddings = embedder.embed(texts)
+
+    assert state.stats["requests"] == 4
+    assert state.stats["inputs"] == 10
+    expected = [fake_embedding(text, 8) for text in texts]
+    np.testing.assert_allclose(embeddings, expected, atol=1e-6)
+
+
+def test_server_errors_are_retried_then_raised(fake_server, monkeypatch):
+    state, url = fake_server(error_rate=1.0)
+    delays = []
+    monkeypatch.setattr(openai_embedder.time, "sleep", delays.append)
+    embedder = OpenAIEmbeddingGenerator(base_url=url, max_retries=2, dimensions=0)
+
+    with pytest.raises(InternalServerError):
+        embedder.embed(["hello"])
+    assert state.stats["errors"] == 3
+    assert len(delays) == 2
+
+
+def test_rate_limit_pauses_the_limiter_for_retry_after(fake_server):
+    state, url = fake_server(rpm=1)
+    embedder = OpenAIEmbeddingGenerator(base_url=url, max_retries=1, dimensions=0)
+    embedder.embed(["first"])
+
+    # The server keeps refusing for a minute: the retry waits out Retry-After, then gives up
+    paused = []
+    penalize = embedder.rate_limiter.penalize
+    embedder.rate_limiter.penalize = lambda seconds: paused.append(seconds) or penalize(seconds)
+    with pytest.raises(RateLimitError):
+        embedder.embed(["second"])
+    assert state.stats["rate_limited"] == 2
+    assert len(paused) == 1 and 1.0 <= paused[0] <= 1.5
+    # The pause made the retry wait in the limiter instead of hitting the server at once
+    assert embedder.rate_limiter.reserve(1) == 0.0
@@ -0,0 +1,97 @@
+import pytest
+
+from infrastructure.embedding import rate_limiter
+from infrastructure.embedding.rate_limiter import RateLimiter
+
+
+class Clock:
+    """Stands in for time.monotonic and time.sleep so the buckets refill instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_requests_per_minute_budget_is_spent_then_refilled(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    for _ in range(60):
+        assert limiter.reserve(1) == 0.0
+
+    # Empty bucket: one request refills every second
+    assert limiter.reserve(1) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert limiter.reserve(1) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert limiter.reserve(1) == 0.0
+
+
+def test_refill_never_exceeds_capacity(clock):
+    limiter = RateLimiter(requests_per_minute=10)
+    for _ in range(10):
+        limiter.reserve(1)
+    clock.now += 3600
+    for _ in range(10):
+        assert limiter.reserve(1) == 0.0
+    assert limiter.reserve(1) > 0
+
+
+def test_tokens_per_minute_budget_limits_by_request_size(clock):
+    limiter = RateLimiter(tokens_per_minute=6000)
+    assert limiter.reserve(5000) == 0.0
+    # 1000 tokens left and 100 refilled per second
+    assert limiter.reserve(1500) == pytest.approx(5.0)
+    assert limiter.reserve(1000) == 0.0
+
+
+def test_oversized_request_waits_for_a_full_bucket_only(clock):
+    limiter = RateLimiter(tokens_per_minute=1000)
+    assert limiter.reserve(5000) == 0.0
+    assert limiter.reserve(5000) == pytest.approx(60.0)
+
+
+def test_rejected_reservation_takes_no_budget(clock):
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=600)
+    assert limiter.reserve(600) == 0.0
+    assert limiter.reserve(600) > 0
+    # The request bucket was not charged for the rejected attempt
+    assert limiter.reserve(0) == 0.0
+    assert limiter.reserve(0) > 0
+
+
+def test_zero_limits_disable_budgets(clock):
+    limiter = RateLimiter()
+    for _ in range(10000):
+        assert limiter.reserve(1_000_000) == 0.0
+
+
+def test_acquire_sleeps_until_budget_is_available(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    for _ in range(60):
+        limiter.acquire(1)
+    assert clock.slept == []
+    assert limiter.acquire(1) == pytest.approx(1.0)
+    assert sum(clock.slept) == pytest.approx(1.0)
+
+
+def test_penalize_pauses_every_caller(clock):
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter.penalize(2.0)
+    assert limiter.reserve(1) == pytest.approx(2.0)
+    # A shorter pause does not cut the longer one short
+    limiter.penalize(1.0)
+    assert limiter.acquire(1) == pytest.approx(2.0)
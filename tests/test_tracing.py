@@ -0,0 +1,17 @@
+from infrastructure.tracing.exporters import PrometheusTextExporter
+from infrastructure.tracing.recording_tracer import RecordingTracer
+
+
+def test_prometheus_totals_keep_full_precision(tmp_path):
+    path = tmp_path / "metrics.prom"
+    tracer = RecordingTracer([PrometheusTextExporter(path)])
+    tracer.record("ingest.write", 0.25, {"bytes": 1234567, "chunks": 3})
+    tracer.record("ingest.write", 0.75, {"bytes": 1, "seconds_waited": 0.1})
+    tracer.close()
+
+    lines = path.read_text().splitlines()
+    assert 'rag_span_attribute_total{span="ingest.write",attribute="bytes"} 1234568' in lines
+    assert 'rag_span_attribute_total{span="ingest.write",attribute="chunks"} 3' in lines
+    assert 'rag_span_attribute_total{span="ingest.write",attribute="seconds_waited"} 0.1' in lines
+    assert 'rag_span_seconds_count{span="ingest.write"} 2' in lines
+    assert any(line.startswith('rag_span_seconds{span="ingest.write",quantile="0.95"} ') for line in lines)